@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import REGISTRY
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint() -> PlainTextResponse:
+    """
+    Отдаёт метрики процесса в текстовом формате Prometheus.
+
+    :returns: Текстовая выгрузка метрик.
+    :rtype: PlainTextResponse
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -1,22 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+import json
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.logging import logger
 from app.db.session import get_session
-from app.services.url_service import redirect_to_url
+from app.middleware.setup import CORS_OPTIONS
+from app.schemas.url import PERMANENT_REDIRECT_CODES, URLResponse
+from app.services.click_service import MAX_HEADER_LENGTH, ClickContext, coarse_network
+from app.services.url_service import resolve_short_key
 
 router = APIRouter(prefix="/r", tags=["Redirect"])
 session_depends = Depends(get_session)
 
+# Те же символы, что оставляет без экранирования starlette.responses.RedirectResponse
+_LOCATION_SAFE_CHARS = ":/%#?=@[]!$&'()*+,;"
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+_INTERNAL_ERROR_BODY = b'{"detail":"Internal server error"}'
+
+
+def redirect_cache_headers(url: URLResponse) -> dict[str, str]:
+    """
+    Формирует заголовки кеширования для перенаправления.
+
+    Постоянные перенаправления (301/308) кешируются браузерами и прокси, поэтому ``max-age`` ограничивается
+    оставшимся сроком действия ссылки и ``REDIRECT_CACHE_MAX_AGE``. Временные перенаправления не кешируются.
 
-@router.get("/{short_key}", response_class=RedirectResponse)
-async def redirect_to_url_endpoint(short_key: str, session: AsyncSession = session_depends) -> RedirectResponse:
+    :param url: Запись URL, на которую выполняется перенаправление.
+    :type url: URLResponse
+    :returns: Заголовки ответа.
+    :rtype: dict[str, str]
+    """
+    if url.redirect_code not in PERMANENT_REDIRECT_CODES:
+        return {}
+    ttl = int((url.expires_at - datetime.now(UTC)).total_seconds())
+    max_age = max(0, min(ttl, settings.REDIRECT_CACHE_MAX_AGE))
+    return {"Cache-Control": f"public, max-age={max_age}"}
+
+
+def click_context(scope: Scope) -> ClickContext:
+    """
+    Собирает данные о переходе из ASGI scope: Referer, User-Agent, огрублённый адрес клиента и ключ посетителя.
+
+    :param scope: ASGI scope запроса перенаправления.
+    :type scope: Scope
+    :returns: Данные о переходе.
+    :rtype: ClickContext
+    """
+    referrer = user_agent = None
+    for name, value in scope["headers"]:
+        if name == b"referer":
+            referrer = value.decode("latin-1")[:MAX_HEADER_LENGTH]
+        elif name == b"user-agent":
+            user_agent = value.decode("latin-1")[:MAX_HEADER_LENGTH]
+    client = scope.get("client")
+    if not client:
+        return ClickContext(referrer, user_agent)
+    return ClickContext(referrer, user_agent, coarse_network(client[0]), f"{client[0]}|{user_agent or ''}")
+
+
+@router.api_route("/{short_key}", methods=["GET", "HEAD"], response_class=RedirectResponse)
+async def redirect_to_url_endpoint(
+    short_key: str, request: Request, session: AsyncSession = session_depends
+) -> RedirectResponse:
     """
     Перенаправляет на оригинальный URL по короткому ключу.
 
+    HEAD-запросы возвращают те же заголовки, но не увеличивают счётчик кликов.
+
     :param short_key: Короткий ключ ссылки.
     :type short_key: str
+    :param request: HTTP-запрос.
+    :type request: Request
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
     :returns: Перенаправление на оригинальный URL.
@@ -24,8 +87,12 @@ async def redirect_to_url_endpoint(short_key: str, session: AsyncSession = sessi
     :raises HTTPException: Если ссылка не найдена, неактивна или истёк срок действия.
     """
     try:
-        original_url = await redirect_to_url(session, short_key)
-        return RedirectResponse(url=str(original_url), status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        url = await resolve_short_key(
+            session, short_key, count_click=request.method != "HEAD", context=click_context(request.scope)
+        )
+        return RedirectResponse(
+            url=url.original_url, status_code=url.redirect_code, headers=redirect_cache_headers(url)
+        )
     except ValueError as e:
         if str(e) == "URL not found":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from None
@@ -33,3 +100,121 @@ async def redirect_to_url_endpoint(short_key: str, session: AsyncSession = sessi
     except Exception as e:
         logger.error(f"Error redirecting for short_key {short_key}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from None
+
+
+def _error_body(detail: str) -> bytes:
+    """
+    Сериализует тело ошибки так же, как обработчик HTTPException в FastAPI.
+
+    :param detail: Текст ошибки.
+    :type detail: str
+    :returns: JSON-тело ответа.
+    :rtype: bytes
+    """
+    return json.dumps({"detail": detail}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class RedirectFastPathMiddleware:
+    """
+    Облегчённый ASGI-обработчик ``GET/HEAD {prefix}/{short_key}``.
+
+    Перехватывает запросы на перенаправление до CORS-middleware, роутинга и внедрения зависимостей FastAPI и
+    пишет готовый ответ 307/301/308/404/410/500 напрямую. Ответы побайтно совпадают с
+    :func:`redirect_to_url_endpoint`; CORS-заголовки добавляются тем же ``CORSMiddleware`` с теми же параметрами.
+    Остальные запросы передаются дальше без изменений.
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str) -> None:
+        """
+        Инициализирует обработчик.
+
+        :param app: Следующее ASGI-приложение в цепочке.
+        :type app: ASGIApp
+        :param prefix: Префикс пути перенаправлений, например ``/api/v1/r``.
+        :type prefix: str
+        """
+        self.app = app
+        self.prefix = prefix.rstrip("/") + "/"
+        self.handler = CORSMiddleware(self.handle, **CORS_OPTIONS)
+        self.route: BaseRoute | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Направляет запрос на быстрый путь или дальше по цепочке.
+
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :param receive: ASGI receive.
+        :type receive: Receive
+        :param send: ASGI send.
+        :type send: Send
+        :returns: None
+        """
+        if scope["type"] == "http" and settings.REDIRECT_FAST_PATH and scope["method"] in ("GET", "HEAD"):
+            path = scope["path"]
+            root_path = scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path) :]
+            if path.startswith(self.prefix):
+                short_key = path[len(self.prefix) :]
+                if short_key and "/" not in short_key:
+                    scope["path_params"] = {"short_key": short_key}
+                    scope["route"] = self._find_route(scope)
+                    await self.handler(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+    def _find_route(self, scope: Scope) -> BaseRoute | None:
+        """
+        Находит маршрут обычного эндпоинта, чтобы внешние middleware видели тот же ``scope["route"]``.
+
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :returns: Маршрут ``redirect_to_url_endpoint`` или None.
+        :rtype: BaseRoute | None
+        """
+        if self.route is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self.route = next((r for r in routes if getattr(r, "endpoint", None) is redirect_to_url_endpoint), None)
+        return self.route
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Разрешает короткий ключ и отправляет ответ.
+
+        Сессия берётся из ``get_session`` с учётом ``app.dependency_overrides``, как у обычного эндпоинта.
+
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :param receive: ASGI receive.
+        :type receive: Receive
+        :param send: ASGI send.
+        :type send: Send
+        :returns: None
+        """
+        short_key = scope["path_params"]["short_key"]
+        overrides = getattr(scope.get("app"), "dependency_overrides", {})
+        session_provider = asynccontextmanager(overrides.get(get_session, get_session))
+        try:
+            async with session_provider() as session:
+                url = await resolve_short_key(
+                    session, short_key, count_click=scope["method"] != "HEAD", context=click_context(scope)
+                )
+            headers = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in redirect_cache_headers(url).items()
+            ]
+            headers.append((b"content-length", b"0"))
+            headers.append((b"location", quote(url.original_url, safe=_LOCATION_SAFE_CHARS).encode("latin-1")))
+            status_code, body = url.redirect_code, b""
+        except ValueError as e:
+            status_code = status.HTTP_404_NOT_FOUND if str(e) == "URL not found" else status.HTTP_410_GONE
+            body = _error_body(str(e))
+            headers = [(b"content-length", str(len(body)).encode("latin-1")), *_JSON_HEADERS]
+        except Exception as e:
+            logger.error(f"Error redirecting for short_key {short_key}: {e}")
+            status_code, body = status.HTTP_500_INTERNAL_SERVER_ERROR, _INTERNAL_ERROR_BODY
+            headers = [(b"content-length", str(len(body)).encode("latin-1")), *_JSON_HEADERS]
+
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
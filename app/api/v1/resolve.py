@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.security import get_current_user
+from app.core.logging import logger
+from app.db.session import get_session
+from app.schemas.url import ResolveRequest, ResolveResponse
+from app.schemas.user import UserResponse
+from app.services.url_service import resolve_short_keys
+
+router = APIRouter(prefix="/resolve", tags=["Resolve"])
+
+current_user_depends = Depends(get_current_user)
+session_depends = Depends(get_session)
+
+
+@router.post("", response_model=ResolveResponse)
+async def resolve_short_keys_endpoint(
+    resolve_request: ResolveRequest,
+    current_user: UserResponse = current_user_depends,
+    session: AsyncSession = session_depends,
+) -> ResolveResponse:
+    """
+    Разрешает пакет коротких ключей в исходные URL без учёта переходов (для внутренних сервисов).
+
+    :param resolve_request: Короткие ключи.
+    :type resolve_request: ResolveRequest
+    :param current_user: Текущий аутентифицированный пользователь.
+    :type current_user: UserResponse
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :returns: Результаты по коротким ключам.
+    :rtype: ResolveResponse
+    :raises HTTPException: Если ключей слишком много или произошла ошибка базы данных.
+    """
+    try:
+        return ResolveResponse(results=await resolve_short_keys(session, resolve_request.short_keys))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    except Exception as e:
+        logger.error(f"Error resolving short keys for user {current_user.username}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from None
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
-from app.api.v1 import auth, redirect, urls
+from app.api.v1 import auth, redirect, resolve, urls
 
 api_v1_router = APIRouter(prefix="/api/v1")
 
 api_v1_router.include_router(auth.router)
 api_v1_router.include_router(redirect.router)
+api_v1_router.include_router(resolve.router)
 api_v1_router.include_router(urls.router)
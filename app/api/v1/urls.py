@@ -1,12 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import datetime
+import hashlib
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.security import get_current_user
 from app.core.logging import logger
 from app.db.session import get_session
-from app.schemas.url import URLCreate, URLListResponse, URLResponse
+from app.schemas.url import (
+    ExportFormat,
+    StatsGranularity,
+    URLBulkRequest,
+    URLBulkResponse,
+    URLCreate,
+    URLListResponse,
+    URLResponse,
+    URLStatsResponse,
+    URLUpdate,
+)
 from app.schemas.user import UserResponse
-from app.services.url_service import create_short_url as create_short_url_service, delete_user_url, get_user_urls
+from app.services.export_service import export_user_urls
+from app.services.url_service import (
+    bulk_update_user_urls,
+    create_short_url as create_short_url_service,
+    delete_user_url,
+    find_reusable_url,
+    get_url_click_stats,
+    get_user_urls,
+    get_user_urls_version,
+    update_user_url,
+)
 
 router = APIRouter(
     prefix="/urls",
@@ -15,33 +40,111 @@ router = APIRouter(
 
 current_user_depends = Depends(get_current_user)
 session_depends = Depends(get_session)
+granularity_query = Query("day", description="Гранулярность: hour или day")
+stats_start_query = Query(None, description="Начало периода (по умолчанию 7 дней или 24 часа назад)")
+stats_end_query = Query(None, description="Конец периода, не включается (по умолчанию сейчас)")
+export_format_query = Query("ndjson", alias="format", description="Формат выгрузки: ndjson или csv")
+export_from_query = Query(None, description="Начало периода создания ссылок (включительно)")
+export_to_query = Query(None, description="Конец периода создания ссылок (не включается)")
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def json_response(model: BaseModel, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Сериализует готовую схему ответа скомпилированным сериализатором pydantic-core.
+
+    Возвращённый из эндпоинта ``Response`` FastAPI отдаёт как есть, минуя повторную валидацию по
+    ``response_model``, ``jsonable_encoder`` и ``json.dumps``; байты ответа при этом те же (компактный JSON
+    без экранирования не-ASCII). ``response_model`` в декораторе остаётся для схемы OpenAPI.
+
+    :param model: Схема ответа.
+    :type model: BaseModel
+    :param status_code: HTTP-статус ответа.
+    :type status_code: int
+    :returns: JSON-ответ.
+    :rtype: Response
+    """
+    return Response(content=model.model_dump_json(), status_code=status_code, media_type="application/json")
+
+
+def url_list_etag(user_id: int, version: int, page: int, per_page: int, is_active: bool | None) -> str:
+    """
+    Вычисляет ETag страницы списка ссылок: версия ссылок пользователя вместе с параметрами запроса.
+
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param version: Версия ссылок пользователя.
+    :type version: int
+    :param page: Номер страницы.
+    :type page: int
+    :param per_page: Количество записей на страницу.
+    :type per_page: int
+    :param is_active: Фильтр по активным ссылкам.
+    :type is_active: bool | None
+    :returns: Значение заголовка ETag.
+    :rtype: str
+    """
+    key = f"{user_id}:{version}:{page}:{per_page}:{is_active}".encode()
+    return f'"{hashlib.blake2b(key, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Проверяет заголовок ``If-None-Match`` (слабое сравнение, RFC 9110, разд. 13.1.2).
+
+    :param if_none_match: Значение заголовка ``If-None-Match``.
+    :type if_none_match: str
+    :param etag: Текущий ETag ресурса.
+    :type etag: str
+    :returns: True, если клиентская копия актуальна.
+    :rtype: bool
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
 
 
 @router.post("", response_model=URLResponse, status_code=status.HTTP_201_CREATED)
 async def create_short_url(
-    url_create: URLCreate, current_user: UserResponse = current_user_depends, session: AsyncSession = session_depends
-) -> URLResponse:
+    url_create: URLCreate,
+    reuse_existing: bool = Query(False, description="Вернуть действующую ссылку на тот же URL вместо создания"),
+    current_user: UserResponse = current_user_depends,
+    session: AsyncSession = session_depends,
+) -> Response:
     """
     Создаёт новую короткую ссылку.
 
+    С ``reuse_existing`` (и без пользовательского ключа) сначала ищется действующая ссылка пользователя на тот же
+    URL с тем же кодом перенаправления; если она есть, возвращается она со статусом 200.
+
     :param url_create: Данные для создания ссылки.
     :type url_create: URLCreate
+    :param reuse_existing: Повторно использовать действующую ссылку на тот же URL.
+    :type reuse_existing: bool
     :param current_user: Текущий аутентифицированный пользователь.
     :type current_user: UserResponse
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
-    :returns: Созданная запись URL.
-    :rtype: URLResponse
+    :returns: Созданная запись URL (или существующая со статусом 200).
+    :rtype: Response
     :raises HTTPException: Если создание не удалось.
     """
     try:
+        if reuse_existing and not url_create.short_key:
+            existing = await find_reusable_url(
+                session, url_create.original_url, current_user.id, url_create.redirect_code
+            )
+            if existing:
+                return json_response(existing)
         url = await create_short_url_service(
             session,
             original_url=url_create.original_url,
             short_key=url_create.short_key,
             user_id=current_user.id,
+            redirect_code=url_create.redirect_code,
         )
-        return url
+        return json_response(url, status.HTTP_201_CREATED)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
     except Exception as e:
@@ -54,37 +157,55 @@ async def get_user_urls_endpoint(
     page: int = Query(1, ge=1, description="Номер страницы"),
     per_page: int = Query(10, ge=1, le=100, description="Количество записей на страницу"),
     is_active: bool | None = None,
+    if_none_match: str | None = Header(None),
     current_user: UserResponse = current_user_depends,
     session: AsyncSession = session_depends,
-) -> URLListResponse:
+) -> Response:
     """
     Получает список URL, созданных пользователем, с пагинацией и фильтрацией.
 
+    Ответ помечается ETag по версии ссылок пользователя. Если ``If-None-Match`` совпадает с ним, возвращается
+    304 без чтения ссылок: версия увеличивается при каждом изменении, видимом в списке.
+
     :param page: Номер страницы (начинается с 1).
     :type page: int
     :param per_page: Количество записей на страницу (максимум 100).
     :type per_page: int
     :param is_active: Фильтр по активным ссылкам (True/False или None для всех).
     :type is_active: bool | None
+    :param if_none_match: ETag сохранённой клиентом копии списка.
+    :type if_none_match: str | None
     :param current_user: Текущий аутентифицированный пользователь.
     :type current_user: UserResponse
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
-    :returns: Список URL с метаинформацией пагинации.
-    :rtype: URLListResponse
+    :returns: Список URL с метаинформацией пагинации (или пустой ответ 304).
+    :rtype: Response
     :raises HTTPException: Если произошла ошибка при получении данных.
     """
     try:
+        # Версия читается до ссылок: если список изменится между запросами, ETag окажется старым, а не новым
+        version = await get_user_urls_version(session, current_user.id)
+        headers = {
+            "ETag": url_list_etag(current_user.id, version, page, per_page, is_active),
+            "Cache-Control": "private, no-cache",
+        }
+        if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
         urls, total = await get_user_urls(
             session, user_id=current_user.id, page=page, per_page=per_page, is_active=is_active
         )
-        return URLListResponse(
-            items=[URLResponse.model_validate(url) for url in urls],
-            total=total,
-            page=page,
-            per_page=per_page,
-            total_pages=(total + per_page - 1) // per_page,
+        response = json_response(
+            URLListResponse(
+                items=urls,
+                total=total,
+                page=page,
+                per_page=per_page,
+                total_pages=(total + per_page - 1) // per_page,
+            )
         )
+        response.headers.update(headers)
+        return response
     except Exception as e:
         logger.error(f"Error retrieving URLs for user {current_user.username}: {e}")
         raise HTTPException(
@@ -92,6 +213,83 @@ async def get_user_urls_endpoint(
         ) from None
 
 
+@router.post("/bulk", response_model=URLBulkResponse)
+async def bulk_update_urls(
+    bulk_request: URLBulkRequest,
+    current_user: UserResponse = current_user_depends,
+    session: AsyncSession = session_depends,
+) -> URLBulkResponse:
+    """
+    Массово деактивирует или удаляет ссылки пользователя по списку идентификаторов или по фильтру.
+
+    :param bulk_request: Действие и список идентификаторов или фильтр.
+    :type bulk_request: URLBulkRequest
+    :param current_user: Текущий аутентифицированный пользователь.
+    :type current_user: UserResponse
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :returns: Результаты по каждой ссылке.
+    :rtype: URLBulkResponse
+    :raises HTTPException: Если запрос некорректен или произошла ошибка базы данных.
+    """
+    try:
+        return await bulk_update_user_urls(
+            session,
+            current_user.id,
+            bulk_request.action,
+            bulk_request.ids,
+            bulk_request.is_active,
+            bulk_request.created_from,
+            bulk_request.created_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    except Exception as e:
+        logger.error(f"Error applying bulk {bulk_request.action} for user {current_user.username}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from None
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_user_urls_endpoint(
+    export_format: ExportFormat = export_format_query,
+    gzip: bool = Query(False, description="Сжимать выгрузку gzip"),
+    is_active: bool | None = None,
+    created_from: datetime | None = export_from_query,
+    created_to: datetime | None = export_to_query,
+    current_user: UserResponse = current_user_depends,
+    session: AsyncSession = session_depends,
+) -> StreamingResponse:
+    """
+    Выгружает все ссылки пользователя потоком в NDJSON или CSV без загрузки их в память целиком.
+
+    :param export_format: Формат выгрузки (ndjson, csv).
+    :type export_format: ExportFormat
+    :param gzip: Сжимать ли выгрузку gzip (ответ с ``Content-Encoding: gzip``).
+    :type gzip: bool
+    :param is_active: Фильтр по активным ссылкам (True/False или None для всех).
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :param current_user: Текущий аутентифицированный пользователь.
+    :type current_user: UserResponse
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :returns: Потоковый ответ с выгрузкой.
+    :rtype: StreamingResponse
+    :raises HTTPException: Если период некорректен.
+    """
+    try:
+        body = export_user_urls(session, current_user.id, export_format, gzip, is_active, created_from, created_to)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    headers = {"Content-Disposition": f'attachment; filename="urls.{export_format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[export_format], headers=headers)
+
+
 @router.delete("/{url_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_short_url(
     url_id: int, current_user: UserResponse = current_user_depends, session: AsyncSession = session_depends
@@ -117,3 +315,79 @@ async def delete_short_url(
     except Exception as e:
         logger.error(f"Error deleting URL id {url_id} for user {current_user.username}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from None
+
+
+@router.patch("/{url_id}", response_model=URLResponse)
+async def update_short_url(
+    url_id: int,
+    url_update: URLUpdate,
+    current_user: UserResponse = current_user_depends,
+    session: AsyncSession = session_depends,
+) -> URLResponse:
+    """
+    Деактивирует (или снова активирует) ссылку, меняет срок её действия или исходный URL.
+
+    :param url_id: Идентификатор URL.
+    :type url_id: int
+    :param url_update: Изменяемые поля.
+    :type url_update: URLUpdate
+    :param current_user: Текущий аутентифицированный пользователь.
+    :type current_user: UserResponse
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :returns: Изменённая запись URL.
+    :rtype: URLResponse
+    :raises HTTPException: Если изменений нет, URL не найден или не принадлежит пользователю.
+    """
+    try:
+        return await update_user_url(session, url_id, current_user.id, url_update.model_dump(exclude_none=True))
+    except ValueError as e:
+        if str(e) == "URL not found":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from None
+        if str(e) == "Not authorized to update this URL":
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e)) from None
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    except Exception as e:
+        logger.error(f"Error updating URL id {url_id} for user {current_user.username}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from None
+
+
+@router.get("/{url_id}/stats", response_model=URLStatsResponse)
+async def get_url_stats_endpoint(
+    url_id: int,
+    granularity: StatsGranularity = granularity_query,
+    start: datetime | None = stats_start_query,
+    end: datetime | None = stats_end_query,
+    current_user: UserResponse = current_user_depends,
+    session: AsyncSession = session_depends,
+) -> URLStatsResponse:
+    """
+    Возвращает статистику переходов по ссылке за период из почасовой или дневной сводки.
+
+    :param url_id: Идентификатор URL.
+    :type url_id: int
+    :param granularity: Гранулярность интервалов (hour, day).
+    :type granularity: StatsGranularity
+    :param start: Начало периода.
+    :type start: datetime | None
+    :param end: Конец периода (не включается).
+    :type end: datetime | None
+    :param current_user: Текущий аутентифицированный пользователь.
+    :type current_user: UserResponse
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :returns: Статистика переходов.
+    :rtype: URLStatsResponse
+    :raises HTTPException: Если URL не найден, не принадлежит пользователю или период некорректен.
+    """
+    try:
+        return await get_url_click_stats(session, url_id, current_user.id, granularity, start, end)
+    except ValueError as e:
+        if str(e) == "URL not found":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from None
+        if str(e) == "Not authorized to view this URL":
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e)) from None
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    except Exception as e:
+        logger.error(f"Error retrieving stats for URL id {url_id} for user {current_user.username}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from None
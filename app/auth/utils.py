@@ -1,5 +1,9 @@
+import time
+
 from passlib.context import CryptContext
 
+from app.core.metrics import PASSWORD_VERIFY_DURATION
+
 # Настройка хеширования паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -27,4 +31,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     :returns: True, если пароль соответствует хешу, иначе False.
     :rtype: bool
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    started = time.perf_counter()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        PASSWORD_VERIFY_DURATION.observe(time.perf_counter() - started)
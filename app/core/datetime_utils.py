@@ -0,0 +1,13 @@
+from datetime import UTC, datetime
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    """
+    Считает дату без часового пояса датой в UTC.
+
+    :param value: Дата и время.
+    :type value: datetime | None
+    :returns: Дата и время с часовым поясом.
+    :rtype: datetime | None
+    """
+    return value.replace(tzinfo=UTC) if value and not value.tzinfo else value
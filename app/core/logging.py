@@ -1,11 +1,52 @@
+import atexit
+import copy
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import queue
+
+# Фоновый поток, который пишет записи в реальные обработчики (консоль, файл)
+_listener: QueueListener | None = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    ``QueueHandler``, который не форматирует запись в вызывающем потоке.
+
+    Стандартный ``prepare`` вызывает ``format`` ещё в event loop; здесь форматирование выполняют обработчики
+    в потоке ``QueueListener``. В очередь ставится поверхностная копия записи, как в стандартном ``prepare``,
+    чтобы другие обработчики логгера не меняли её во время форматирования. Записи с исключением форматируются
+    сразу, чтобы не держать ссылки на traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Подготавливает запись к постановке в очередь.
+
+        :param record: Запись лога.
+        :type record: logging.LogRecord
+        :returns: Копия записи для очереди.
+        :rtype: logging.LogRecord
+        """
+        if record.exc_info:
+            return super().prepare(record)
+        return copy.copy(record)
+
+
+def _stop_listener() -> None:
+    """Останавливает фоновый поток логирования, дописав оставшиеся записи."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def setup_logging(environment: str = "development", is_file_handler: bool = False) -> logging.Logger:
     """
     Настраивает логирование приложения.
 
+    Логгер пишет только в ``QueueHandler``; консольный и файловый обработчики вызываются из потока
+    ``QueueListener``, поэтому ввод-вывод не блокирует event loop.
+
     :param environment: Окружение приложения (development, production).
     :type environment: str
     :param is_file_handler: Использовать `RotatingFileHandler`?.
@@ -13,6 +54,7 @@ def setup_logging(environment: str = "development", is_file_handler: bool = Fals
     :returns: Настроенный логгер.
     :rtype: logging.Logger
     """
+    global _listener
     logger = logging.getLogger("url_alias_service")
 
     # Уровень логирования в зависимости от окружения
@@ -28,10 +70,7 @@ def setup_logging(environment: str = "development", is_file_handler: bool = Fals
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(log_format)
     console_handler.setLevel(log_level)
-
-    # Добавить, только если ещё не добавлен
-    if not any(isinstance(h, logging.StreamHandler) for h in logger.handlers):
-        logger.addHandler(console_handler)
+    handlers: list[logging.Handler] = [console_handler]
 
     if is_file_handler:
         # Файловый обработчик с ротацией
@@ -42,11 +81,19 @@ def setup_logging(environment: str = "development", is_file_handler: bool = Fals
         )
         file_handler.setFormatter(log_format)
         file_handler.setLevel(log_level)
+        handlers.append(file_handler)
 
-        # Настройка логгера
-        logger.setLevel(log_level)
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+    # Повторная настройка заменяет прежнюю очередь и поток
+    _stop_listener()
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    logger.setLevel(log_level)
+    logger.addHandler(_DeferredQueueHandler(log_queue))
 
     return logger
 
@@ -64,6 +111,10 @@ def update_logging(environment: str) -> None:
     logger.setLevel(log_level)
     for handler in logger.handlers:
         handler.setLevel(log_level)
+    if _listener is not None:
+        for handler in _listener.handlers:
+            handler.setLevel(log_level)
 
 
 logger = setup_logging()
+atexit.register(_stop_listener)
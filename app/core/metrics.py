@@ -0,0 +1,356 @@
+import asyncio
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from typing import TypeVar
+
+# Границы корзин гистограмм длительности (сек), как у prometheus_client
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Границы корзин для количества запросов к БД на HTTP-запрос
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value: str) -> str:
+    """
+    Экранирует значение метки для текстового формата Prometheus.
+
+    :param value: Значение метки.
+    :type value: str
+    :returns: Экранированное значение.
+    :rtype: str
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    """
+    Форматирует набор меток ``{name="value",...}``.
+
+    :param names: Имена меток.
+    :type names: Iterable[str]
+    :param values: Значения меток.
+    :type values: Iterable[str]
+    :returns: Строка меток (пустая, если меток нет).
+    :rtype: str
+    """
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+class Counter:
+    """
+    Монотонный счётчик с метками.
+
+    Обновления выполняются из event loop одного процесса, поэтому обходятся без блокировок:
+    ``inc`` — это одна операция со словарём.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        """
+        Инициализирует счётчик.
+
+        :param name: Имя метрики.
+        :type name: str
+        :param documentation: Описание метрики.
+        :type documentation: str
+        :param labelnames: Имена меток.
+        :type labelnames: tuple[str, ...]
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Увеличивает счётчик.
+
+        :param labels: Значения меток в порядке ``labelnames``.
+        :type labels: str
+        :param amount: Величина приращения.
+        :type amount: float
+        :returns: None
+        """
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        """
+        Возвращает текущее значение.
+
+        :param labels: Значения меток.
+        :type labels: str
+        :returns: Значение счётчика.
+        :rtype: float
+        """
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        """
+        Возвращает строки сэмплов в текстовом формате Prometheus.
+
+        :returns: Строки сэмплов.
+        :rtype: Iterable[str]
+        """
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge(Counter):
+    """Значение, которое может как расти, так и уменьшаться."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Устанавливает значение.
+
+        :param value: Новое значение.
+        :type value: float
+        :param labels: Значения меток.
+        :type labels: str
+        :returns: None
+        """
+        self._values[labels] = value
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, сумма и количество наблюдений по каждому набору меток."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """
+        Инициализирует гистограмму.
+
+        :param name: Имя метрики.
+        :type name: str
+        :param documentation: Описание метрики.
+        :type documentation: str
+        :param labelnames: Имена меток.
+        :type labelnames: tuple[str, ...]
+        :param buckets: Верхние границы корзин по возрастанию (без +Inf).
+        :type buckets: tuple[float, ...]
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Для каждого набора меток: [счётчики корзин..., счётчик +Inf, сумма]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Добавляет наблюдение.
+
+        :param value: Наблюдаемое значение.
+        :type value: float
+        :param labels: Значения меток.
+        :type labels: str
+        :returns: None
+        """
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, *labels: str) -> int:
+        """
+        Возвращает количество наблюдений.
+
+        :param labels: Значения меток.
+        :type labels: str
+        :returns: Количество наблюдений.
+        :rtype: int
+        """
+        state = self._values.get(labels)
+        return int(sum(state[:-1])) if state else 0
+
+    def samples(self) -> Iterable[str]:
+        """
+        Возвращает строки сэмплов (кумулятивные корзины, ``_sum`` и ``_count``).
+
+        :returns: Строки сэмплов.
+        :rtype: Iterable[str]
+        """
+        bucket_names = (*self.labelnames, "le")
+        for labels, state in self._values.items():
+            cumulative = 0.0
+            for bound, observed in zip((*self.buckets, "+Inf"), state[:-1], strict=True):
+                cumulative += observed
+                yield f"{self.name}_bucket{_format_labels(bucket_names, (*labels, bound))} {cumulative}"
+            label_str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {state[-1]}"
+            yield f"{self.name}_count{label_str} {cumulative}"
+
+
+_MetricT = TypeVar("_MetricT", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса и коллбэков, обновляющих метрики-снимки перед выгрузкой."""
+
+    def __init__(self) -> None:
+        """Инициализирует пустой реестр."""
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """
+        Создаёт и регистрирует счётчик.
+
+        :param name: Имя метрики.
+        :type name: str
+        :param documentation: Описание метрики.
+        :type documentation: str
+        :param labelnames: Имена меток.
+        :type labelnames: tuple[str, ...]
+        :returns: Счётчик.
+        :rtype: Counter
+        """
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """
+        Создаёт и регистрирует gauge.
+
+        :param name: Имя метрики.
+        :type name: str
+        :param documentation: Описание метрики.
+        :type documentation: str
+        :param labelnames: Имена меток.
+        :type labelnames: tuple[str, ...]
+        :returns: Gauge.
+        :rtype: Gauge
+        """
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Создаёт и регистрирует гистограмму.
+
+        :param name: Имя метрики.
+        :type name: str
+        :param documentation: Описание метрики.
+        :type documentation: str
+        :param labelnames: Имена меток.
+        :type labelnames: tuple[str, ...]
+        :param buckets: Верхние границы корзин.
+        :type buckets: tuple[float, ...]
+        :returns: Гистограмма.
+        :rtype: Histogram
+        """
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Регистрирует коллбэк, вызываемый перед каждой выгрузкой (например, для статистики пула).
+
+        :param collector: Функция без аргументов, обновляющая gauge-метрики.
+        :type collector: Callable[[], None]
+        :returns: None
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Выгружает все метрики в текстовом формате Prometheus.
+
+        :returns: Текст выгрузки.
+        :rtype: str
+        """
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _MetricT) -> _MetricT:
+        """
+        Добавляет метрику в реестр.
+
+        :param metric: Метрика.
+        :type metric: Counter | Histogram
+        :returns: Та же метрика.
+        :rtype: Counter | Histogram
+        """
+        self._metrics.append(metric)
+        return metric
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status.", ("method", "route", "status")
+)
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "db_queries_per_request", "Number of SQL statements per HTTP request.", ("route",), QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = REGISTRY.histogram(
+    "db_time_per_request_seconds", "Total SQL execution time per HTTP request.", ("route",)
+)
+DB_QUERY_DURATION = REGISTRY.histogram("db_query_duration_seconds", "SQL statement execution time.")
+DB_POOL_SIZE = REGISTRY.gauge("db_pool_size", "Configured size of the connection pool.")
+DB_POOL_CHECKED_OUT = REGISTRY.gauge("db_pool_checked_out", "Connections currently checked out of the pool.")
+DB_POOL_CHECKED_IN = REGISTRY.gauge("db_pool_checked_in", "Idle connections in the pool.")
+DB_POOL_OVERFLOW = REGISTRY.gauge("db_pool_overflow", "Overflow connections above pool_size.")
+CACHE_REQUESTS = REGISTRY.counter("cache_requests_total", "Cache lookups by cache and result.", ("cache", "result"))
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Delay between the scheduled and actual wake-up of the event loop probe.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+PASSWORD_VERIFY_DURATION = REGISTRY.histogram(
+    "password_verify_duration_seconds", "Time spent in bcrypt password verification."
+)
+SHORT_KEY_RETRIES = REGISTRY.counter(
+    "short_key_generation_retries_total", "Short key regenerations caused by collisions."
+)
+CLICK_EVENTS_WRITTEN = REGISTRY.counter("click_events_written_total", "Click events written to the database.")
+CLICK_EVENTS_DROPPED = REGISTRY.counter(
+    "click_events_dropped_total", "Click events lost because the queue was full or a write failed.", ("reason",)
+)
+CLICK_QUEUE_SIZE = REGISTRY.gauge("click_queue_size", "Click events waiting to be written.")
+REDIRECT_CACHE_SIZE = REGISTRY.gauge("redirect_cache_entries", "Links held in the in-process redirect cache.")
+URLS_SWEPT = REGISTRY.counter(
+    "urls_swept_total",
+    "Expired or deactivated links removed by the sweeper (and urls partitions detached).",
+    ("action",),
+)
+LINK_STATS_REPAIRED = REGISTRY.counter(
+    "user_link_stats_repaired_total", "Per-user link counters corrected by reconciliation."
+)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """
+    Периодически измеряет задержку event loop: насколько позже запланированного просыпается ``sleep``.
+
+    :param interval: Период замера (сек).
+    :type interval: float
+    :returns: None
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - interval))
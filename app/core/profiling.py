@@ -0,0 +1,109 @@
+from collections import Counter
+from pathlib import Path
+import sys
+import threading
+import time
+from types import FrameType
+
+
+def fold_stack(frame: FrameType | None) -> str:
+    """
+    Сворачивает стек вызовов в строку формата flamegraph (от корня к вершине через ``;``).
+
+    :param frame: Верхний кадр стека.
+    :type frame: FrameType | None
+    :returns: Свёрнутый стек, например ``main (app.py:1);handler (api.py:10)``.
+    :rtype: str
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Сэмплирующий профайлер одного потока.
+
+    Фоновый поток с заданным интервалом снимает стек целевого потока (``sys._current_frames``) и считает
+    одинаковые стеки. Профилируемый код не инструментируется, поэтому накладные расходы ограничены
+    сэмплированием. Для asyncio в профиль попадает всё, что выполнялось в потоке event loop за время замера,
+    включая другие конкурентные запросы и ожидание ввода-вывода в селекторе.
+    """
+
+    def __init__(self, thread_id: int | None = None, interval: float = 0.005) -> None:
+        """
+        Инициализирует профайлер.
+
+        :param thread_id: Идентификатор профилируемого потока (по умолчанию текущий).
+        :type thread_id: int | None
+        :param interval: Интервал между сэмплами (сек).
+        :type interval: float
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        """
+        Цикл сэмплирования, выполняемый в фоновом потоке.
+
+        :returns: None
+        """
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold_stack(frame)] += 1
+
+    def start(self) -> None:
+        """
+        Запускает сэмплирование.
+
+        :returns: None
+        """
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        """
+        Останавливает сэмплирование и возвращает собранные стеки.
+
+        :returns: Количество сэмплов по свёрнутым стекам.
+        :rtype: Counter[str]
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+
+def render_folded(stacks: Counter[str]) -> str:
+    """
+    Формирует профиль в формате folded stacks (``flamegraph.pl``, speedscope, inferno).
+
+    :param stacks: Количество сэмплов по свёрнутым стекам.
+    :type stacks: Counter[str]
+    :returns: Текст профиля, по строке ``<стек> <количество>`` на каждый стек.
+    :rtype: str
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def write_profile(path: Path, stacks: Counter[str]) -> None:
+    """
+    Атомарно записывает профиль в файл.
+
+    :param path: Путь к файлу профиля.
+    :type path: Path
+    :param stacks: Количество сэмплов по свёрнутым стекам.
+    :type stacks: Counter[str]
+    :returns: None
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{time.monotonic_ns()}.tmp")
+    tmp_path.write_text(render_folded(stacks), encoding="utf-8")
+    tmp_path.replace(path)
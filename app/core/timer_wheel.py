@@ -0,0 +1,176 @@
+from collections.abc import Hashable
+import math
+
+
+class TimerWheel:
+    """
+    Иерархическое колесо таймеров для истечения большого количества ключей с O(1) на постановку и отмену.
+
+    Время делится на тики длиной ``tick`` секунд. Уровень ``l`` содержит ``slots`` ячеек по ``slots**l`` тиков.
+    Таймер кладётся на уровень старшей цифры (в системе счисления по основанию ``slots``), которой срок
+    отличается от текущего тика, в ячейку с этой цифрой срока. Когда младшие цифры текущего тика обнуляются,
+    ячейка верхнего уровня раскладывается на нижние (каскад); таймеры дальше ``slots**levels`` тиков лежат
+    в отдельном словаре и раскладываются при полном обороте колеса. Срок округляется вверх до тика, поэтому
+    таймер никогда не срабатывает раньше срока и срабатывает не позже чем через ``tick`` после него.
+
+    Колесо не запускает задач само: время продвигается вызовом :meth:`advance`, пустые уровни
+    перепрыгиваются целиком, поэтому продвижение после долгого простоя стоит не больше ``slots`` шагов на уровень.
+    """
+
+    def __init__(self, now: float, tick: float = 1.0, slots: int = 64, levels: int = 4) -> None:
+        """
+        Инициализирует пустое колесо.
+
+        :param now: Текущее время (сек, та же шкала, что у сроков).
+        :type now: float
+        :param tick: Длина тика (сек).
+        :type tick: float
+        :param slots: Количество ячеек на уровне.
+        :type slots: int
+        :param levels: Количество уровней.
+        :type levels: int
+        """
+        self.tick = tick
+        self.slots = slots
+        self._current = math.floor(now / tick)
+        self._wheels: list[list[dict[Hashable, int]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._counts = [0] * levels
+        self._overflow: dict[Hashable, int] = {}
+        # Ключ -> (уровень, ячейка); уровень -1 — словарь дальних таймеров
+        self._locations: dict[Hashable, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        """
+        Возвращает количество запланированных таймеров.
+
+        :returns: Количество таймеров.
+        :rtype: int
+        """
+        return len(self._locations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Проверяет, запланирован ли таймер для ключа.
+
+        :param key: Ключ таймера.
+        :type key: Hashable
+        :returns: True, если таймер запланирован.
+        :rtype: bool
+        """
+        return key in self._locations
+
+    def schedule(self, key: Hashable, deadline: float) -> bool:
+        """
+        Планирует (или переносит) таймер ключа на срок ``deadline``.
+
+        :param key: Ключ таймера.
+        :type key: Hashable
+        :param deadline: Срок (сек, та же шкала, что у ``now``).
+        :type deadline: float
+        :returns: False, если срок уже наступил (таймер не запланирован).
+        :rtype: bool
+        """
+        self.cancel(key)
+        deadline_tick = math.ceil(deadline / self.tick)
+        if deadline_tick <= self._current:
+            return False
+        self._place(key, deadline_tick)
+        return True
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Отменяет таймер ключа.
+
+        :param key: Ключ таймера.
+        :type key: Hashable
+        :returns: True, если таймер был запланирован.
+        :rtype: bool
+        """
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+        level, slot = location
+        if level < 0:
+            del self._overflow[key]
+        else:
+            del self._wheels[level][slot][key]
+            self._counts[level] -= 1
+        return True
+
+    def advance(self, now: float) -> list[Hashable]:
+        """
+        Продвигает колесо до момента ``now`` и снимает сработавшие таймеры.
+
+        :param now: Текущее время (сек).
+        :type now: float
+        :returns: Ключи сработавших таймеров.
+        :rtype: list[Hashable]
+        """
+        target = math.floor(now / self.tick)
+        expired: list[Hashable] = []
+        while self._current < target:
+            # Ни один таймер не сработает раньше ближайшей границы самого нижнего непустого уровня
+            level = next((level for level, count in enumerate(self._counts) if count), len(self._counts))
+            if level == len(self._counts) and not self._overflow:
+                self._current = target
+                break
+            step = self.slots**level
+            next_tick = (self._current // step + 1) * step
+            if next_tick > target:
+                self._current = target
+                break
+            self._current = next_tick
+            self._cascade()
+            fired = self._wheels[0][next_tick % self.slots]
+            self._counts[0] -= len(fired)
+            for key in fired:
+                del self._locations[key]
+            expired.extend(fired)
+            fired.clear()
+        return expired
+
+    def _place(self, key: Hashable, deadline_tick: int) -> None:
+        """
+        Кладёт таймер в ячейку старшей отличающейся от текущего тика цифры срока.
+
+        :param key: Ключ таймера.
+        :type key: Hashable
+        :param deadline_tick: Срок в тиках (не раньше текущего тика).
+        :type deadline_tick: int
+        :returns: None
+        """
+        level, current, deadline = 0, self._current, deadline_tick
+        while current // self.slots != deadline // self.slots:
+            current //= self.slots
+            deadline //= self.slots
+            level += 1
+            if level == len(self._wheels):
+                self._overflow[key] = deadline_tick
+                self._locations[key] = (-1, 0)
+                return
+        slot = deadline % self.slots
+        self._wheels[level][slot][key] = deadline_tick
+        self._counts[level] += 1
+        self._locations[key] = (level, slot)
+
+    def _cascade(self) -> None:
+        """
+        Раскладывает на нижние уровни ячейки, до которых дошёл текущий тик (сверху вниз).
+
+        :returns: None
+        """
+        levels = len(self._wheels)
+        if self._current % self.slots**levels == 0:
+            overflow, self._overflow = self._overflow, {}
+            for key, deadline_tick in overflow.items():
+                self._place(key, deadline_tick)
+        for level in range(levels - 1, 0, -1):
+            span = self.slots**level
+            if self._current % span:
+                continue
+            cell = self._wheels[level][self._current // span % self.slots]
+            self._counts[level] -= len(cell)
+            entries = list(cell.items())
+            cell.clear()
+            for key, deadline_tick in entries:
+                self._place(key, deadline_tick)
@@ -0,0 +1,48 @@
+from functools import lru_cache
+import re
+import string
+
+from pydantic import AnyUrl, TypeAdapter
+
+from app.core.config import settings
+
+_any_url_adapter = TypeAdapter(AnyUrl)
+_PERCENT_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+# Незарезервированные символы RFC 3986, разд. 2.3: их процентное кодирование избыточно
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+
+
+def _normalize_escape(match: re.Match[str]) -> str:
+    """
+    Декодирует процентную последовательность незарезервированного символа, остальные приводит к верхнему регистру.
+
+    :param match: Совпадение ``%XX``.
+    :type match: re.Match[str]
+    :returns: Нормализованная последовательность.
+    :rtype: str
+    """
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else match.group(0).upper()
+
+
+@lru_cache(maxsize=settings.URL_NORMALIZATION_CACHE_SIZE)
+def normalize_url(value: str) -> str:
+    """
+    Проверяет URL и приводит его к каноническому виду.
+
+    Разбор и первая часть нормализации выполняются валидатором ``AnyUrl`` из pydantic (WHATWG URL): схема и хост
+    приводятся к нижнему регистру, порт по умолчанию для схемы удаляется, IDN-хост кодируется в punycode,
+    символы вне ASCII в пути и запросе кодируются процентами. Затем процентные последовательности
+    нормализуются по RFC 3986, разд. 6.2.2.2: незарезервированные символы декодируются, hex — в верхнем регистре.
+
+    Результат кешируется (LRU на ``URL_NORMALIZATION_CACHE_SIZE`` значений): одни и те же адреса приходят
+    повторно, а ошибки валидации не кешируются.
+
+    :param value: Исходный URL.
+    :type value: str
+    :returns: Канонический URL.
+    :rtype: str
+    :raises pydantic.ValidationError: Если значение не является корректным абсолютным URL.
+    """
+    url = str(_any_url_adapter.validate_python(value))
+    return _PERCENT_ESCAPE.sub(_normalize_escape, url) if "%" in url else url
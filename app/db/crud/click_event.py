@@ -0,0 +1,311 @@
+from collections import Counter
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import bindparam, delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.hyperloglog import HyperLogLog
+from app.core.logging import logger
+from app.db.models import (
+    URL,
+    ClickEvent,
+    URLArchive,
+    URLClicksDaily,
+    URLClickShard,
+    URLClicksHourly,
+    URLVisitorSketch,
+)
+
+
+async def insert_click_events(session: AsyncSession, events: list[dict]) -> None:
+    """
+    Добавляет пачку событий переходов одним многострочным INSERT (без фиксации транзакции).
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param events: Значения колонок ``click_events`` для каждого события.
+    :type events: list[dict]
+    :returns: None
+    """
+    await session.execute(insert(ClickEvent.__table__), events)
+
+
+async def add_click_counts(session: AsyncSession, counts: dict[int, int], shard: int) -> None:
+    """
+    Прибавляет клики к шардам счётчиков ``url_click_shards`` одним выражением (без фиксации транзакции).
+
+    Строки ``urls`` не изменяются: значения переносит туда :func:`compact_click_shards`. Строки шардов
+    обновляются в порядке id, чтобы параллельные писатели не блокировали друг друга взаимно.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param counts: Количество новых кликов по id ссылки.
+    :type counts: dict[int, int]
+    :param shard: Номер шарда счётчика.
+    :type shard: int
+    :returns: None
+    """
+    if not counts:
+        return
+    table = URLClickShard.__table__
+    statement = pg_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.url_id, table.c.shard],
+        set_={"count": table.c.count + statement.excluded.count},
+    )
+    await session.execute(
+        statement, [{"url_id": url_id, "shard": shard, "count": counts[url_id]} for url_id in sorted(counts)]
+    )
+
+
+async def compact_click_shards(session: AsyncSession, batch_size: int) -> int:
+    """
+    Переносит до ``batch_size`` строк шардов счётчиков в ``urls.click_count`` в одной транзакции.
+
+    Строки шардов выбираются через ``FOR UPDATE SKIP LOCKED`` (занятые писателем пропускаются до следующего
+    запуска) и удаляются; их суммы по ссылке прибавляются к ``urls`` в порядке id. Суммы ссылок, которых уже
+    нет в ``urls``, прибавляются к их строкам в ``urls_archive`` (клики, записанные после переноса в архив);
+    шарды безвозвратно удалённых ссылок просто удаляются.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param batch_size: Максимальное количество строк шардов за раз.
+    :type batch_size: int
+    :returns: Количество перенесённых строк шардов.
+    :rtype: int
+    """
+    shards = URLClickShard.__table__
+    urls = URL.__table__
+    picked = (
+        select(shards.c.url_id, shards.c.shard)
+        .order_by(shards.c.url_id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("picked")
+    )
+    moved = (
+        await session.execute(
+            delete(shards)
+            .where(tuple_(shards.c.url_id, shards.c.shard).in_(select(picked.c.url_id, picked.c.shard)))
+            .returning(shards.c.url_id, shards.c.count)
+        )
+    ).all()
+    if moved:
+        sums = Counter()
+        for url_id, count in moved:
+            sums[url_id] += count
+        statement = (
+            update(urls)
+            .where(urls.c.id == bindparam("url_id"))
+            .values(click_count=urls.c.click_count + bindparam("clicks"))
+        )
+        await session.execute(statement, [{"url_id": url_id, "clicks": sums[url_id]} for url_id in sorted(sums)])
+        # Ссылку мог перенести в архив чистильщик: обновление выше её уже не нашло
+        existing = set(await session.scalars(select(urls.c.id).where(urls.c.id.in_(list(sums)))))
+        archived = sorted(set(sums) - existing)
+        if archived:
+            archive = URLArchive.__table__
+            await session.execute(
+                update(archive)
+                .where(archive.c.id == bindparam("url_id"))
+                .values(click_count=archive.c.click_count + bindparam("clicks")),
+                [{"url_id": url_id, "clicks": sums[url_id]} for url_id in archived],
+            )
+    await session.commit()
+    return len(moved)
+
+
+async def upsert_click_rollups(
+    session: AsyncSession, hourly: dict[tuple[int, datetime], int], daily: dict[tuple[int, date], int]
+) -> None:
+    """
+    Прибавляет клики к почасовой и дневной сводкам (INSERT ... ON CONFLICT DO UPDATE, без фиксации транзакции).
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param hourly: Количество кликов по (id ссылки, начало часа).
+    :type hourly: dict[tuple[int, datetime], int]
+    :param daily: Количество кликов по (id ссылки, день).
+    :type daily: dict[tuple[int, date], int]
+    :returns: None
+    """
+    for model, bucket_column, counts in (
+        (URLClicksHourly, "bucket", hourly),
+        (URLClicksDaily, "day", daily),
+    ):
+        if not counts:
+            continue
+        table = model.__table__
+        statement = pg_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.url_id, table.c[bucket_column]],
+            set_={"clicks": table.c.clicks + statement.excluded.clicks},
+        )
+        # Ключи в порядке сортировки: параллельные писатели блокируют строки в одном порядке
+        rows = [
+            {"url_id": url_id, bucket_column: bucket, "clicks": counts[url_id, bucket]}
+            for url_id, bucket in sorted(counts)
+        ]
+        await session.execute(statement, rows)
+
+
+async def get_hourly_clicks(
+    session: AsyncSession, url_id: int, start: datetime, end: datetime
+) -> list[tuple[datetime, int]]:
+    """
+    Получает почасовую сводку кликов ссылки за интервал ``[start, end)``.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param url_id: Идентификатор ссылки.
+    :type url_id: int
+    :param start: Начало интервала (час UTC, в который оно попадает, включается).
+    :type start: datetime
+    :param end: Конец интервала (не включается).
+    :type end: datetime
+    :returns: Пары (начало часа, количество кликов) по возрастанию времени, только непустые часы.
+    :rtype: list[tuple[datetime, int]]
+    """
+    result = await session.execute(
+        select(URLClicksHourly.bucket, URLClicksHourly.clicks)
+        .where(
+            URLClicksHourly.url_id == url_id,
+            URLClicksHourly.bucket >= start.astimezone(UTC).replace(minute=0, second=0, microsecond=0),
+            URLClicksHourly.bucket < end,
+        )
+        .order_by(URLClicksHourly.bucket)
+    )
+    return [(bucket, clicks) for bucket, clicks in result.all()]
+
+
+async def get_daily_clicks(session: AsyncSession, url_id: int, start: date, end: date) -> list[tuple[date, int]]:
+    """
+    Получает дневную сводку кликов ссылки за дни с ``start`` по ``end`` включительно.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param url_id: Идентификатор ссылки.
+    :type url_id: int
+    :param start: Первый день.
+    :type start: date
+    :param end: Последний день.
+    :type end: date
+    :returns: Пары (день, количество кликов) по возрастанию дня, только непустые дни.
+    :rtype: list[tuple[date, int]]
+    """
+    result = await session.execute(
+        select(URLClicksDaily.day, URLClicksDaily.clicks)
+        .where(URLClicksDaily.url_id == url_id, URLClicksDaily.day >= start, URLClicksDaily.day <= end)
+        .order_by(URLClicksDaily.day)
+    )
+    return [(day, clicks) for day, clicks in result.all()]
+
+
+async def merge_visitor_sketches(session: AsyncSession, sketches: dict[int, HyperLogLog]) -> None:
+    """
+    Объединяет скетчи посетителей с сохранёнными (без фиксации транзакции).
+
+    Сохранённые строки блокируются ``FOR UPDATE`` в порядке id, поэтому одновременные писатели
+    разных воркеров объединяют скетчи последовательно и ничего не теряют.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param sketches: Скетчи посетителей по id ссылки, накопленные в памяти.
+    :type sketches: dict[int, HyperLogLog]
+    :returns: None
+    """
+    if not sketches:
+        return
+    table = URLVisitorSketch.__table__
+
+    async def lock_stored(url_ids: list[int]) -> dict[int, bytes]:
+        result = await session.execute(
+            select(table.c.url_id, table.c.registers)
+            .where(table.c.url_id.in_(url_ids))
+            .order_by(table.c.url_id)
+            .with_for_update()
+        )
+        return dict(result.all())
+
+    stored = await lock_stored(sorted(sketches))
+    missing = [url_id for url_id in sorted(sketches) if url_id not in stored]
+    if missing:
+        statement = pg_insert(table).on_conflict_do_nothing(index_elements=[table.c.url_id]).returning(table.c.url_id)
+        result = await session.execute(
+            statement, [{"url_id": url_id, "registers": sketches[url_id].to_bytes()} for url_id in missing]
+        )
+        inserted = set(result.scalars().all())
+        # Строки, вставленные параллельным писателем между SELECT и INSERT, объединяем как сохранённые
+        if conflicted := [url_id for url_id in missing if url_id not in inserted]:
+            stored.update(await lock_stored(conflicted))
+
+    if not stored:
+        return
+    merged = []
+    for url_id, registers in sorted(stored.items()):
+        sketch = HyperLogLog(registers)
+        sketch.merge(sketches[url_id])
+        merged.append({"b_url_id": url_id, "b_registers": sketch.to_bytes()})
+    await session.execute(
+        update(table)
+        .where(table.c.url_id == bindparam("b_url_id"))
+        .values(registers=bindparam("b_registers"), updated_at=func.now()),
+        merged,
+    )
+
+
+async def get_visitor_sketch(session: AsyncSession, url_id: int) -> HyperLogLog | None:
+    """
+    Получает сохранённый скетч посетителей ссылки.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param url_id: Идентификатор ссылки.
+    :type url_id: int
+    :returns: Скетч или None, если переходов с известным посетителем ещё не было.
+    :rtype: HyperLogLog | None
+    """
+    registers = await session.scalar(select(URLVisitorSketch.registers).where(URLVisitorSketch.url_id == url_id))
+    return HyperLogLog(registers) if registers is not None else None
+
+
+def click_partition_name(day: date) -> str:
+    """
+    Возвращает имя дневной секции ``click_events``.
+
+    :param day: День (UTC).
+    :type day: date
+    :returns: Имя секции, например ``click_events_20260101``.
+    :rtype: str
+    """
+    return f"click_events_{day:%Y%m%d}"
+
+
+async def ensure_click_partitions(session: AsyncSession, first_day: date, days: int) -> None:
+    """
+    Создаёт дневные секции ``click_events`` на ``days`` дней начиная с ``first_day``, если их ещё нет.
+
+    Каждая секция создаётся в отдельной транзакции: если событие за этот день уже попало в секцию
+    по умолчанию, создание завершится ошибкой, и события за этот день останутся в ``click_events_default``.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param first_day: Первый день (UTC).
+    :type first_day: date
+    :param days: Количество дней.
+    :type days: int
+    :returns: None
+    """
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        statement = (
+            f"CREATE TABLE IF NOT EXISTS {click_partition_name(day)} PARTITION OF click_events "
+            f"FOR VALUES FROM ('{day.isoformat()} 00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00+00')"
+        )
+        try:
+            await session.execute(text(statement))
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.warning(f"Failed to create click_events partition for {day}: {e}")
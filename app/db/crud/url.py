@@ -1,15 +1,88 @@
-from sqlalchemy import delete, func, update
+from collections.abc import AsyncIterator, Iterable
+from datetime import date, datetime
+
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    Integer,
+    Row,
+    String,
+    Subquery,
+    and_,
+    any_,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    text,
+    tuple_,
+    union,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.logging import logger
-from app.db.models import URL
-from app.schemas.url import URLCreate, URLResponse
+from app.db.crud.user import bump_user_versions
+from app.db.models import URL, URLArchive, URLClickShard, URLKey, UserLinkStats
+from app.db.partitioning import add_months, create_url_partition_statement, url_partition_month
+from app.schemas.url import EXPORT_FIELDS, BulkAction, URLCreate, URLResponse
+
+# Колонки ответа по ссылке (включая сумму шардов счётчика), подписанные именами полей URLResponse
+URL_RESPONSE_COLUMNS = tuple(getattr(URL, field).label(field) for field in URLResponse.model_fields)
+
+
+def _url_response(row: Row) -> URLResponse:
+    """
+    Собирает ответ по строке с колонками ``URL_RESPONSE_COLUMNS`` без валидации.
+
+    Значения пришли из БД, куда попадают только проверенные данные.
+
+    :param row: Строка результата.
+    :type row: Row
+    :returns: Запись URL.
+    :rtype: URLResponse
+    """
+    return URLResponse.model_construct(**row._mapping)
+
+
+async def add_user_link_stats(session: AsyncSession, deltas: dict[int, tuple[int, int]]) -> None:
+    """
+    Прибавляет изменения к счётчикам ссылок пользователей одним выражением (без фиксации транзакции).
+
+    Вызывается в транзакции, изменившей ссылки. Строки обновляются в порядке id пользователя, чтобы
+    параллельные транзакции не блокировали друг друга взаимно.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param deltas: Изменения (всего, активных) по id пользователя.
+    :type deltas: dict[int, tuple[int, int]]
+    :returns: None
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    table = UserLinkStats.__table__
+    statement = pg_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={"total": table.c.total + statement.excluded.total, "active": table.c.active + statement.excluded.active},
+    )
+    await session.execute(
+        statement,
+        [{"user_id": user_id, "total": deltas[user_id][0], "active": deltas[user_id][1]} for user_id in sorted(deltas)],
+    )
 
 
 async def create_url(session: AsyncSession, url_create: URLCreate, user_id: int) -> URLResponse:
     """
-    Создаёт новую короткую ссылку в базе данных.
+    Создаёт новую короткую ссылку в базе данных одним выражением ``INSERT ... RETURNING``.
+
+    В той же транзакции увеличиваются счётчики ссылок пользователя.
 
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
@@ -21,12 +94,13 @@ async def create_url(session: AsyncSession, url_create: URLCreate, user_id: int)
     :rtype: URLResponse
     """
     try:
-        db_url = URL(**url_create.model_dump(), user_id=user_id)
-        session.add(db_url)
+        result = await session.execute(
+            insert(URL).values(**url_create.model_dump(), user_id=user_id).returning(*URL_RESPONSE_COLUMNS)
+        )
+        url = _url_response(result.one())
+        await add_user_link_stats(session, {user_id: (1, int(url.is_active))})
         await session.commit()
-        await session.refresh(db_url)
-
-        return URLResponse.model_validate(db_url)
+        return url
     except Exception as e:
         logger.error(f"Error creating URL for user_id {user_id}: {e}")
         raise
@@ -54,6 +128,90 @@ async def get_url_by_short_key(session: AsyncSession, short_key: str) -> URLResp
         raise
 
 
+async def find_active_user_url(
+    session: AsyncSession, user_id: int, original_url: str, redirect_code: int
+) -> URLResponse | None:
+    """
+    Находит действующую ссылку пользователя на тот же URL по индексу ``(user_id, url_hash)``.
+
+    Совпадение дайджеста перепроверяется сравнением самого URL, поэтому коллизии MD5 не приводят к ошибке.
+    Из нескольких подходящих ссылок возвращается та, что действует дольше.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param original_url: Исходный URL (после валидации схемой).
+    :type original_url: str
+    :param redirect_code: Код перенаправления.
+    :type redirect_code: int
+    :returns: Найденная запись URL или None.
+    :rtype: URLResponse | None
+    """
+    try:
+        result = await session.execute(
+            select(URL)
+            .where(
+                URL.user_id == user_id,
+                URL.url_hash == func.decode(func.md5(original_url), "hex"),
+                URL.original_url == original_url,
+                URL.redirect_code == redirect_code,
+                URL.is_active.is_(True),
+                URL.expires_at > func.now(),
+            )
+            .order_by(URL.expires_at.desc())
+            .limit(1)
+        )
+        url = result.scalars().first()
+        return URLResponse.model_validate(url) if url else None
+    except Exception as e:
+        logger.error(f"Error looking up existing URL for user_id {user_id}: {e}")
+        raise
+
+
+async def get_urls_by_short_keys(session: AsyncSession, short_keys: list[str]) -> list[URLResponse]:
+    """
+    Получает ссылки по списку коротких ключей одним запросом ``WHERE short_key = ANY(:keys)``.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param short_keys: Короткие ключи.
+    :type short_keys: list[str]
+    :returns: Найденные записи URL (отсутствующие ключи пропускаются).
+    :rtype: list[URLResponse]
+    """
+    try:
+        result = await session.execute(select(URL).where(URL.short_key == any_(literal(short_keys, ARRAY(String)))))
+        return [URLResponse.model_validate(url) for url in result.scalars()]
+    except Exception as e:
+        logger.error(f"Error retrieving {len(short_keys)} URLs by short keys: {e}")
+        raise
+
+
+async def is_short_key_taken(session: AsyncSession, short_key: str, include_archived: bool = False) -> bool:
+    """
+    Проверяет, занят ли короткий ключ, одним запросом.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param short_key: Короткий ключ ссылки.
+    :type short_key: str
+    :param include_archived: Считать занятыми ключи ссылок, перенесённых в архив (в том числе ключи
+        отсоединённых секций, оставшиеся в ``url_keys``).
+    :type include_archived: bool
+    :returns: True, если ключ занят.
+    :rtype: bool
+    """
+    condition = exists().where(URL.short_key == short_key)
+    if include_archived:
+        condition = or_(
+            condition,
+            exists().where(URLArchive.short_key == short_key),
+            exists().where(URLKey.short_key == short_key),
+        )
+    return bool(await session.scalar(select(condition)))
+
+
 async def get_url_by_id(session: AsyncSession, url_id: int) -> URLResponse | None:
     """
     Получает URL по идентификатору.
@@ -98,20 +256,20 @@ async def get_urls_by_user(
     """
     try:
         offset = (page - 1) * per_page
-        query = select(URL).where(URL.user_id == user_id)
-        total_query = select(func.count()).select_from(URL).where(URL.user_id == user_id)
-
+        query = select(*URL_RESPONSE_COLUMNS).where(URL.user_id == user_id)
         if is_active is not None:
             query = query.where(URL.is_active == is_active)
-            total_query = total_query.where(URL.is_active == is_active)
-
         query = query.order_by(URL.created_at.desc()).limit(per_page).offset(offset)
 
         result = await session.execute(query)
-        urls = result.scalars().all()
-        urls = [URLResponse.model_validate(url) for url in urls]
-        total_result = await session.execute(total_query)
-        total = total_result.scalar_one()
+        urls = [_url_response(row) for row in result]
+        # Общее количество — из счётчиков ссылок пользователя, а не count(*) по его ссылкам
+        stats = await session.execute(
+            select(UserLinkStats.total, UserLinkStats.active).where(UserLinkStats.user_id == user_id)
+        )
+        total, active = stats.one_or_none() or (0, 0)
+        if is_active is not None:
+            total = active if is_active else total - active
 
         return urls, total
     except Exception as e:
@@ -119,42 +277,559 @@ async def get_urls_by_user(
         raise
 
 
-async def increment_click_count(session: AsyncSession, url_id: int) -> None:
+def _user_urls_filter(
+    user_id: int, is_active: bool | None, created_from: datetime | None, created_to: datetime | None
+) -> list[ColumnElement[bool]]:
+    """
+    Собирает условия отбора ссылок пользователя по активности и периоду создания.
+
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param is_active: Фильтр по активным ссылкам (True/False или None для всех).
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :returns: Условия для ``where``.
+    :rtype: list[ColumnElement[bool]]
+    """
+    conditions = [URL.user_id == user_id]
+    if is_active is not None:
+        conditions.append(URL.is_active == is_active)
+    if created_from is not None:
+        conditions.append(URL.created_at >= created_from)
+    if created_to is not None:
+        conditions.append(URL.created_at < created_to)
+    return conditions
+
+
+async def stream_urls_by_user(
+    session: AsyncSession,
+    user_id: int,
+    is_active: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[Row]:
     """
-    Увеличивает счётчик кликов для URL.
+    Потоково читает ссылки пользователя через серверный курсор, по ``batch_size`` строк за раз.
+
+    Возвращаются строки с полями ``EXPORT_FIELDS`` (без ORM-объектов), поэтому память не растёт с количеством ссылок.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param is_active: Фильтр по активным ссылкам (True/False или None для всех).
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :param batch_size: Количество строк, получаемых из курсора за раз.
+    :type batch_size: int
+    :returns: Асинхронный итератор строк в порядке id.
+    :rtype: AsyncIterator[Row]
+    """
+    query = select(*(getattr(URL, field) for field in EXPORT_FIELDS)).where(
+        *_user_urls_filter(user_id, is_active, created_from, created_to)
+    )
+    result = await session.stream(query.order_by(URL.id).execution_options(yield_per=batch_size))
+    async for row in result:
+        yield row
+
+
+def _locked_activity(condition: ColumnElement[bool]) -> Subquery:
+    """
+    Подзапрос для ``UPDATE ... FROM``: блокирует изменяемые строки и возвращает их активность до изменения.
+
+    :param condition: Условие отбора изменяемых ссылок.
+    :type condition: ColumnElement[bool]
+    :returns: Подзапрос с колонками ``id`` и ``was_active``.
+    :rtype: Subquery
+    """
+    return select(URL.id, URL.is_active.label("was_active")).where(condition).with_for_update().subquery("previous")
+
+
+async def update_url(session: AsyncSession, url_id: int, user_id: int, values: dict) -> URLResponse | None:
+    """
+    Изменяет поля URL пользователя одним выражением ``UPDATE ... RETURNING`` (проверка владельца — в ``WHERE``).
+
+    Если меняется активность, в той же транзакции корректируется счётчик активных ссылок пользователя,
+    а ``deactivated_at`` получает момент первой деактивации (при активации сбрасывается).
 
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
     :param url_id: Идентификатор URL.
     :type url_id: int
-    :returns: None
+    :param user_id: Идентификатор владельца.
+    :type user_id: int
+    :param values: Новые значения полей.
+    :type values: dict
+    :returns: Изменённая запись URL или None, если URL не найден или принадлежит другому пользователю.
+    :rtype: URLResponse | None
     """
+    if "is_active" in values:
+        deactivated_at = None if values["is_active"] else func.coalesce(URL.deactivated_at, func.now())
+        values = {**values, "deactivated_at": deactivated_at}
     try:
-        await session.execute(update(URL).where(URL.id == url_id).values(click_count=URL.click_count + 1))
+        previous = _locked_activity(and_(URL.id == url_id, URL.user_id == user_id))
+        result = await session.execute(
+            update(URL)
+            .where(URL.id == previous.c.id)
+            .values(**values)
+            .returning(*URL_RESPONSE_COLUMNS, previous.c.was_active)
+        )
+        row = result.one_or_none()
+        if not row:
+            await session.rollback()
+            return None
+        url = _url_response(row)
+        await add_user_link_stats(session, {user_id: (0, int(url.is_active) - int(row.was_active))})
         await session.commit()
+        return url
     except Exception as e:
-        logger.error(f"Error incrementing click count for URL id {url_id}: {e}")
+        logger.error(f"Error updating URL with id {url_id}: {e}")
         raise
 
 
-async def delete_url(session: AsyncSession, url_id: int) -> bool:
+async def delete_url(session: AsyncSession, url_id: int, user_id: int) -> str | None:
     """
-    Удаляет URL по идентификатору.
+    Удаляет URL пользователя по идентификатору одним выражением (проверка владельца — в ``WHERE``).
+
+    В той же транзакции уменьшаются счётчики ссылок пользователя.
 
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
     :param url_id: Идентификатор URL.
     :type url_id: int
-    :returns: True если удаление успешно, False если URL не найден.
-    :rtype: bool
+    :param user_id: Идентификатор владельца.
+    :type user_id: int
+    :returns: Короткий ключ удалённой ссылки или None, если URL не найден или принадлежит другому пользователю.
+    :rtype: str | None
     """
     try:
-        result = await session.execute(delete(URL).where(URL.id == url_id))
+        result = await session.execute(
+            delete(URL).where(URL.id == url_id, URL.user_id == user_id).returning(URL.short_key, URL.is_active)
+        )
+        row = result.one_or_none()
+        if row:
+            await add_user_link_stats(session, {user_id: (-1, -int(row.is_active))})
         await session.commit()
-        rowcount = result.rowcount
-        if rowcount > 0:
-            return True
-        return False
+        return row.short_key if row else None
     except Exception as e:
         logger.error(f"Error deleting URL with id {url_id}: {e}")
         raise
+
+
+async def apply_bulk_action(
+    session: AsyncSession,
+    user_id: int,
+    action: BulkAction,
+    ids: list[int] | None = None,
+    is_active: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    after_id: int = 0,
+    limit: int = 1000,
+) -> list[tuple[int, str]]:
+    """
+    Деактивирует или удаляет пачку ссылок пользователя одним выражением ``UPDATE``/``DELETE ... RETURNING``.
+
+    Ссылки отбираются либо по списку ``ids`` (``id = ANY(:ids)``), либо по фильтру: первые ``limit`` ссылок
+    с ``id > after_id``. Чужие ссылки отсекаются условием ``user_id`` в том же выражении. В той же транзакции
+    корректируются счётчики ссылок пользователя; активность деактивируемых ссылок до изменения читается из
+    строк, заблокированных тем же выражением.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор владельца.
+    :type user_id: int
+    :param action: Действие (deactivate, delete).
+    :type action: BulkAction
+    :param ids: Идентификаторы ссылок (None — отбор по фильтру).
+    :type ids: list[int] | None
+    :param is_active: Фильтр по активным ссылкам (True/False или None для всех).
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :param after_id: Отбор по фильтру начинается после этого id.
+    :type after_id: int
+    :param limit: Максимальное количество ссылок при отборе по фильтру.
+    :type limit: int
+    :returns: Идентификаторы и короткие ключи затронутых ссылок по возрастанию id.
+    :rtype: list[tuple[int, str]]
+    """
+    if ids is not None:
+        condition = and_(URL.user_id == user_id, URL.id == any_(literal(ids, ARRAY(Integer))))
+    else:
+        picked = (
+            select(URL.id)
+            .where(*_user_urls_filter(user_id, is_active, created_from, created_to), URL.id > after_id)
+            .order_by(URL.id)
+            .limit(limit)
+        )
+        condition = URL.id.in_(picked.scalar_subquery())
+    if action == "delete":
+        statement = delete(URL).where(condition).returning(URL.id, URL.short_key, URL.is_active.label("was_active"))
+    else:
+        previous = _locked_activity(condition)
+        statement = (
+            update(URL)
+            .where(URL.id == previous.c.id)
+            .values(is_active=False, deactivated_at=func.coalesce(URL.deactivated_at, func.now()))
+            .returning(URL.id, URL.short_key, previous.c.was_active)
+        )
+    try:
+        rows = (await session.execute(statement)).all()
+        deactivated = sum(row.was_active for row in rows)
+        await add_user_link_stats(session, {user_id: (-len(rows) if action == "delete" else 0, -deactivated)})
+        await session.commit()
+        return sorted((row.id, row.short_key) for row in rows)
+    except Exception as e:
+        logger.error(f"Error applying bulk {action} for user_id {user_id}: {e}")
+        raise
+
+
+async def notify_url_changes(session: AsyncSession, channel: str, short_keys: list[str]) -> None:
+    """
+    Отправляет по уведомлению ``NOTIFY`` на каждый изменённый короткий ключ одним запросом.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param channel: Канал уведомлений.
+    :type channel: str
+    :param short_keys: Короткие ключи изменённых ссылок.
+    :type short_keys: list[str]
+    :returns: None
+    """
+    await session.execute(
+        text("SELECT pg_notify(:channel, short_key) FROM unnest(CAST(:short_keys AS text[])) AS short_key"),
+        {"channel": channel, "short_keys": short_keys},
+    )
+    await session.commit()
+
+
+async def get_url_owner_ids(session: AsyncSession, ids: Iterable[int]) -> list[int]:
+    """
+    Возвращает владельцев ссылок с переданными идентификаторами.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param ids: Идентификаторы ссылок.
+    :type ids: Iterable[int]
+    :returns: Идентификаторы пользователей без повторов.
+    :rtype: list[int]
+    """
+    result = await session.execute(
+        select(URL.user_id).where(URL.id == any_(literal(list(ids), ARRAY(Integer)))).distinct()
+    )
+    return list(result.scalars())
+
+
+async def reconcile_user_link_stats(
+    session: AsyncSession, after_user_id: int, batch_size: int
+) -> tuple[int | None, int]:
+    """
+    Сверяет счётчики ссылок пачки пользователей с ``count(*)`` по их ссылкам и исправляет расхождения.
+
+    Пачка — следующие ``batch_size`` пользователей с ``user_id > after_user_id``, у которых есть ссылки или
+    счётчики. Строки счётчиков блокируются до подсчёта, поэтому приложение не изменит их между подсчётом и
+    исправлением, а подсчёт (отдельным выражением) видит все уже зафиксированные ссылки. Отсутствующие строки
+    вставляются без перезаписи: если их одновременно создало приложение, расхождение исправит следующая сверка.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param after_user_id: Сверка начинается после этого пользователя.
+    :type after_user_id: int
+    :param batch_size: Количество пользователей в пачке.
+    :type batch_size: int
+    :returns: Последний сверенный пользователь (None — пользователи закончились) и количество исправленных строк.
+    :rtype: tuple[int | None, int]
+    """
+    try:
+        candidates = union(
+            select(URL.user_id).where(URL.user_id > after_user_id),
+            select(UserLinkStats.user_id).where(UserLinkStats.user_id > after_user_id),
+        ).subquery()
+        user_ids = list(
+            await session.scalars(select(candidates.c.user_id).order_by(candidates.c.user_id).limit(batch_size))
+        )
+        if not user_ids:
+            await session.rollback()
+            return None, 0
+        in_batch = literal(user_ids, ARRAY(Integer))
+        stored = await session.execute(
+            select(UserLinkStats.user_id, UserLinkStats.total, UserLinkStats.active)
+            .where(UserLinkStats.user_id == any_(in_batch))
+            .order_by(UserLinkStats.user_id)
+            .with_for_update()
+        )
+        stored_counts = {user_id: (total, active) for user_id, total, active in stored}
+        actual = await session.execute(
+            select(URL.user_id, func.count(), func.count().filter(URL.is_active))
+            .where(URL.user_id == any_(in_batch))
+            .group_by(URL.user_id)
+        )
+        actual_counts = {user_id: (total, active) for user_id, total, active in actual}
+
+        drifted = []
+        for user_id in user_ids:
+            total, active = actual_counts.get(user_id, (0, 0))
+            if stored_counts.get(user_id, (0, 0)) != (total, active):
+                drifted.append({"user_id": user_id, "total": total, "active": active})
+        if stale := [row for row in drifted if row["user_id"] in stored_counts]:
+            await session.execute(update(UserLinkStats), stale)
+        if missing := [row for row in drifted if row["user_id"] not in stored_counts]:
+            await session.execute(pg_insert(UserLinkStats).on_conflict_do_nothing(), missing)
+        await session.commit()
+        return user_ids[-1], len(drifted)
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error reconciling link stats after user_id {after_user_id}: {e}")
+        raise
+
+
+async def get_existing_url_ids(session: AsyncSession, ids: list[int]) -> set[int]:
+    """
+    Возвращает те из переданных идентификаторов, для которых есть ссылки (у любого пользователя).
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param ids: Идентификаторы ссылок.
+    :type ids: list[int]
+    :returns: Существующие идентификаторы.
+    :rtype: set[int]
+    """
+    result = await session.execute(select(URL.id).where(URL.id == any_(literal(ids, ARRAY(Integer)))))
+    return set(result.scalars())
+
+
+async def sweep_dead_urls(
+    session: AsyncSession, cutoff: datetime, batch_size: int, archive: bool, lock_key: int, bump_versions: bool = False
+) -> list[int] | None:
+    """
+    Удаляет (или переносит в архив) одну пачку мёртвых ссылок в отдельной короткой транзакции.
+
+    Мёртвой считается ссылка, истёкшая раньше ``cutoff``, или ссылка, деактивированная раньше ``cutoff``
+    (по ``deactivated_at``). Строки выбираются через ``FOR UPDATE SKIP LOCKED``, поэтому чистильщик не ждёт
+    строки, занятые запросами приложения. Транзакция берёт ``pg_try_advisory_xact_lock(lock_key)``: если
+    блокировку держит другой экземпляр приложения, пачка не обрабатывается. Обе блокировки снимаются при
+    фиксации транзакции.
+    В той же транзакции уменьшаются счётчики ссылок владельцев. При переносе в архив тем же выражением
+    в архивную строку добавляются ещё не сжатые шарды счётчика переходов (занятые писателем строки шардов
+    пропускаются, их позже перенесёт в архив :func:`~app.db.crud.click_event.compact_click_shards`).
+    Если версии ссылок пользователей хранятся в той же базе, они увеличиваются в этой же транзакции.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param cutoff: Граница с учётом отсрочки.
+    :type cutoff: datetime
+    :param batch_size: Максимальное количество строк в пачке.
+    :type batch_size: int
+    :param archive: Переносить строки в ``urls_archive`` вместо удаления.
+    :type archive: bool
+    :param lock_key: Ключ рекомендательной блокировки чистильщика.
+    :type lock_key: int
+    :param bump_versions: Увеличить версии ссылок владельцев в той же транзакции.
+    :type bump_versions: bool
+    :returns: Владельцы обработанных строк (по одному на строку) или None, если блокировку держит другой экземпляр.
+    :rtype: list[int] | None
+    """
+    try:
+        if not await session.scalar(select(func.pg_try_advisory_xact_lock(lock_key))):
+            await session.rollback()
+            return None
+        dead = (
+            select(URL.id)
+            .where(or_(URL.expires_at < cutoff, and_(URL.is_active.is_(False), URL.deactivated_at < cutoff)))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("dead")
+        )
+        removed = delete(URL).where(URL.id.in_(select(dead.c.id)))
+        if archive:
+            # В архив переносятся колонки, общие с urls (без генерируемого url_hash)
+            columns = [column.name for column in URL.__table__.columns if column.name in URLArchive.__table__.c]
+            moved = removed.returning(*URL.__table__.columns).cte("moved")
+            shards = URLClickShard.__table__
+            pending_shards = (
+                select(shards.c.url_id, shards.c.shard)
+                .where(shards.c.url_id.in_(select(dead.c.id)))
+                .with_for_update(skip_locked=True)
+                .cte("pending_shards")
+            )
+            pending = (
+                delete(shards)
+                .where(
+                    tuple_(shards.c.url_id, shards.c.shard).in_(select(pending_shards.c.url_id, pending_shards.c.shard))
+                )
+                .returning(shards.c.url_id, shards.c.count)
+                .cte("pending")
+            )
+            pending_clicks = (
+                select(cast(func.coalesce(func.sum(pending.c.count), 0), Integer))
+                .where(pending.c.url_id == moved.c.id)
+                .scalar_subquery()
+            )
+            values = [moved.c[name] + pending_clicks if name == "click_count" else moved.c[name] for name in columns]
+            statement = (
+                insert(URLArchive)
+                .from_select(columns, select(*values))
+                .returning(URLArchive.user_id, URLArchive.is_active)
+            )
+        else:
+            statement = removed.returning(URL.user_id, URL.is_active)
+        rows = (await session.execute(statement)).all()
+        deltas: dict[int, tuple[int, int]] = {}
+        for owner_id, was_active in rows:
+            total, active = deltas.get(owner_id, (0, 0))
+            deltas[owner_id] = (total - 1, active - int(was_active))
+        await add_user_link_stats(session, deltas)
+        if bump_versions:
+            await bump_user_versions(session, deltas)
+        await session.commit()
+        return [owner_id for owner_id, _ in rows]
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error sweeping dead URLs: {e}")
+        raise
+
+
+async def get_urls_partition_column(session: AsyncSession) -> str | None:
+    """
+    Определяет колонку секционирования таблицы ``urls``.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :returns: Имя колонки или None, если таблица не секционирована.
+    :rtype: str | None
+    """
+    return await session.scalar(
+        text(
+            "SELECT a.attname FROM pg_partitioned_table p "
+            "JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0] "
+            "WHERE p.partrelid = 'urls'::regclass"
+        )
+    )
+
+
+async def get_url_partition_months(session: AsyncSession) -> list[date]:
+    """
+    Возвращает месяцы присоединённых секций ``urls`` (без секции по умолчанию).
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :returns: Первые дни месяцев по возрастанию.
+    :rtype: list[date]
+    """
+    names = await session.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'urls'::regclass"
+        )
+    )
+    return sorted(month for month in map(url_partition_month, names) if month)
+
+
+async def ensure_url_partitions(session: AsyncSession, first_month: date, months: int) -> None:
+    """
+    Создаёт месячные секции ``urls`` на ``months`` месяцев начиная с ``first_month``, если их ещё нет.
+
+    Как и для ``click_events``, каждая секция создаётся в отдельной транзакции: если строки этого месяца уже
+    попали в ``urls_default``, создание завершится ошибкой, и они останутся в секции по умолчанию.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param first_month: Первый день первого месяца.
+    :type first_month: date
+    :param months: Количество месяцев.
+    :type months: int
+    :returns: None
+    """
+    for offset in range(months):
+        month = add_months(first_month, offset)
+        try:
+            await session.execute(text(create_url_partition_statement(month)))
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.warning(f"Failed to create urls partition for {month:%Y-%m}: {e}")
+
+
+async def detach_url_partition(
+    session: AsyncSession, name: str, cutoff: datetime, release_keys: bool, drop: bool, lock_key: int
+) -> bool:
+    """
+    Отсоединяет секцию ``urls``, если в ней не осталось живых ссылок.
+
+    Живая ссылка — та, которую не удалил бы :func:`sweep_dead_urls` с той же границей ``cutoff``. Если секция
+    остаётся архивом, перед отсоединением в её строки переносятся ещё не сжатые шарды счётчика переходов.
+    В той же транзакции уменьшаются счётчики ссылок владельцев и увеличиваются их версии ссылок, чтобы ETag
+    списка ссылок перестал совпадать.
+    ``DETACH PARTITION`` берёт эксклюзивную блокировку ``urls``, поэтому ожидание ограничено ``lock_timeout``:
+    если таблица занята, попытка повторится при следующем запуске обслуживания.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param name: Имя секции.
+    :type name: str
+    :param cutoff: Граница с учётом отсрочки.
+    :type cutoff: datetime
+    :param release_keys: Удалить ключи ссылок секции из ``url_keys``, разрешив их повторное использование.
+    :type release_keys: bool
+    :param drop: Удалить отсоединённую секцию (иначе она остаётся отдельной таблицей-архивом).
+    :type drop: bool
+    :param lock_key: Ключ рекомендательной блокировки обслуживания.
+    :type lock_key: int
+    :returns: True, если секция отсоединена.
+    :rtype: bool
+    """
+    try:
+        if not await session.scalar(select(func.pg_try_advisory_xact_lock(lock_key))):
+            await session.rollback()
+            return False
+        live = await session.scalar(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {name} "
+                "WHERE expires_at >= :cutoff AND (is_active OR deactivated_at IS NULL OR deactivated_at >= :cutoff))"
+            ),
+            {"cutoff": cutoff},
+        )
+        if live:
+            await session.rollback()
+            return False
+        await session.execute(text("SET LOCAL lock_timeout = '2s'"))
+        if not drop:
+            await session.execute(
+                text(
+                    "WITH pending AS (DELETE FROM url_click_shards s USING "
+                    f"{name} p WHERE s.url_id = p.id RETURNING s.url_id, s.count) "
+                    f"UPDATE {name} p SET click_count = p.click_count + t.clicks "
+                    "FROM (SELECT url_id, sum(count)::integer AS clicks FROM pending GROUP BY url_id) t "
+                    "WHERE p.id = t.url_id"
+                )
+            )
+        await session.execute(text(f"ALTER TABLE urls DETACH PARTITION {name}"))
+        # Отсоединённую секцию уже никто не изменяет: считаем ссылки владельцев по ней
+        counts = await session.execute(
+            text(f"SELECT user_id, count(*), count(*) FILTER (WHERE is_active) FROM {name} GROUP BY user_id")
+        )
+        deltas = {user_id: (-total, -active) for user_id, total, active in counts}
+        if release_keys:
+            await session.execute(
+                text(f"DELETE FROM url_keys k USING {name} p WHERE k.short_key = p.short_key AND k.url_id = p.id")
+            )
+        if drop:
+            await session.execute(text(f"DROP TABLE {name}"))
+        await add_user_link_stats(session, deltas)
+        await bump_user_versions(session, deltas)
+        await session.commit()
+        return True
+    except Exception as e:
+        await session.rollback()
+        logger.warning(f"Failed to detach urls partition {name}: {e}")
+        return False
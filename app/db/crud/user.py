@@ -1,9 +1,12 @@
+from collections.abc import Iterable
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.auth.utils import get_password_hash
 from app.core.logging import logger
-from app.db.models import User
+from app.db.models import User, UserVersion
 from app.schemas.user import UserCreate, UserResponse
 
 
@@ -50,3 +53,40 @@ async def get_user_by_username(session: AsyncSession, username: str) -> UserResp
     except Exception as e:
         logger.error(f"Error retrieving user {username}: {e}")
         raise
+
+
+async def get_user_version(session: AsyncSession, user_id: int) -> int:
+    """
+    Получает версию ссылок пользователя одним чтением по первичному ключу.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :returns: Версия (0, если ссылки пользователя ещё не менялись).
+    :rtype: int
+    """
+    version = await session.scalar(select(UserVersion.version).where(UserVersion.user_id == user_id))
+    return version or 0
+
+
+async def bump_user_versions(session: AsyncSession, user_ids: Iterable[int]) -> None:
+    """
+    Увеличивает версии ссылок пользователей одним выражением (без фиксации транзакции).
+
+    Строки обновляются в порядке id, чтобы параллельные транзакции не блокировали друг друга взаимно.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param user_ids: Идентификаторы пользователей.
+    :type user_ids: Iterable[int]
+    :returns: None
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    table = UserVersion.__table__
+    statement = pg_insert(table).on_conflict_do_update(
+        index_elements=[table.c.user_id], set_={"version": table.c.version + 1}
+    )
+    await session.execute(statement, [{"user_id": user_id, "version": 1} for user_id in user_ids])
@@ -0,0 +1,153 @@
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import DB_QUERY_DURATION
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """
+    Статистика SQL-выражений в рамках отслеживаемого участка кода (обычно одного HTTP-запроса).
+
+    :param count: Количество выполненных выражений.
+    :type count: int
+    :param duration: Суммарное время выполнения (сек).
+    :type duration: float
+    :param statements: Количество выполнений каждого текста выражения (для поиска N+1).
+    :type statements: dict[str, int]
+    """
+
+    count: int = 0
+    duration: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        """
+        Возвращает выражение, выполненное наибольшее число раз.
+
+        :returns: Текст выражения и количество выполнений или None, если выражений не было.
+        :rtype: tuple[str, int] | None
+        """
+        if not self.statements:
+            return None
+        return max(self.statements.items(), key=lambda item: item[1])
+
+
+# Стек активных трекеров: выражение учитывается во всех вложенных участках (тест → HTTP-запрос)
+_active_query_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar("active_query_stats", default=())
+
+_START_TIMES_KEY = "query_start_times"
+
+
+@contextmanager
+def track_queries() -> Generator[QueryStats, None, None]:
+    """
+    Учитывает SQL-выражения, выполненные внутри блока в текущем контексте (задаче asyncio).
+
+    Используется middleware метрик для каждого запроса и тестами для фиксации бюджета запросов.
+
+    :returns: Статистика, наполняемая по мере выполнения выражений.
+    :rtype: Generator[QueryStats, None, None]
+    """
+    stats = QueryStats()
+    token = _active_query_stats.set((*_active_query_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active_query_stats.reset(token)
+
+
+def redact_parameters(parameters: Any) -> str:  # noqa: ANN401
+    """
+    Описывает параметры выражения без значений: только имена (если есть) и типы.
+
+    :param parameters: Параметры DBAPI (последовательность, словарь или список наборов для executemany).
+    :type parameters: Any
+    :returns: Строка для лога.
+    :rtype: str
+    """
+    if isinstance(parameters, Mapping):
+        return "{" + ", ".join(f"{key}=<{type(value).__name__}>" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, list | tuple):
+        if parameters and isinstance(parameters[0], Mapping | list | tuple):
+            return f"<{len(parameters)} parameter sets>"
+        return "(" + ", ".join(f"<{type(value).__name__}>" for value in parameters) + ")"
+    return f"<{type(parameters).__name__}>"
+
+
+def _before_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool  # noqa: ANN401
+) -> None:
+    """
+    Запоминает время начала выполнения выражения.
+
+    :param conn: Соединение SQLAlchemy.
+    :type conn: Connection
+    :returns: None
+    """
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool  # noqa: ANN401
+) -> None:
+    """
+    Учитывает длительность выражения в метриках и активных трекерах, логирует медленные выражения.
+
+    :param conn: Соединение SQLAlchemy.
+    :type conn: Connection
+    :param statement: Текст SQL-выражения.
+    :type statement: str
+    :param parameters: Параметры выражения.
+    :type parameters: Any
+    :returns: None
+    """
+    duration = time.perf_counter() - conn.info[_START_TIMES_KEY].pop()
+    DB_QUERY_DURATION.observe(duration)
+    for stats in _active_query_stats.get():
+        stats.count += 1
+        stats.duration += duration
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(f"Slow query ({duration * 1000:.1f} ms): {statement} params={redact_parameters(parameters)}")
+
+
+def _handle_error(exception_context: ExceptionContext) -> None:
+    """
+    Убирает время начала выражения, завершившегося ошибкой.
+
+    :param exception_context: Контекст ошибки SQLAlchemy.
+    :type exception_context: ExceptionContext
+    :returns: None
+    """
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(_START_TIMES_KEY):
+        connection.info[_START_TIMES_KEY].pop()
+
+
+def instrument_engine(engine: AsyncEngine | Engine) -> None:
+    """
+    Подключает учёт времени SQL-выражений к движку (повторный вызов ничего не меняет).
+
+    :param engine: Асинхронный или синхронный движок SQLAlchemy.
+    :type engine: AsyncEngine | Engine
+    :returns: None
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(sync_engine, name, listener):
+            event.listen(sync_engine, name, listener)
@@ -1,5 +1,26 @@
 from .base import Base
+from .click_event import ClickEvent
+from .click_rollup import URLClicksDaily, URLClicksHourly
+from .click_shard import URLClickShard
 from .url import URL
+from .url_archive import URLArchive
+from .url_key import URLKey
 from .user import User
+from .user_link_stats import UserLinkStats
+from .user_version import UserVersion
+from .visitor_sketch import URLVisitorSketch
 
-__all__ = ["Base", "URL", "User"]
+__all__ = [
+    "Base",
+    "ClickEvent",
+    "URL",
+    "URLArchive",
+    "URLClickShard",
+    "URLKey",
+    "URLClicksDaily",
+    "URLClicksHourly",
+    "URLVisitorSketch",
+    "User",
+    "UserLinkStats",
+    "UserVersion",
+]
@@ -0,0 +1,34 @@
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Identity, Index, Integer, String, event
+
+from app.db.models.base import Base
+
+
+class ClickEvent(Base):
+    """
+    Модель события перехода по короткой ссылке.
+
+    Таблица секционирована по дням (``RANGE (clicked_at)``): секции на ближайшие дни создаёт фоновый
+    писатель событий, события вне созданных секций попадают в секцию ``click_events_default``.
+    Внешнего ключа на ``urls`` нет: таблица только дополняется пачками, а проверка ключа удорожала бы вставку.
+    """
+
+    __tablename__ = "click_events"
+    __table_args__ = (
+        Index("ix_click_events_url_id_clicked_at", "url_id", "clicked_at"),
+        {"postgresql_partition_by": "RANGE (clicked_at)"},
+    )
+
+    # Первичный ключ секционированной таблицы обязан включать ключ секционирования
+    id = Column(BigInteger, Identity(), primary_key=True)
+    clicked_at = Column(DateTime(timezone=True), primary_key=True)
+    url_id = Column(Integer, nullable=False)
+    referrer = Column(String, nullable=True)
+    user_agent = Column(String, nullable=True)
+    client_network = Column(String(43), nullable=True)
+
+
+event.listen(
+    ClickEvent.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS click_events_default PARTITION OF click_events DEFAULT"),
+)
@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, Integer
+
+from app.db.models.base import Base
+
+
+class URLClicksHourly(Base):
+    """
+    Модель почасовой сводки переходов по ссылке.
+
+    Обновляется фоновым писателем событий в той же транзакции, что и ``click_events``. Как и у событий,
+    внешнего ключа на ``urls`` нет: удаление ссылки не должно ломать запись уже накопленной пачки.
+    """
+
+    __tablename__ = "url_clicks_hourly"
+
+    url_id = Column(Integer, primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    clicks = Column(BigInteger, nullable=False, default=0)
+
+
+class URLClicksDaily(Base):
+    """Модель дневной сводки переходов по ссылке (день в UTC)."""
+
+    __tablename__ = "url_clicks_daily"
+
+    url_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    clicks = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger
+
+from app.db.models.base import Base
+
+
+class URLClickShard(Base):
+    """
+    Модель шарда счётчика переходов по ссылке.
+
+    Фоновый писатель увеличивает счётчик в строке ``(url_id, shard)`` своего процесса, а не в строке ``urls``,
+    поэтому записи переходов по одной популярной ссылке не сериализуются на одной строке и не блокируют её
+    удаление или деактивацию. Периодическое сжатие переносит накопленные значения в ``urls.click_count``.
+    """
+
+    __tablename__ = "url_click_shards"
+
+    url_id = Column(Integer, primary_key=True)
+    shard = Column(SmallInteger, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
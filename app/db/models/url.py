@@ -1,24 +1,50 @@
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    cast,
+    select,
+    text,
+)
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 
 from app.db.models.base import Base
+from app.db.models.click_shard import URLClickShard
 
 
 class URL(Base):
     """Модель для хранения коротких URL."""
 
     __tablename__ = "urls"
+    __table_args__ = (
+        # Поиск деактивированных ссылок фоновым чистильщиком без просмотра всей таблицы
+        Index("ix_urls_inactive_deactivated_at", "deactivated_at", postgresql_where=text("NOT is_active")),
+        # Поиск уже сокращённого пользователем URL по индексу фиксированной ширины
+        Index("ix_urls_user_id_url_hash", "user_id", "url_hash"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    original_url = Column(String, nullable=False, index=True)
+    original_url = Column(String, nullable=False)
+    # 16-байтовый MD5 исходного URL, вычисляется PostgreSQL (STORED), поэтому всегда соответствует original_url
+    url_hash = Column(LargeBinary, Computed("decode(md5(original_url), 'hex')", persisted=True))
     short_key = Column(String, unique=True, index=True, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Момент деактивации: от него отсчитывается отсрочка чистильщика; NULL у активных ссылок
+    deactivated_at = Column(DateTime(timezone=True), nullable=True)
     expires_at = Column(
         DateTime(timezone=True),
         nullable=False,
+        index=True,
         default=lambda: datetime.now(UTC) + timedelta(days=1),
     )
     created_at = Column(
@@ -27,6 +53,15 @@ class URL(Base):
         server_default=func.now(),
         nullable=False,
     )
-    click_count = Column(Integer, default=0, nullable=False)
+    stored_click_count = Column("click_count", Integer, default=0, nullable=False)
+    # Переходы, уже перенесённые в ``urls``, плюс ещё не сжатые шарды счётчика
+    # (sum(bigint) в PostgreSQL возвращает numeric, поэтому сумма приводится обратно к bigint)
+    click_count = column_property(
+        stored_click_count
+        + select(cast(func.coalesce(func.sum(URLClickShard.count), 0), BigInteger))
+        .where(URLClickShard.url_id == id)
+        .scalar_subquery()
+    )
+    redirect_code = Column(Integer, default=307, server_default="307", nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="urls")
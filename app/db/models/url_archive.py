@@ -0,0 +1,27 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.models.base import Base
+
+
+class URLArchive(Base):
+    """
+    Модель архива ссылок, удалённых фоновым чистильщиком.
+
+    Колонки повторяют ``urls``. Короткий ключ не уникален: если освобождение ключей включено, тот же ключ может
+    попасть в архив повторно. Внешнего ключа на ``users`` нет, архив не должен мешать удалению пользователя.
+    """
+
+    __tablename__ = "urls_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    original_url = Column(String, nullable=False)
+    short_key = Column(String, index=True, nullable=False)
+    is_active = Column(Boolean, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    deactivated_at = Column(DateTime(timezone=True), nullable=True)
+    click_count = Column(Integer, nullable=False)
+    redirect_code = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db.models.base import Base
+
+
+class URLKey(Base):
+    """
+    Модель глобального индекса коротких ключей.
+
+    Нужна, когда ``urls`` секционирована (см. ``app.db.partitioning``): уникальный индекс секционированной
+    таблицы обязан включать колонку секционирования, поэтому уникальность ``short_key`` между секциями
+    обеспечивает эта таблица. Её поддерживает триггер на ``urls``; для обычной таблицы она пуста. Ключи ссылок
+    из отсоединённых секций остаются здесь, пока освобождение ключей не разрешено.
+    """
+
+    __tablename__ = "url_keys"
+
+    short_key = Column(String, primary_key=True)
+    url_id = Column(Integer, nullable=False)
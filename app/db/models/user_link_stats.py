@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Column, Integer
+
+from app.db.models.base import Base
+
+
+class UserLinkStats(Base):
+    """
+    Модель счётчиков ссылок пользователя: всего и активных.
+
+    Счётчики изменяются в той же транзакции, что и сами ссылки (создание, удаление, деактивация, чистильщик), поэтому
+    общее количество для списка ссылок читается одной строкой вместо ``count(*)`` по ссылкам пользователя. Таблица
+    хранится рядом с ``urls`` (в каждом шарде — счётчики ссылок этого шарда); расхождения после записи в обход
+    приложения исправляет периодическая сверка.
+    """
+
+    __tablename__ = "user_link_stats"
+
+    user_id = Column(Integer, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    active = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+
+from app.db.models.base import Base
+
+
+class UserVersion(Base):
+    """
+    Модель версии ссылок пользователя.
+
+    Версия увеличивается при каждом изменении, видимом в списке ссылок пользователя (создание, изменение,
+    удаление, записанные переходы, работа чистильщика), и служит основой ETag списка: пока версия не изменилась,
+    клиенту с ``If-None-Match`` отвечается 304 без чтения ссылок. Таблица хранится в основной базе рядом с ``users``.
+    """
+
+    __tablename__ = "user_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary
+from sqlalchemy.sql import func
+
+from app.db.models.base import Base
+
+
+class URLVisitorSketch(Base):
+    """Модель скетча HyperLogLog уникальных посетителей ссылки (регистры ``app.core.hyperloglog``)."""
+
+    __tablename__ = "url_visitor_sketches"
+
+    url_id = Column(Integer, primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,231 @@
+from datetime import date, datetime
+
+# Колонки, по которым допускается секционирование ``urls``
+URLS_PARTITION_COLUMNS = ("created_at", "expires_at")
+
+# Индексы ``urls`` в том виде, в каком их создают модель и миграции; у секционированной таблицы
+# ``short_key`` не может быть уникальным (в ключ уникальности обязана входить колонка секционирования),
+# уникальность обеспечивает таблица ``url_keys``
+_URLS_INDEXES = (
+    "CREATE INDEX ix_urls_id ON urls (id)",
+    "CREATE INDEX ix_urls_expires_at ON urls (expires_at)",
+    # До миграции deactivated_at отсрочка деактивированных ссылок отсчитывалась от created_at
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'urls' AND column_name = 'deactivated_at'
+        ) THEN
+            CREATE INDEX ix_urls_inactive_deactivated_at ON urls (deactivated_at) WHERE NOT is_active;
+        ELSE
+            CREATE INDEX ix_urls_inactive_created_at ON urls (created_at) WHERE NOT is_active;
+        END IF;
+    END $$
+    """,
+    # До миграции url_hash поиск по исходному URL шёл по btree на original_url
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'urls' AND column_name = 'url_hash'
+        ) THEN
+            CREATE INDEX ix_urls_user_id_url_hash ON urls (user_id, url_hash);
+        ELSE
+            CREATE INDEX ix_urls_original_url ON urls (original_url);
+        END IF;
+    END $$
+    """,
+)
+
+# Поддержка ``url_keys``: ключ ссылки заносится при вставке и удаляется вместе со ссылкой. Вставка занятого
+# ключа завершается ``unique_violation``, как при обычном уникальном индексе. Функция идемпотентна: при переносе
+# строки между секциями PostgreSQL может вызвать как UPDATE, так и пару DELETE + INSERT.
+_URL_KEYS_TRIGGER = (
+    """
+    CREATE OR REPLACE FUNCTION url_keys_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            DELETE FROM url_keys WHERE short_key = OLD.short_key AND url_id = OLD.id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO url_keys (short_key, url_id) VALUES (NEW.short_key, NEW.id) ON CONFLICT DO NOTHING;
+            IF NOT FOUND AND NOT EXISTS (
+                SELECT 1 FROM url_keys WHERE short_key = NEW.short_key AND url_id = NEW.id
+            ) THEN
+                RAISE EXCEPTION 'duplicate key value violates unique constraint "url_keys_pkey"'
+                    USING ERRCODE = 'unique_violation',
+                          DETAIL = format('Key (short_key)=(%s) already exists.', NEW.short_key);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "CREATE TRIGGER url_keys_sync AFTER INSERT OR DELETE OR UPDATE OF id, short_key ON urls "
+    "FOR EACH ROW EXECUTE FUNCTION url_keys_sync()",
+)
+
+
+def month_start(value: date | datetime) -> date:
+    """
+    Возвращает первый день месяца.
+
+    :param value: Дата или время.
+    :type value: date | datetime
+    :returns: Первый день месяца.
+    :rtype: date
+    """
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Сдвигает первый день месяца на ``months`` месяцев.
+
+    :param month: Первый день месяца.
+    :type month: date
+    :param months: Количество месяцев (может быть отрицательным).
+    :type months: int
+    :returns: Первый день получившегося месяца.
+    :rtype: date
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def url_partition_name(month: date) -> str:
+    """
+    Возвращает имя месячной секции ``urls``.
+
+    :param month: Первый день месяца.
+    :type month: date
+    :returns: Имя секции (например, ``urls_p202610``).
+    :rtype: str
+    """
+    return f"urls_p{month:%Y%m}"
+
+
+def url_partition_month(name: str) -> date | None:
+    """
+    Разбирает месяц из имени секции ``urls``.
+
+    :param name: Имя таблицы.
+    :type name: str
+    :returns: Первый день месяца или None, если это не месячная секция.
+    :rtype: date | None
+    """
+    suffix = name.removeprefix("urls_p")
+    if suffix == name or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def create_url_partition_statement(month: date, table: str = "urls") -> str:
+    """
+    Возвращает DDL месячной секции ``urls`` (границы — полночь UTC).
+
+    :param month: Первый день месяца.
+    :type month: date
+    :param table: Секционированная таблица.
+    :type table: str
+    :returns: Выражение ``CREATE TABLE IF NOT EXISTS ... PARTITION OF``.
+    :rtype: str
+    """
+    upper = add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {url_partition_name(month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+    )
+
+
+def _copy_urls_statement(target: str) -> str:
+    """
+    Возвращает выражение копирования строк ``urls`` в ``target`` без генерируемых колонок.
+
+    В генерируемые колонки (``url_hash``) вставлять значения нельзя, их заново вычисляет PostgreSQL, поэтому
+    список колонок собирается из ``information_schema``.
+
+    :param target: Таблица, созданная как ``LIKE urls INCLUDING DEFAULTS INCLUDING GENERATED``.
+    :type target: str
+    :returns: SQL-выражение.
+    :rtype: str
+    """
+    return f"""
+    DO $$
+    DECLARE
+        columns text;
+    BEGIN
+        SELECT string_agg(quote_ident(column_name), ', ' ORDER BY ordinal_position) INTO columns
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'urls' AND is_generated = 'NEVER';
+        EXECUTE format('INSERT INTO {target} (%s) SELECT %s FROM urls', columns, columns);
+    END $$
+    """
+
+
+def partition_urls_statements(column: str, first_month: date, last_month: date) -> list[str]:
+    """
+    Возвращает DDL перевода ``urls`` в таблицу, секционированную по месяцам ``column``.
+
+    Таблица пересоздаётся с переносом строк: секции создаются с ``first_month`` по ``last_month``, строки вне
+    этого диапазона попадают в секцию ``urls_default``. Первичный ключ становится ``(id, column)``, а
+    уникальность коротких ключей обеспечивает ``url_keys``, которую поддерживает триггер.
+
+    :param column: Колонка секционирования (``created_at`` или ``expires_at``).
+    :type column: str
+    :param first_month: Первый месяц, для которого создаётся секция.
+    :type first_month: date
+    :param last_month: Последний месяц, для которого создаётся секция.
+    :type last_month: date
+    :returns: SQL-выражения в порядке выполнения.
+    :rtype: list[str]
+    :raises ValueError: Если колонка не поддерживается.
+    """
+    if column not in URLS_PARTITION_COLUMNS:
+        raise ValueError(f"urls can only be partitioned by {', '.join(URLS_PARTITION_COLUMNS)}")
+    statements = [
+        "CREATE TABLE urls_partitioned (LIKE urls INCLUDING DEFAULTS INCLUDING GENERATED) "
+        f"PARTITION BY RANGE ({column})",
+        "ALTER SEQUENCE urls_id_seq OWNED BY urls_partitioned.id",
+        "CREATE TABLE urls_default PARTITION OF urls_partitioned DEFAULT",
+    ]
+    month = first_month
+    while month <= last_month:
+        statements.append(create_url_partition_statement(month, "urls_partitioned"))
+        month = add_months(month, 1)
+    statements += [
+        _copy_urls_statement("urls_partitioned"),
+        "INSERT INTO url_keys (short_key, url_id) SELECT short_key, id FROM urls",
+        "DROP TABLE urls",
+        "ALTER TABLE urls_partitioned RENAME TO urls",
+        f"ALTER TABLE urls ADD CONSTRAINT urls_pkey PRIMARY KEY (id, {column})",
+        "ALTER TABLE urls ADD CONSTRAINT urls_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)",
+        "CREATE INDEX ix_urls_short_key ON urls (short_key)",
+        *_URLS_INDEXES,
+        *_URL_KEYS_TRIGGER,
+    ]
+    return statements
+
+
+def unpartition_urls_statements() -> list[str]:
+    """
+    Возвращает DDL обратного перевода ``urls`` в обычную таблицу (строки отсоединённых секций не возвращаются).
+
+    :returns: SQL-выражения в порядке выполнения.
+    :rtype: list[str]
+    """
+    return [
+        "CREATE TABLE urls_plain (LIKE urls INCLUDING DEFAULTS INCLUDING GENERATED)",
+        "ALTER SEQUENCE urls_id_seq OWNED BY urls_plain.id",
+        _copy_urls_statement("urls_plain"),
+        "DROP TABLE urls",
+        "DROP FUNCTION IF EXISTS url_keys_sync()",
+        "DELETE FROM url_keys",
+        "ALTER TABLE urls_plain RENAME TO urls",
+        "ALTER TABLE urls ADD CONSTRAINT urls_pkey PRIMARY KEY (id)",
+        "ALTER TABLE urls ADD CONSTRAINT urls_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)",
+        "CREATE UNIQUE INDEX ix_urls_short_key ON urls (short_key)",
+        *_URLS_INDEXES,
+    ]
@@ -2,36 +2,61 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 import sqlalchemy
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import (
+    DB_POOL_CHECKED_IN,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    REGISTRY,
+)
+from app.db.instrumentation import instrument_engine
 from app.db.models import Base
+from app.db.sharding import ShardRouter
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """
+    Создаёт инструментированный асинхронный движок с настройками пула приложения.
+
+    :param url: URL базы данных.
+    :type url: str
+    :returns: Асинхронный движок SQLAlchemy.
+    :rtype: AsyncEngine
+    """
+    engine = create_async_engine(
+        url,
+        echo=False,
+        pool_size=25,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_recycle=1800,  # Время жизни соединения в пуле перед пересозданием (сек)
+        isolation_level="READ COMMITTED",
+    )
+    instrument_engine(engine)
+    return engine
 
 
 class DatabaseManager:
     """Базовый класс для управления подключением к базе данных."""
 
-    def __init__(self, url: str | None = None) -> None:
+    def __init__(self, url: str | None = None, shard_urls: list[str] | None = None) -> None:
         """
         Инициализирует подключение к базе данных PostgreSQL.
 
         :param url: Url БД
+        :param shard_urls: URL баз данных шардов ссылок (пусто — ссылки хранятся в основной базе).
         """
         if not url:
             url = settings.DATABASE_URL
 
-        self.engine = create_async_engine(
-            url,
-            echo=False,
-            pool_size=25,
-            max_overflow=10,
-            pool_timeout=30,
-            pool_recycle=1800,  # Время жизни соединения в пуле перед пересозданием (сек)
-            isolation_level="READ COMMITTED",
-        )
+        self.engine = create_engine(url)
         self.async_session = sessionmaker(self.engine, expire_on_commit=False, class_=AsyncSession)
+        self.shards = ShardRouter([create_engine(shard_url) for shard_url in shard_urls]) if shard_urls else None
 
     async def connect(self) -> None:
         """Проверяет подключение к базе данных и создаёт таблицы, если они не существуют."""
@@ -44,6 +69,8 @@ class DatabaseManager:
                     logger.info("Database tables created")
                 else:
                     logger.info("Database tables already exist")
+            if self.shards:
+                await self.shards.connect()
             logger.info("Successfully connected to PostgreSQL")
         except sqlalchemy.exc.OperationalError as e:
             logger.error(f"Database connection error: {type(e).__name__}: {str(e)}")
@@ -52,6 +79,8 @@ class DatabaseManager:
     async def close(self) -> None:
         """Закрывает все соединения с базой данных."""
         await self.engine.dispose()
+        if self.shards:
+            await self.shards.close()
         logger.info("Database connections closed")
 
     @asynccontextmanager
@@ -74,9 +103,18 @@ class DatabaseManager:
                 await session.close()
                 logger.debug("Session closed")
 
+    def collect_pool_metrics(self) -> None:
+        """Обновляет gauge-метрики пула соединений перед выгрузкой ``/metrics``."""
+        pool = self.engine.pool
+        DB_POOL_SIZE.set(pool.size())
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_CHECKED_IN.set(pool.checkedin())
+        DB_POOL_OVERFLOW.set(pool.overflow())
+
 
 # Глобальный экземпляр DatabaseManager
-db_manager = DatabaseManager()
+db_manager = DatabaseManager(shard_urls=settings.SHARD_DATABASE_URLS)
+REGISTRY.add_collector(db_manager.collect_pool_metrics)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
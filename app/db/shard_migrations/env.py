@@ -0,0 +1,55 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import Connection, create_engine
+
+from app.core.config import settings
+from app.db.sharding import SHARD_METADATA
+
+# Приложение передаёт открытое соединение шарда и его номер через ``config.attributes``
+# (см. ``ShardRouter.connect``); из командной строки (``alembic -n shards ...``) обходятся все шарды
+config = context.config
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+# Метаданные таблиц шарда для миграций
+target_metadata = SHARD_METADATA
+
+
+def run_migrations(connection: Connection) -> None:
+    """
+    Выполняет миграции на соединении с одним шардом.
+
+    :param connection: Синхронное соединение с базой данных шарда.
+    :type connection: Connection
+    :returns: None
+    """
+    context.configure(connection=connection, target_metadata=target_metadata)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """
+    Выполняет миграции на переданном соединении или на всех базах ``SHARD_DATABASE_URLS``.
+
+    :returns: None
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    shard_urls = settings.SHARD_DATABASE_URLS
+    for shard, shard_url in enumerate(shard_urls):
+        config.attributes.update(shard=shard, shard_count=len(shard_urls))
+        connectable = create_engine(shard_url.replace("asyncpg", "psycopg2"), poolclass=None)
+        with connectable.connect() as connection:
+            run_migrations(connection)
+        connectable.dispose()
+
+
+if context.is_offline_mode():
+    raise RuntimeError("Shard migrations need a database connection: the schema of a new shard depends on its number")
+run_migrations_online()
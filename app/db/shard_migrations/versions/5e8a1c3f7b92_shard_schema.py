@@ -0,0 +1,152 @@
+"""Shard schema: urls, urls_archive, url_click_shards, url_keys and user_link_stats.
+
+Earlier versions created shard tables with ``create_all``, which never changes existing tables. This revision
+brings such shards to the current schema (missing tables, columns and indexes, initial link counters) and
+creates the full schema in an empty shard.
+
+Revision ID: 5e8a1c3f7b92
+Revises:
+Create Date: 2026-10-21 15:32:18.640271
+"""
+
+from collections.abc import Sequence
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8a1c3f7b92"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def create_urls() -> None:
+    """
+    Создаёт ``urls`` с индексами и шагом последовательности id для номера шарда.
+
+    :returns: None
+    """
+    op.create_table(
+        "urls",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("original_url", sa.String(), nullable=False),
+        sa.Column("url_hash", sa.LargeBinary(), sa.Computed("decode(md5(original_url), 'hex')", persisted=True)),
+        sa.Column("short_key", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("deactivated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("click_count", sa.Integer(), nullable=False),
+        sa.Column("redirect_code", sa.Integer(), server_default="307", nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_urls_id"), "urls", ["id"], unique=False)
+    op.create_index(op.f("ix_urls_short_key"), "urls", ["short_key"], unique=True)
+    op.create_index(op.f("ix_urls_expires_at"), "urls", ["expires_at"], unique=False)
+    op.create_index("ix_urls_user_id_url_hash", "urls", ["user_id", "url_hash"], unique=False)
+    op.create_index(
+        "ix_urls_inactive_deactivated_at",
+        "urls",
+        ["deactivated_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_active"),
+    )
+    # id шарда i из N имеют вид i + 1 + k·N: по id ссылки известен её шард
+    attributes = context.config.attributes
+    op.execute(
+        f"ALTER SEQUENCE urls_id_seq INCREMENT BY {int(attributes['shard_count'])} "
+        f"RESTART WITH {int(attributes['shard']) + 1}"
+    )
+
+
+def upgrade_urls() -> None:
+    """
+    Добавляет в ``urls``, созданную ``create_all`` прежних версий, колонки и индексы, появившиеся позже.
+
+    :returns: None
+    """
+    op.execute(
+        "ALTER TABLE urls ADD COLUMN IF NOT EXISTS url_hash bytea "
+        "GENERATED ALWAYS AS (decode(md5(original_url), 'hex')) STORED"
+    )
+    op.execute("ALTER TABLE urls ADD COLUMN IF NOT EXISTS deactivated_at timestamptz")
+    # Момент деактивации существующих ссылок неизвестен: отсрочка для них начинается с миграции
+    op.execute("UPDATE urls SET deactivated_at = now() WHERE NOT is_active AND deactivated_at IS NULL")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_urls_user_id_url_hash ON urls (user_id, url_hash)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_urls_inactive_deactivated_at ON urls (deactivated_at) WHERE NOT is_active"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_urls_original_url")
+    op.execute("DROP INDEX IF EXISTS ix_urls_inactive_created_at")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "urls" in tables:
+        upgrade_urls()
+    else:
+        create_urls()
+
+    if "urls_archive" in tables:
+        op.execute("ALTER TABLE urls_archive ADD COLUMN IF NOT EXISTS deactivated_at timestamptz")
+    else:
+        op.create_table(
+            "urls_archive",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("original_url", sa.String(), nullable=False),
+            sa.Column("short_key", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("deactivated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("click_count", sa.Integer(), nullable=False),
+            sa.Column("redirect_code", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_urls_archive_short_key"), "urls_archive", ["short_key"], unique=False)
+
+    if "url_click_shards" not in tables:
+        op.create_table(
+            "url_click_shards",
+            sa.Column("url_id", sa.Integer(), nullable=False),
+            sa.Column("shard", sa.SmallInteger(), nullable=False),
+            sa.Column("count", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("url_id", "shard"),
+        )
+
+    if "url_keys" not in tables:
+        op.create_table(
+            "url_keys",
+            sa.Column("short_key", sa.String(), nullable=False),
+            sa.Column("url_id", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("short_key"),
+        )
+
+    if "user_link_stats" not in tables:
+        op.create_table(
+            "user_link_stats",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("total", sa.BigInteger(), nullable=False),
+            sa.Column("active", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+        # Начальные значения счётчиков; дальше их поддерживает приложение и периодическая сверка
+        op.execute(
+            "INSERT INTO user_link_stats (user_id, total, active) "
+            "SELECT user_id, count(*), count(*) FILTER (WHERE is_active) FROM urls GROUP BY user_id"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_link_stats")
+    op.drop_table("url_keys")
+    op.drop_table("url_click_shards")
+    op.drop_index(op.f("ix_urls_archive_short_key"), table_name="urls_archive")
+    op.drop_table("urls_archive")
+    op.drop_table("urls")
@@ -0,0 +1,196 @@
+from collections.abc import AsyncGenerator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+import hashlib
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Connection, MetaData, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.logging import logger
+from app.db.models import URL, URLArchive, URLClickShard, URLKey, UserLinkStats
+
+
+def build_shard_metadata() -> MetaData:
+    """
+    Собирает схему шарда: таблицы ссылок и счётчиков ссылок пользователей без внешних ключей.
+
+    Пользователи, события переходов и сводки остаются в основной базе, поэтому ``urls.user_id`` в шарде
+    не ссылается на ``users``.
+
+    :returns: Метаданные таблиц шарда.
+    :rtype: MetaData
+    """
+    metadata = MetaData()
+    tables = (URL.__table__, URLArchive.__table__, URLClickShard.__table__, URLKey.__table__, UserLinkStats.__table__)
+    for table in tables:
+        copy = table.to_metadata(metadata)
+        for constraint in list(copy.foreign_key_constraints):
+            copy.constraints.discard(constraint)
+        for column in copy.columns:
+            column.foreign_keys.clear()
+        copy.foreign_keys.clear()
+    return metadata
+
+
+SHARD_METADATA = build_shard_metadata()
+
+# Каталог миграций схемы шардов и ключ рекомендательной блокировки на время их применения
+SHARD_MIGRATIONS_PATH = Path(__file__).parent / "shard_migrations"
+SHARD_MIGRATION_LOCK_KEY = 0x75726C6D
+
+
+def shard_for_key(short_key: str, shard_count: int) -> int:
+    """
+    Определяет шард по короткому ключу (стабильный хеш, не зависящий от ``PYTHONHASHSEED``).
+
+    :param short_key: Короткий ключ ссылки.
+    :type short_key: str
+    :param shard_count: Количество шардов.
+    :type shard_count: int
+    :returns: Номер шарда.
+    :rtype: int
+    """
+    digest = hashlib.blake2b(short_key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def upgrade_shard_schema(connection: Connection, shard: int, shard_count: int) -> tuple[str | None, str | None]:
+    """
+    Применяет миграции шардов к базе данных шарда на переданном соединении (без фиксации транзакции).
+
+    :param connection: Синхронное соединение с базой данных шарда.
+    :type connection: Connection
+    :param shard: Номер шарда.
+    :type shard: int
+    :param shard_count: Количество шардов.
+    :type shard_count: int
+    :returns: Ревизии схемы до и после миграции (None — схема не создана).
+    :rtype: tuple[str | None, str | None]
+    """
+    before = MigrationContext.configure(connection).get_current_revision()
+    config = Config()
+    config.set_main_option("script_location", str(SHARD_MIGRATIONS_PATH))
+    config.attributes.update(connection=connection, shard=shard, shard_count=shard_count)
+    command.upgrade(config, "head")
+    return before, MigrationContext.configure(connection).get_current_revision()
+
+
+class ShardRouter:
+    """
+    Маршрутизатор ссылок по N базам данных (шардам).
+
+    Шард ссылки определяется хешем короткого ключа. Последовательность ``urls.id`` шарда ``i`` выдаёт числа
+    ``i + 1, i + 1 + N, ...``, поэтому идентификаторы уникальны между шардами, а шард ссылки однозначно
+    определяется и по её id. Ссылки одного пользователя разбросаны по всем шардам: списки собираются
+    опросом всех шардов (scatter-gather).
+    """
+
+    def __init__(self, engines: list[AsyncEngine]) -> None:
+        """
+        Инициализирует маршрутизатор.
+
+        :param engines: Движки баз данных шардов; порядок задаёт номера шардов и не должен меняться.
+        :type engines: list[AsyncEngine]
+        """
+        self.engines = engines
+        self._sessionmakers = [async_sessionmaker(engine, expire_on_commit=False) for engine in engines]
+
+    def __len__(self) -> int:
+        """
+        Возвращает количество шардов.
+
+        :returns: Количество шардов.
+        :rtype: int
+        """
+        return len(self.engines)
+
+    def shard_for_key(self, short_key: str) -> int:
+        """
+        Определяет шард по короткому ключу (см. :func:`shard_for_key`).
+
+        :param short_key: Короткий ключ ссылки.
+        :type short_key: str
+        :returns: Номер шарда.
+        :rtype: int
+        """
+        return shard_for_key(short_key, len(self))
+
+    def shard_for_url_id(self, url_id: int) -> int:
+        """
+        Определяет шард по идентификатору ссылки.
+
+        :param url_id: Идентификатор ссылки.
+        :type url_id: int
+        :returns: Номер шарда.
+        :rtype: int
+        """
+        return (url_id - 1) % len(self)
+
+    @asynccontextmanager
+    async def session(self, shard: int) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Открывает сессию базы данных шарда.
+
+        :param shard: Номер шарда.
+        :type shard: int
+        :returns: Асинхронная сессия шарда.
+        :rtype: AsyncGenerator[AsyncSession, None]
+        """
+        async with self._sessionmakers[shard]() as session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+
+    def session_for_key(self, short_key: str) -> AbstractAsyncContextManager[AsyncSession]:
+        """
+        Открывает сессию шарда, которому принадлежит короткий ключ.
+
+        :param short_key: Короткий ключ ссылки.
+        :type short_key: str
+        :returns: Контекстный менеджер сессии шарда.
+        :rtype: AbstractAsyncContextManager[AsyncSession]
+        """
+        return self.session(self.shard_for_key(short_key))
+
+    def session_for_url_id(self, url_id: int) -> AbstractAsyncContextManager[AsyncSession]:
+        """
+        Открывает сессию шарда, которому принадлежит ссылка.
+
+        :param url_id: Идентификатор ссылки.
+        :type url_id: int
+        :returns: Контекстный менеджер сессии шарда.
+        :rtype: AbstractAsyncContextManager[AsyncSession]
+        """
+        return self.session(self.shard_for_url_id(url_id))
+
+    async def connect(self) -> None:
+        """
+        Приводит схему каждого шарда к последней ревизии миграций шардов (``app/db/shard_migrations``).
+
+        ``create_all`` не меняет существующие таблицы, поэтому схема шардов ведётся миграциями Alembic. Они
+        выполняются в транзакции под рекомендательной блокировкой: экземпляры приложения, стартующие
+        одновременно, применяют их по очереди. Пустой шард получает всю схему и шаг последовательности
+        ``urls.id``; шард, созданный прежними версиями, доводится до текущей схемы.
+
+        :returns: None
+        """
+        for shard, engine in enumerate(self.engines):
+            async with engine.begin() as conn:
+                await conn.execute(select(func.pg_advisory_xact_lock(SHARD_MIGRATION_LOCK_KEY)))
+                before, after = await conn.run_sync(upgrade_shard_schema, shard, len(self))
+            if before != after:
+                logger.info(f"Shard {shard} schema upgraded from {before or 'empty'} to {after}")
+
+    async def close(self) -> None:
+        """
+        Закрывает соединения со всеми шардами.
+
+        :returns: None
+        """
+        for engine in self.engines:
+            await engine.dispose()
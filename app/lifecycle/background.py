@@ -0,0 +1,50 @@
+import asyncio
+from collections.abc import Coroutine
+from typing import Any
+
+from app.core.logging import logger
+
+# Фоновые задачи, запущенные на время жизни приложения
+_tasks: list[asyncio.Task] = []
+
+
+def _log_task_result(task: asyncio.Task) -> None:
+    """
+    Логирует аварийное завершение фоновой задачи.
+
+    :param task: Завершившаяся задача.
+    :type task: asyncio.Task
+    :returns: None
+    """
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()}")
+
+
+def start_background_task(coro: Coroutine[Any, Any, None], name: str) -> asyncio.Task:
+    """
+    Запускает фоновую задачу, которая будет остановлена при завершении приложения.
+
+    :param coro: Корутина задачи.
+    :type coro: Coroutine[Any, Any, None]
+    :param name: Имя задачи (для логов).
+    :type name: str
+    :returns: Запущенная задача.
+    :rtype: asyncio.Task
+    """
+    task = asyncio.create_task(coro, name=name)
+    task.add_done_callback(_log_task_result)
+    _tasks.append(task)
+    logger.debug(f"Background task {name} started")
+    return task
+
+
+async def stop_background_tasks() -> None:
+    """
+    Отменяет все фоновые задачи и дожидается их завершения.
+
+    :returns: None
+    """
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -1,10 +1,19 @@
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI
 
+from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import monitor_event_loop_lag
 from app.db.session import db_manager
+from app.lifecycle.background import start_background_task, stop_background_tasks
+from app.services.click_service import drain_click_queue, run_click_compaction, run_click_writer
+from app.services.link_stats_service import run_link_stats_reconciliation
+from app.services.partition_service import run_partition_maintenance
+from app.services.redirect_cache import run_redirect_cache_listener
+from app.services.sweeper_service import run_expiry_sweeper
 
 
 @asynccontextmanager
@@ -20,9 +29,30 @@ async def app_lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Application startup...")
     await db_manager.connect()
     logger.info("Database connected.")
+    start_background_task(monitor_event_loop_lag(), name="event-loop-lag")
+    start_background_task(run_click_writer(db_manager.session), name="click-writer")
+    # Обслуживание таблиц ссылок выполняется там, где они хранятся: в шардах или в основной базе
+    url_databases = (
+        {f"shard-{shard}": partial(db_manager.shards.session, shard) for shard in range(len(db_manager.shards))}
+        if db_manager.shards
+        else {"primary": db_manager.session}
+    )
+    # Версии ссылок пользователей хранятся в основной базе
+    primary_factory = db_manager.session if db_manager.shards else None
+    for name, session_factory in url_databases.items():
+        start_background_task(run_click_compaction(session_factory), name=f"click-compaction-{name}")
+        start_background_task(run_link_stats_reconciliation(session_factory), name=f"link-stats-{name}")
+        if settings.SWEEPER_ENABLED:
+            sweeper = run_expiry_sweeper(session_factory, primary_factory=primary_factory)
+            start_background_task(sweeper, name=f"expiry-sweeper-{name}")
+    start_background_task(run_partition_maintenance(db_manager.session), name="urls-partition-maintenance")
+    if settings.REDIRECT_CACHE_SIZE:
+        start_background_task(run_redirect_cache_listener(settings.DATABASE_URL), name="redirect-cache-listener")
 
     yield
 
     logger.info("Application shutdown...")
+    await stop_background_tasks()
+    await drain_click_queue(db_manager.session)
     await db_manager.close()
     logger.info("Database disconnected.")
@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 
+from app.api.metrics import router as metrics_router
 from app.api.v1.router import api_v1_router
 from app.core.config import settings
 from app.core.logging import logger
 from app.lifecycle.lifespan_events import app_lifespan
 from app.middleware.auth import configure_auth_middleware
+from app.middleware.metrics import configure_metrics_middleware
+from app.middleware.profiling import configure_profiling_middleware
+from app.middleware.redirect import configure_redirect_middleware
 from app.middleware.setup import configure_middleware
 
 # Создание FastAPI-приложения
@@ -15,10 +19,14 @@ app = FastAPI(
 
 # Настройка middleware (включая CORS)
 configure_middleware(app)
+configure_redirect_middleware(app)
 configure_auth_middleware(app)
+configure_metrics_middleware(app)
+configure_profiling_middleware(app)
 
 # Подключение роутеров
 app.include_router(api_v1_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,36 +1,105 @@
-from collections.abc import Awaitable, Callable
+import random
+import time
 
-from fastapi import FastAPI, Request
-from fastapi.responses import Response
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.api.v1 import redirect
+from app.api.v1.router import api_v1_router
+from app.core.config import settings
 from app.core.logging import logger
 
 
-async def log_request_middleware(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+class AccessLogMiddleware:
     """
-    Middleware для логирования входящих запросов.
-
-    :param request: HTTP-запрос.
-    :type request: Request
-    :param call_next: Следующий обработчик запроса.
-    :type call_next: Callable[[Request], Awaitable[Response]]
-    :returns: HTTP-ответ.
-    :rtype: Response
+    ASGI-middleware журнала запросов: одна структурированная строка на запрос с длительностью обработки.
+
+    В отличие от ``app.middleware("http")`` не оборачивает запрос в ``BaseHTTPMiddleware``. Запросы
+    с префиксом ``sampled_prefix`` (перенаправления) логируются с вероятностью
+    ``ACCESS_LOG_REDIRECT_SAMPLE_RATE``; ответы 5xx логируются всегда.
     """
-    logger.info(f"Incoming request: {request.method} {request.url}")
-    response = await call_next(request)
-    logger.info(f"Response status: {response.status_code}")
-    return response
+
+    def __init__(self, app: ASGIApp, sampled_prefix: str | None = None) -> None:
+        """
+        Инициализирует middleware.
+
+        :param app: Следующее ASGI-приложение в цепочке.
+        :type app: ASGIApp
+        :param sampled_prefix: Префикс пути, к которому применяется сэмплирование.
+        :type sampled_prefix: str | None
+        """
+        self.app = app
+        self.sampled_prefix = sampled_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обрабатывает запрос и пишет строку журнала после ответа.
+
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :param receive: ASGI receive.
+        :type receive: Receive
+        :param send: ASGI send.
+        :type send: Send
+        :returns: None
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self._should_log(scope["path"], status_code):
+                query_string = scope["query_string"]
+                path = f"{scope['path']}?{query_string.decode('latin-1')}" if query_string else scope["path"]
+                client = scope.get("client")
+                logger.info(
+                    "method=%s path=%s status=%d duration_ms=%.2f client=%s",
+                    scope["method"],
+                    path,
+                    status_code,
+                    (time.perf_counter() - started) * 1000,
+                    client[0] if client else "-",
+                )
+
+    def _should_log(self, path: str, status_code: int) -> bool:
+        """
+        Решает, попадёт ли запрос в журнал.
+
+        :param path: Путь запроса.
+        :type path: str
+        :param status_code: Код ответа.
+        :type status_code: int
+        :returns: True, если запрос нужно залогировать.
+        :rtype: bool
+        """
+        if status_code >= 500 or not self.sampled_prefix or not path.startswith(self.sampled_prefix):
+            return True
+        sample_rate = settings.ACCESS_LOG_REDIRECT_SAMPLE_RATE
+        return sample_rate >= 1.0 or random.random() < sample_rate
 
 
 def configure_auth_middleware(app: FastAPI) -> None:
     """
-    Настраивает middleware аутентификации.
+    Настраивает middleware журнала запросов.
+
+    Регистрируется после быстрого пути перенаправлений и оборачивает его; middleware метрик и профилирования
+    регистрируются позже и оборачивают уже журнал запросов.
 
     :param app: Приложение FastAPI.
     :type app: FastAPI
     :returns: None
     """
     logger.info("Configuring authentication middleware...")
-    app.middleware("http")(log_request_middleware)
+    app.add_middleware(AccessLogMiddleware, sampled_prefix=f"{api_v1_router.prefix}{redirect.router.prefix}/")
     logger.info("Authentication middleware configuration complete")
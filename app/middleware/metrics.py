@@ -0,0 +1,115 @@
+import time
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import DB_QUERIES_PER_REQUEST, DB_TIME_PER_REQUEST, HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from app.db.instrumentation import QueryStats, track_queries
+
+# Метка для запросов, не попавших ни в один маршрут: исходный путь в метках раздул бы кардинальность
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware метрик HTTP-запросов.
+
+    Учитывает количество и длительность запросов по шаблону маршрута и статусу, а также количество
+    и время SQL-выражений на запрос. SQL-статистика добавляется в ответ заголовком ``Server-Timing``
+    (если включено ``SERVER_TIMING_ENABLED``), повторяющиеся выражения логируются как возможный N+1.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Инициализирует middleware.
+
+        :param app: Следующее ASGI-приложение в цепочке.
+        :type app: ASGIApp
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обрабатывает запрос и записывает метрики после ответа.
+
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :param receive: ASGI receive.
+        :type receive: Receive
+        :param send: ASGI send.
+        :type send: Send
+        :returns: None
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if settings.SERVER_TIMING_ENABLED:
+                        message["headers"] = [*message.get("headers", ()), server_timing_header(stats)]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+                status = str(status_code)
+                HTTP_REQUESTS.inc(scope["method"], route, status)
+                HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], route, status)
+                DB_QUERIES_PER_REQUEST.observe(stats.count, route)
+                DB_TIME_PER_REQUEST.observe(stats.duration, route)
+                warn_repeated_queries(stats, scope["method"], route)
+
+
+def server_timing_header(stats: QueryStats) -> tuple[bytes, bytes]:
+    """
+    Формирует заголовок ``Server-Timing`` с количеством и суммарным временем SQL-выражений.
+
+    :param stats: Статистика SQL текущего запроса.
+    :type stats: QueryStats
+    :returns: Имя и значение заголовка.
+    :rtype: tuple[bytes, bytes]
+    """
+    value = f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'
+    return b"server-timing", value.encode("latin-1")
+
+
+def warn_repeated_queries(stats: QueryStats, method: str, route: str) -> None:
+    """
+    Логирует предупреждение, если одно выражение выполнено за запрос не меньше ``N_PLUS_ONE_THRESHOLD`` раз.
+
+    :param stats: Статистика SQL запроса.
+    :type stats: QueryStats
+    :param method: HTTP-метод.
+    :type method: str
+    :param route: Шаблон маршрута.
+    :type route: str
+    :returns: None
+    """
+    repeated = stats.most_repeated()
+    if repeated and repeated[1] >= settings.N_PLUS_ONE_THRESHOLD:
+        statement, times = repeated
+        logger.warning(f"Possible N+1 in {method} {route}: statement executed {times} times: {statement}")
+
+
+def configure_metrics_middleware(app: FastAPI) -> None:
+    """
+    Подключает middleware метрик внешним слоем, чтобы учитывать всю обработку запроса.
+
+    :param app: Приложение FastAPI.
+    :type app: FastAPI
+    :returns: None
+    """
+    logger.info("Configuring metrics middleware...")
+    app.add_middleware(MetricsMiddleware)
+    logger.info("Metrics middleware configuration complete")
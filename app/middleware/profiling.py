@@ -0,0 +1,216 @@
+import asyncio
+from collections import Counter
+import hashlib
+import hmac
+from pathlib import Path
+import random
+import secrets
+import time
+import uuid
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.profiling import SamplingProfiler, write_profile
+
+PROFILE_SIGNATURE_HEADER = b"x-profile-signature"
+PROFILE_ID_HEADER = b"x-profile-id"
+AGGREGATE_PROFILE_NAME = "aggregate.folded"
+
+
+def sign_profile_request(secret: str, method: str, path: str, expires_at: int, nonce: str | None = None) -> str:
+    """
+    Вычисляет подпись запроса на профилирование.
+
+    Подпись — HMAC-SHA256 от ``"<METHOD> <path> <expires_at> <nonce>"``; срок действия и одноразовое значение
+    входят в подписанные данные, поэтому перехваченную подпись нельзя повторять бесконечно.
+
+    :param secret: Секрет профилирования (``PROFILING_SECRET``).
+    :type secret: str
+    :param method: HTTP-метод.
+    :type method: str
+    :param path: Путь запроса без query string.
+    :type path: str
+    :param expires_at: Момент окончания действия подписи (Unix time, сек).
+    :type expires_at: int
+    :param nonce: Одноразовое значение без ``:`` (по умолчанию случайное).
+    :type nonce: str | None
+    :returns: Значение заголовка ``X-Profile-Signature`` вида ``<expires_at>:<nonce>:<hex HMAC>``.
+    :rtype: str
+    """
+    nonce = nonce if nonce is not None else secrets.token_hex(8)
+    payload = f"{method} {path} {expires_at} {nonce}".encode()
+    return f"{expires_at}:{nonce}:{hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()}"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware профилирования отдельных запросов сэмплирующим профайлером.
+
+    Запрос профилируется, если он подписан заголовком ``X-Profile-Signature`` (профиль сохраняется
+    в ``<directory>/<id>.folded``, id возвращается в заголовке ``X-Profile-Id``) или попал в случайную
+    выборку ``sample_rate`` (профили суммируются в ``<directory>/aggregate.folded``). Одновременно
+    профилируется не больше одного запроса: профайлер снимает весь поток event loop.
+
+    Подпись принимается до истечения её срока (не дальше ``PROFILING_SIGNATURE_MAX_TTL`` от текущего момента)
+    и один раз: использованные nonce хранятся в памяти процесса до истечения подписи. На диске хранится
+    не больше ``PROFILING_MAX_PROFILES`` профилей подписанных запросов (старые удаляются), а каждый профиль,
+    включая общий, ограничен ``PROFILING_MAX_STACKS`` самыми частыми стеками.
+    """
+
+    def __init__(self, app: ASGIApp, directory: str, secret: str | None = None, sample_rate: float = 0.0) -> None:
+        """
+        Инициализирует middleware.
+
+        :param app: Следующее ASGI-приложение в цепочке.
+        :type app: ASGIApp
+        :param directory: Каталог для сохранения профилей.
+        :type directory: str
+        :param secret: Секрет для проверки подписи запросов (None — подписанные запросы не принимаются).
+        :type secret: str | None
+        :param sample_rate: Доля случайно профилируемых запросов.
+        :type sample_rate: float
+        """
+        self.app = app
+        self.directory = Path(directory)
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.aggregate: Counter[str] = Counter()
+        self._used_nonces: dict[str, int] = {}
+        self._busy = False
+
+    def _is_signed(self, scope: Scope) -> bool:
+        """
+        Проверяет подпись запроса на профилирование.
+
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :returns: True, если запрос содержит корректную, не истёкшую и ещё не использованную подпись.
+        :rtype: bool
+        """
+        if not self.secret:
+            return False
+        header = next((value for name, value in scope["headers"] if name == PROFILE_SIGNATURE_HEADER), None)
+        if header is None:
+            return False
+        signature = header.decode("latin-1")
+        try:
+            expires_raw, nonce, _ = signature.split(":")
+            expires_at = int(expires_raw)
+        except ValueError:
+            return False
+        now = time.time()
+        if not now < expires_at <= now + settings.PROFILING_SIGNATURE_MAX_TTL:
+            return False
+        expected = sign_profile_request(self.secret, scope["method"], scope["path"], expires_at, nonce)
+        if not hmac.compare_digest(signature, expected):
+            return False
+
+        self._used_nonces = {key: expires for key, expires in self._used_nonces.items() if expires > now}
+        if nonce in self._used_nonces:
+            logger.warning(f"Replayed profiling signature for {scope['method']} {scope['path']}")
+            return False
+        self._used_nonces[nonce] = expires_at
+        return True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обрабатывает запрос, при необходимости профилируя его.
+
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :param receive: ASGI receive.
+        :type receive: Receive
+        :param send: ASGI send.
+        :type send: Send
+        :returns: None
+        """
+        if scope["type"] != "http" or self._busy:
+            await self.app(scope, receive, send)
+            return
+
+        signed = self._is_signed(scope)
+        if not signed and not (self.sample_rate and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profiler = SamplingProfiler(interval=settings.PROFILING_INTERVAL_MS / 1000)
+
+        async def send_wrapper(message: Message) -> None:
+            if signed and message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        self._busy = True
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stacks = profiler.stop()
+            self._busy = False
+            await self._store(stacks, profile_id if signed else None, scope)
+
+    async def _store(self, stacks: Counter[str], profile_id: str | None, scope: Scope) -> None:
+        """
+        Сохраняет профиль подписанного запроса или добавляет сэмплы в агрегированный профиль.
+
+        :param stacks: Количество сэмплов по свёрнутым стекам.
+        :type stacks: Counter[str]
+        :param profile_id: Идентификатор профиля подписанного запроса (None — случайная выборка).
+        :type profile_id: str | None
+        :param scope: ASGI scope.
+        :type scope: Scope
+        :returns: None
+        """
+        max_stacks = settings.PROFILING_MAX_STACKS
+        try:
+            if profile_id is not None:
+                path = self.directory / f"{profile_id}.folded"
+                await asyncio.to_thread(write_profile, path, Counter(dict(stacks.most_common(max_stacks))))
+                await asyncio.to_thread(self._rotate_profiles)
+                logger.info(f"Profile of {scope['method']} {scope['path']} saved to {path}")
+            else:
+                self.aggregate.update(stacks)
+                if len(self.aggregate) > max_stacks:
+                    self.aggregate = Counter(dict(self.aggregate.most_common(max_stacks)))
+                await asyncio.to_thread(write_profile, self.directory / AGGREGATE_PROFILE_NAME, self.aggregate.copy())
+        except OSError as e:
+            logger.error(f"Failed to save profile: {e}")
+
+    def _rotate_profiles(self) -> None:
+        """
+        Удаляет самые старые профили подписанных запросов сверх ``PROFILING_MAX_PROFILES``.
+
+        :returns: None
+        """
+        profiles = [path for path in self.directory.glob("*.folded") if path.name != AGGREGATE_PROFILE_NAME]
+        if len(profiles) <= settings.PROFILING_MAX_PROFILES:
+            return
+        profiles.sort(key=lambda path: path.stat().st_mtime_ns)
+        for path in profiles[: len(profiles) - settings.PROFILING_MAX_PROFILES]:
+            path.unlink(missing_ok=True)
+
+
+def configure_profiling_middleware(app: FastAPI) -> None:
+    """
+    Подключает профилирование запросов, если задан ``PROFILING_SECRET`` или ``PROFILING_SAMPLE_RATE``.
+
+    Без этих настроек middleware не регистрируется и не добавляет накладных расходов.
+
+    :param app: Приложение FastAPI.
+    :type app: FastAPI
+    :returns: None
+    """
+    if not settings.PROFILING_SECRET and not settings.PROFILING_SAMPLE_RATE:
+        return
+    logger.info("Configuring profiling middleware...")
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILING_DIR,
+        secret=settings.PROFILING_SECRET,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+    )
+    logger.info("Profiling middleware configuration complete")
@@ -0,0 +1,24 @@
+from fastapi import FastAPI
+
+from app.api.v1 import redirect
+from app.api.v1.router import api_v1_router
+from app.core.logging import logger
+
+
+def configure_redirect_middleware(app: FastAPI) -> None:
+    """
+    Подключает быстрый путь перенаправлений по коротким ссылкам.
+
+    Регистрируется после CORS, но до логирования запросов: перенаправления минуют CORS-middleware,
+    роутинг и DI FastAPI, а журнал запросов остаётся прежним.
+
+    :param app: Приложение FastAPI.
+    :type app: FastAPI
+    :returns: None
+    """
+    logger.info("Configuring redirect fast path...")
+    app.add_middleware(
+        redirect.RedirectFastPathMiddleware,
+        prefix=f"{api_v1_router.prefix}{redirect.router.prefix}",
+    )
+    logger.info("Redirect fast path configuration complete")
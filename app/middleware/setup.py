@@ -3,6 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.logging import logger
 
+# Параметры CORS; используются также быстрым путём перенаправлений, минующим общий стек middleware
+CORS_OPTIONS = {
+    "allow_origins": ["*"],
+    "allow_credentials": True,
+    "allow_methods": ["GET", "POST", "DELETE"],
+    "allow_headers": ["*"],
+}
+
 
 def configure_middleware(app: FastAPI) -> None:
     """
@@ -14,12 +22,6 @@ def configure_middleware(app: FastAPI) -> None:
     logger.info("Configuring middleware...")
 
     # Настройка CORS
-    app.add_middleware(
-        middleware_class=CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["GET", "POST", "DELETE"],
-        allow_headers=["*"],
-    )
+    app.add_middleware(middleware_class=CORSMiddleware, **CORS_OPTIONS)
 
     logger.info("Middleware configuration complete")
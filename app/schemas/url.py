@@ -1,13 +1,17 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 
-from pydantic import AnyUrl as _AnyUrlBase, BaseModel, BeforeValidator, TypeAdapter
+from pydantic import BaseModel, BeforeValidator
 
-_AnyUrlAdapter = TypeAdapter(_AnyUrlBase)
+from app.core.url_normalization import normalize_url
 
 # AnyUrl — это строка, перед валидацией которой вызывается BeforeValidator,
-# который преобразует значение к str, предварительно проверив его как URL
-AnyUrl = Annotated[str, BeforeValidator(lambda v: str(_AnyUrlAdapter.validate_python(v)))]
+# который проверяет значение как URL и приводит его к каноническому виду (с кешированием)
+AnyUrl = Annotated[str, BeforeValidator(lambda v: normalize_url(v if isinstance(v, str) else str(v)))]
+
+# Код перенаправления ссылки: 307 — временное, 301/308 — постоянное (кешируется браузерами и прокси)
+RedirectCode = Literal[301, 307, 308]
+PERMANENT_REDIRECT_CODES = frozenset({301, 308})
 
 
 class URLBase(BaseModel):
@@ -27,9 +31,29 @@ class URLCreate(URLBase):
 
     :param short_key: Пользовательский короткий ключ (опционально).
     :type short_key: str | None
+    :param redirect_code: Код перенаправления (307 — временное, 301/308 — постоянное).
+    :type redirect_code: RedirectCode
     """
 
     short_key: str | None = None
+    redirect_code: RedirectCode = 307
+
+
+class URLUpdate(BaseModel):
+    """
+    Схема для изменения ссылки; незаданные поля не меняются.
+
+    :param original_url: Новый исходный URL.
+    :type original_url: str | None
+    :param is_active: Активна ли ссылка.
+    :type is_active: bool | None
+    :param expires_at: Новая дата истечения срока действия.
+    :type expires_at: datetime | None
+    """
+
+    original_url: AnyUrl | None = None
+    is_active: bool | None = None
+    expires_at: datetime | None = None
 
 
 class URLResponse(URLBase):
@@ -50,8 +74,12 @@ class URLResponse(URLBase):
     :type click_count: int
     :param user_id: Идентификатор владельца URL.
     :type user_id: int
+    :param redirect_code: Код перенаправления (307 — временное, 301/308 — постоянное).
+    :type redirect_code: RedirectCode
     """
 
+    # Ответ строится из строк БД, куда URL попадает уже нормализованным, поэтому повторная валидация не нужна
+    original_url: str
     id: int
     short_key: str
     is_active: bool
@@ -59,6 +87,7 @@ class URLResponse(URLBase):
     created_at: datetime
     click_count: int
     user_id: int
+    redirect_code: RedirectCode
 
     model_config = {"from_attributes": True}
 
@@ -84,3 +113,174 @@ class URLListResponse(BaseModel):
     page: int
     per_page: int
     total_pages: float
+
+
+# Гранулярность статистики переходов
+StatsGranularity = Literal["hour", "day"]
+
+# Формат выгрузки ссылок
+ExportFormat = Literal["ndjson", "csv"]
+
+# Поля выгрузки ссылок в порядке колонок CSV
+EXPORT_FIELDS = (
+    "id",
+    "short_key",
+    "original_url",
+    "is_active",
+    "expires_at",
+    "created_at",
+    "click_count",
+    "redirect_code",
+)
+
+# Массовое действие над ссылками и его результат для отдельной ссылки
+BulkAction = Literal["deactivate", "delete"]
+BulkStatus = Literal["deactivated", "deleted", "not_found", "forbidden"]
+
+
+class URLBulkRequest(BaseModel):
+    """
+    Схема запроса на массовую деактивацию или удаление ссылок: по списку идентификаторов либо по фильтру.
+
+    :param action: Действие (deactivate, delete).
+    :type action: BulkAction
+    :param ids: Идентификаторы ссылок (взаимоисключающе с фильтром).
+    :type ids: list[int] | None
+    :param is_active: Фильтр по активным ссылкам.
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    """
+
+    action: BulkAction
+    ids: list[int] | None = None
+    is_active: bool | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+
+class URLBulkResult(BaseModel):
+    """
+    Результат массового действия для одной ссылки.
+
+    :param id: Идентификатор ссылки.
+    :type id: int
+    :param status: Результат (deactivated, deleted, not_found, forbidden).
+    :type status: BulkStatus
+    """
+
+    id: int
+    status: BulkStatus
+
+
+class URLBulkResponse(BaseModel):
+    """
+    Схема ответа на массовое действие над ссылками.
+
+    :param action: Выполненное действие.
+    :type action: BulkAction
+    :param processed: Количество деактивированных или удалённых ссылок.
+    :type processed: int
+    :param results: Результаты по каждой ссылке.
+    :type results: list[URLBulkResult]
+    """
+
+    action: BulkAction
+    processed: int
+    results: list[URLBulkResult]
+
+
+# Результат разрешения короткого ключа без перехода
+ResolveStatus = Literal["ok", "not_found", "inactive", "expired"]
+
+
+class ResolveRequest(BaseModel):
+    """
+    Схема запроса на пакетное разрешение коротких ключей.
+
+    :param short_keys: Короткие ключи.
+    :type short_keys: list[str]
+    """
+
+    short_keys: list[str]
+
+
+class ResolvedKey(BaseModel):
+    """
+    Результат разрешения одного короткого ключа; данные ссылки заполняются только при статусе ok.
+
+    :param status: Результат (ok, not_found, inactive, expired).
+    :type status: ResolveStatus
+    :param original_url: Исходный URL.
+    :type original_url: str | None
+    :param redirect_code: Код перенаправления.
+    :type redirect_code: RedirectCode | None
+    :param expires_at: Дата истечения срока действия.
+    :type expires_at: datetime | None
+    """
+
+    status: ResolveStatus
+    original_url: str | None = None
+    redirect_code: RedirectCode | None = None
+    expires_at: datetime | None = None
+
+
+class ResolveResponse(BaseModel):
+    """
+    Схема ответа на пакетное разрешение коротких ключей.
+
+    :param results: Результаты по коротким ключам.
+    :type results: dict[str, ResolvedKey]
+    """
+
+    results: dict[str, ResolvedKey]
+
+
+class ClickBucket(BaseModel):
+    """
+    Количество переходов за один интервал сводки.
+
+    :param start: Начало часа или дня (UTC).
+    :type start: datetime
+    :param clicks: Количество переходов.
+    :type clicks: int
+    """
+
+    start: datetime
+    clicks: int
+
+
+class URLStatsResponse(BaseModel):
+    """
+    Схема для ответа со статистикой переходов по ссылке.
+
+    :param url_id: Идентификатор ссылки.
+    :type url_id: int
+    :param granularity: Гранулярность интервалов (hour, day).
+    :type granularity: StatsGranularity
+    :param start: Начало периода, выровненное вниз до начала первого интервала (UTC).
+    :type start: datetime
+    :param end: Конец периода (не включается), выровненный вверх до конца последнего интервала (UTC).
+    :type end: datetime
+    :param total: Сумма переходов по всем интервалам.
+    :type total: int
+    :param buckets: Непустые интервалы по возрастанию времени.
+    :type buckets: list[ClickBucket]
+    :param unique_visitors: Оценка числа уникальных посетителей (адрес + User-Agent) за всё время жизни ссылки
+        по скетчу HyperLogLog.
+    :type unique_visitors: int
+    :param unique_visitors_error: Относительная стандартная ошибка оценки (≈0.016: в 95% случаев отклонение
+        не больше ~3.3%).
+    :type unique_visitors_error: float
+    """
+
+    url_id: int
+    granularity: StatsGranularity
+    start: datetime
+    end: datetime
+    total: int
+    buckets: list[ClickBucket]
+    unique_visitors: int
+    unique_visitors_error: float
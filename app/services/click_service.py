@@ -0,0 +1,415 @@
+import asyncio
+from collections import Counter, deque
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+import ipaddress
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.hyperloglog import HyperLogLog
+from app.core.logging import logger
+from app.core.metrics import CLICK_EVENTS_DROPPED, CLICK_EVENTS_WRITTEN, CLICK_QUEUE_SIZE, REGISTRY
+from app.db.crud.click_event import (
+    add_click_counts,
+    compact_click_shards,
+    ensure_click_partitions,
+    insert_click_events,
+    merge_visitor_sketches,
+    upsert_click_rollups,
+)
+from app.db.crud.url import get_url_owner_ids
+from app.db.crud.user import bump_user_versions
+from app.db.session import db_manager
+from app.db.sharding import ShardRouter
+
+# Фабрика сессий для фонового писателя (например, ``db_manager.session``)
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+# Максимальная длина сохраняемых заголовков Referer и User-Agent
+MAX_HEADER_LENGTH = 512
+
+
+@dataclass(slots=True, frozen=True)
+class ClickContext:
+    """
+    Данные о переходе, собираемые на пути перенаправления.
+
+    :param referrer: Заголовок Referer.
+    :type referrer: str | None
+    :param user_agent: Заголовок User-Agent.
+    :type user_agent: str | None
+    :param client_network: Огрублённый адрес клиента (подсеть /24 для IPv4, /48 для IPv6).
+    :type client_network: str | None
+    :param visitor: Ключ посетителя (адрес и User-Agent) для скетча уникальных посетителей; в БД не сохраняется.
+    :type visitor: str | None
+    """
+
+    referrer: str | None = None
+    user_agent: str | None = None
+    client_network: str | None = None
+    visitor: str | None = None
+
+
+def coarse_network(host: str | None) -> str | None:
+    """
+    Огрубляет IP-адрес клиента до подсети, чтобы не хранить точный адрес.
+
+    :param host: IP-адрес клиента.
+    :type host: str | None
+    :returns: Подсеть /24 (IPv4) или /48 (IPv6) либо None, если адрес не распознан.
+    :rtype: str | None
+    """
+    if not host:
+        return None
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return None
+    prefix = 24 if address.version == 4 else 48
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class ClickQueue:
+    """
+    Ограниченная очередь событий переходов в памяти процесса.
+
+    При переполнении новые события отбрасываются (с учётом в ``click_events_dropped_total``), чтобы путь
+    перенаправления не ждал базу данных ни при каких условиях. Пачка, которую не удалось записать, возвращается
+    в начало очереди; ``failures`` — количество ошибок записи подряд.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Инициализирует очередь.
+
+        :param maxsize: Максимальное количество ожидающих записи событий.
+        :type maxsize: int
+        """
+        self.maxsize = maxsize
+        self.failures = 0
+        self._items: deque[tuple[int, datetime, ClickContext]] = deque()
+
+    def __len__(self) -> int:
+        """
+        Возвращает количество ожидающих записи событий.
+
+        :returns: Размер очереди.
+        :rtype: int
+        """
+        return len(self._items)
+
+    def put(self, url_id: int, context: ClickContext) -> bool:
+        """
+        Добавляет событие перехода в очередь за O(1).
+
+        :param url_id: Идентификатор ссылки.
+        :type url_id: int
+        :param context: Данные о переходе.
+        :type context: ClickContext
+        :returns: True, если событие принято, False — если очередь переполнена и событие отброшено.
+        :rtype: bool
+        """
+        if len(self._items) >= self.maxsize:
+            CLICK_EVENTS_DROPPED.inc("queue_full")
+            return False
+        self._items.append((url_id, datetime.now(UTC), context))
+        return True
+
+    def drain(self, limit: int) -> list[tuple[int, datetime, ClickContext]]:
+        """
+        Забирает из очереди до ``limit`` самых старых событий.
+
+        :param limit: Максимальное количество событий.
+        :type limit: int
+        :returns: События в порядке поступления.
+        :rtype: list[tuple[int, datetime, ClickContext]]
+        """
+        return [self._items.popleft() for _ in range(min(limit, len(self._items)))]
+
+    def requeue(self, items: list[tuple[int, datetime, ClickContext]]) -> int:
+        """
+        Возвращает незаписанные события в начало очереди, не превышая ``maxsize``.
+
+        Если за время записи очередь пополнилась, не поместившиеся самые новые из возвращаемых событий
+        отбрасываются с учётом в ``click_events_dropped_total``.
+
+        :param items: События в порядке поступления.
+        :type items: list[tuple[int, datetime, ClickContext]]
+        :returns: Количество возвращённых событий.
+        :rtype: int
+        """
+        kept = items[: max(self.maxsize - len(self._items), 0)]
+        self._items.extendleft(reversed(kept))
+        if len(kept) < len(items):
+            CLICK_EVENTS_DROPPED.inc("queue_full", amount=len(items) - len(kept))
+        return len(kept)
+
+    def clear(self) -> None:
+        """
+        Удаляет все ожидающие события.
+
+        :returns: None
+        """
+        self._items.clear()
+        self.failures = 0
+
+
+click_queue = ClickQueue(settings.CLICK_QUEUE_MAX_SIZE)
+REGISTRY.add_collector(lambda: CLICK_QUEUE_SIZE.set(len(click_queue)))
+
+
+def record_click(url_id: int, context: ClickContext | None = None) -> None:
+    """
+    Ставит переход по ссылке в очередь на запись; счётчик кликов обновит фоновый писатель.
+
+    :param url_id: Идентификатор ссылки.
+    :type url_id: int
+    :param context: Данные о переходе.
+    :type context: ClickContext | None
+    :returns: None
+    """
+    click_queue.put(url_id, context or ClickContext())
+
+
+def counter_shard() -> int:
+    """
+    Возвращает шард счётчиков переходов текущего процесса.
+
+    Шард закреплён за процессом: воркеры пишут в разные строки ``url_click_shards`` и не ждут друг друга.
+
+    :returns: Номер шарда счётчика.
+    :rtype: int
+    """
+    return os.getpid() % settings.CLICK_COUNTER_SHARDS
+
+
+async def _add_sharded_click_counts(router: ShardRouter, counts: dict[int, int]) -> set[int]:
+    """
+    Увеличивает счётчики кликов в шардах: каждый шард обновляется своей транзакцией.
+
+    Ошибка одного шарда не откатывает уже записанные события и счётчики других шардов, а только логируется.
+
+    :param router: Маршрутизатор шардов.
+    :type router: ShardRouter
+    :param counts: Количество новых кликов по id ссылки.
+    :type counts: dict[int, int]
+    :returns: Владельцы ссылок, счётчики которых обновлены.
+    :rtype: set[int]
+    """
+    by_shard: dict[int, dict[int, int]] = {}
+    for url_id, clicks in counts.items():
+        by_shard.setdefault(router.shard_for_url_id(url_id), {})[url_id] = clicks
+    owner_ids: set[int] = set()
+    for shard, shard_counts in by_shard.items():
+        try:
+            async with router.session(shard) as session:
+                await add_click_counts(session, shard_counts, counter_shard())
+                owners = await get_url_owner_ids(session, shard_counts)
+                await session.commit()
+            owner_ids.update(owners)
+        except Exception as e:
+            logger.error(f"Failed to update click counts on shard {shard}: {e}")
+    return owner_ids
+
+
+async def _bump_clicked_owner_versions(session: AsyncSession, owner_ids: set[int]) -> None:
+    """
+    Увеличивает версии ссылок владельцев отдельной короткой транзакцией после записи счётчиков.
+
+    Ошибка только логируется: счётчики уже записаны, а версию поднимет следующий сброс.
+
+    :param session: Сессия основной базы данных.
+    :type session: AsyncSession
+    :param owner_ids: Владельцы ссылок.
+    :type owner_ids: set[int]
+    :returns: None
+    """
+    try:
+        await bump_user_versions(session, owner_ids)
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Failed to bump link versions of {len(owner_ids)} users: {e}")
+
+
+async def flush_clicks(session: AsyncSession, batch_size: int | None = None) -> int:
+    """
+    Записывает все накопленные события пачками.
+
+    Каждая пачка — одна транзакция из многострочного INSERT в ``click_events``, пакетного увеличения
+    шардов счётчиков ``url_click_shards``, инкрементального обновления почасовой и дневной сводок и объединения скетчей
+    уникальных посетителей, накопленных по пачке в памяти. Счётчики переходов видны в списке ссылок, поэтому
+    после записи всех пачек версии ссылок их владельцев увеличиваются один раз отдельной короткой транзакцией:
+    в транзакции пачки строка ``user_versions`` популярного владельца оставалась бы заблокированной до конца
+    пачки, и сбросы всех воркеров выстраивались бы в очередь на ней.
+
+    Пачка, которую не удалось записать, возвращается в начало очереди, и запись прекращается до следующего
+    вызова; после ``CLICK_WRITE_RETRIES`` повторов подряд пачка отбрасывается с учётом
+    в ``click_events_dropped_total``. При шардировании ``urls`` счётчики обновляются в шардах после фиксации
+    пачки в основной базе.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param batch_size: Размер пачки (по умолчанию ``CLICK_FLUSH_BATCH_SIZE``).
+    :type batch_size: int | None
+    :returns: Количество записанных событий.
+    :rtype: int
+    """
+    written = 0
+    owner_ids: set[int] = set()
+    while batch := click_queue.drain(batch_size or settings.CLICK_FLUSH_BATCH_SIZE):
+        events = [
+            {
+                "url_id": url_id,
+                "clicked_at": clicked_at,
+                "referrer": context.referrer,
+                "user_agent": context.user_agent,
+                "client_network": context.client_network,
+            }
+            for url_id, clicked_at, context in batch
+        ]
+        sketches: dict[int, HyperLogLog] = {}
+        for url_id, _, context in batch:
+            if context.visitor:
+                sketches.setdefault(url_id, HyperLogLog()).add(context.visitor.encode())
+        counts = Counter(url_id for url_id, _, _ in batch)
+        try:
+            await insert_click_events(session, events)
+            batch_owner_ids: set[int] = set()
+            if not db_manager.shards:
+                await add_click_counts(session, counts, counter_shard())
+                batch_owner_ids = set(await get_url_owner_ids(session, counts))
+            await upsert_click_rollups(
+                session,
+                hourly=Counter(
+                    (url_id, clicked_at.replace(minute=0, second=0, microsecond=0)) for url_id, clicked_at, _ in batch
+                ),
+                daily=Counter((url_id, clicked_at.date()) for url_id, clicked_at, _ in batch),
+            )
+            await merge_visitor_sketches(session, sketches)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            click_queue.failures += 1
+            if click_queue.failures <= settings.CLICK_WRITE_RETRIES:
+                requeued = click_queue.requeue(batch)
+                logger.warning(
+                    f"Failed to write {len(batch)} click events (attempt {click_queue.failures}), "
+                    f"{requeued} requeued: {e}"
+                )
+                break
+            click_queue.failures = 0
+            CLICK_EVENTS_DROPPED.inc("write_error", amount=len(batch))
+            logger.error(f"Failed to write {len(batch)} click events, dropping after retries: {e}")
+            continue
+        click_queue.failures = 0
+        if db_manager.shards:
+            batch_owner_ids = await _add_sharded_click_counts(db_manager.shards, counts)
+        owner_ids.update(batch_owner_ids)
+        CLICK_EVENTS_WRITTEN.inc(amount=len(batch))
+        written += len(batch)
+    if owner_ids:
+        await _bump_clicked_owner_versions(session, owner_ids)
+    if written:
+        # Счётчики обновлены в обход ORM: загруженные в сессию ссылки больше не актуальны
+        session.expire_all()
+    return written
+
+
+async def run_click_writer(session_factory: SessionFactory, interval: float | None = None) -> None:
+    """
+    Фоновый писатель событий переходов.
+
+    Раз в ``interval`` секунд сбрасывает очередь в базу данных и поддерживает дневные секции ``click_events``
+    на ``CLICK_PARTITION_DAYS_AHEAD`` дней вперёд. После ошибок записи пауза удваивается с каждой ошибкой подряд.
+
+    :param session_factory: Фабрика сессий базы данных.
+    :type session_factory: SessionFactory
+    :param interval: Период сброса (сек, по умолчанию ``CLICK_FLUSH_INTERVAL``).
+    :type interval: float | None
+    :returns: None
+    """
+    partitions_day: date | None = None
+    while True:
+        await asyncio.sleep((interval or settings.CLICK_FLUSH_INTERVAL) * 2**click_queue.failures)
+        if not len(click_queue):
+            continue
+        try:
+            async with session_factory() as session:
+                today = datetime.now(UTC).date()
+                if partitions_day != today:
+                    await ensure_click_partitions(session, today, settings.CLICK_PARTITION_DAYS_AHEAD)
+                    partitions_day = today
+                written = await flush_clicks(session)
+            logger.debug(f"Click writer flushed {written} events")
+        except Exception as e:
+            logger.error(f"Click writer iteration failed: {e}")
+
+
+async def drain_click_queue(session_factory: SessionFactory) -> None:
+    """
+    Записывает оставшиеся события при остановке приложения.
+
+    Повторять запись при остановке некогда: события, оставшиеся в очереди после ошибки, отбрасываются.
+
+    :param session_factory: Фабрика сессий базы данных.
+    :type session_factory: SessionFactory
+    :returns: None
+    """
+    if not len(click_queue):
+        return
+    async with session_factory() as session:
+        written = await flush_clicks(session)
+    logger.debug(f"Flushed {written} click events on shutdown")
+    if unwritten := len(click_queue):
+        CLICK_EVENTS_DROPPED.inc("write_error", amount=unwritten)
+        logger.error(f"Dropped {unwritten} click events that could not be written on shutdown")
+        click_queue.clear()
+
+
+async def compact_click_counters(session: AsyncSession, batch_size: int | None = None) -> int:
+    """
+    Переносит все накопленные шарды счётчиков переходов в ``urls.click_count`` пачками.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param batch_size: Количество строк шардов в одной транзакции (по умолчанию ``CLICK_COMPACTION_BATCH_SIZE``).
+    :type batch_size: int | None
+    :returns: Количество перенесённых строк шардов.
+    :rtype: int
+    """
+    batch_size = batch_size or settings.CLICK_COMPACTION_BATCH_SIZE
+    total = 0
+    while True:
+        compacted = await compact_click_shards(session, batch_size)
+        total += compacted
+        if compacted < batch_size:
+            break
+    if total:
+        # Счётчики обновлены в обход ORM: загруженные в сессию ссылки больше не актуальны
+        session.expire_all()
+    return total
+
+
+async def run_click_compaction(session_factory: SessionFactory, interval: float | None = None) -> None:
+    """
+    Фоновое сжатие шардов счётчиков переходов: раз в ``interval`` секунд вызывает :func:`compact_click_counters`.
+
+    :param session_factory: Фабрика сессий базы данных.
+    :type session_factory: SessionFactory
+    :param interval: Период сжатия (сек, по умолчанию ``CLICK_COMPACTION_INTERVAL``).
+    :type interval: float | None
+    :returns: None
+    """
+    while True:
+        await asyncio.sleep(interval or settings.CLICK_COMPACTION_INTERVAL)
+        try:
+            async with session_factory() as session:
+                compacted = await compact_click_counters(session)
+            logger.debug(f"Click compaction folded {compacted} counter shards")
+        except Exception as e:
+            logger.error(f"Click compaction iteration failed: {e}")
@@ -0,0 +1,155 @@
+from collections.abc import AsyncIterator
+import csv
+from datetime import datetime
+import io
+import json
+import zlib
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.datetime_utils import as_utc
+from app.core.logging import logger
+from app.db.crud.url import stream_urls_by_user
+from app.db.session import db_manager
+from app.schemas.url import EXPORT_FIELDS, ExportFormat
+
+# Размер порции ответа (байт до сжатия): строки копятся в буфере, чтобы не отправлять их по одной
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _export_value(value: object) -> object:
+    """
+    Приводит значение поля к виду для выгрузки (даты — ISO 8601).
+
+    :param value: Значение поля.
+    :type value: object
+    :returns: Значение для JSON или CSV.
+    :rtype: object
+    """
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_user_urls(
+    session: AsyncSession,
+    user_id: int,
+    export_format: ExportFormat = "ndjson",
+    compress: bool = False,
+    is_active: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Проверяет параметры и возвращает генератор тела выгрузки всех ссылок пользователя в NDJSON или CSV.
+
+    Ссылки читаются серверным курсором и отдаются порциями по ``EXPORT_CHUNK_SIZE`` байт, при ``compress``
+    порции сжимаются gzip на лету, поэтому память не зависит от количества ссылок. Даты без часового пояса
+    считаются UTC.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param export_format: Формат выгрузки (ndjson, csv).
+    :type export_format: ExportFormat
+    :param compress: Сжимать ли выгрузку gzip.
+    :type compress: bool
+    :param is_active: Фильтр по активным ссылкам (True/False или None для всех).
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :returns: Асинхронный генератор порций тела ответа.
+    :rtype: AsyncIterator[bytes]
+    :raises ValueError: Если период создания некорректен.
+    """
+    created_from, created_to = as_utc(created_from), as_utc(created_to)
+    if created_from and created_to and created_from >= created_to:
+        raise ValueError("Invalid time range")
+    return _generate_export(session, user_id, export_format, compress, is_active, created_from, created_to)
+
+
+async def _export_rows(
+    session: AsyncSession,
+    user_id: int,
+    is_active: bool | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+) -> AsyncIterator[tuple]:
+    """
+    Перебирает ссылки пользователя в основной базе или по очереди во всех шардах.
+
+    :param session: Асинхронная сессия основной базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param is_active: Фильтр по активным ссылкам (True/False или None для всех).
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :returns: Асинхронный итератор значений полей ``EXPORT_FIELDS``.
+    :rtype: AsyncIterator[tuple]
+    """
+    filters = (user_id, is_active, created_from, created_to, settings.EXPORT_BATCH_SIZE)
+    if not db_manager.shards:
+        async for row in stream_urls_by_user(session, *filters):
+            yield tuple(row)
+        return
+    for shard in range(len(db_manager.shards)):
+        async with db_manager.shards.session(shard) as shard_session:
+            async for row in stream_urls_by_user(shard_session, *filters):
+                yield tuple(row)
+
+
+async def _generate_export(
+    session: AsyncSession,
+    user_id: int,
+    export_format: ExportFormat,
+    compress: bool,
+    is_active: bool | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+) -> AsyncIterator[bytes]:
+    """
+    Генерирует тело выгрузки (параметры — как у :func:`export_user_urls`).
+
+    Сессия зависимости FastAPI закрывается до отправки тела ответа: курсор открывает на ней новую транзакцию,
+    поэтому генератор сам закрывает сессию по завершении.
+
+    :returns: Асинхронный генератор порций тела ответа.
+    :rtype: AsyncIterator[bytes]
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 — формат gzip
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if export_format == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_FIELDS)
+
+    def take_chunk() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    exported = 0
+    try:
+        async for row in _export_rows(session, user_id, is_active, created_from, created_to):
+            values = [_export_value(value) for value in row]
+            if writer:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, values, strict=True)), ensure_ascii=False) + "\n")
+            exported += 1
+            if buffer.tell() >= EXPORT_CHUNK_SIZE and (chunk := take_chunk()):
+                yield chunk
+        if chunk := take_chunk() + (compressor.flush() if compressor else b""):
+            yield chunk
+        logger.info(f"Exported {exported} URLs for user_id {user_id}")
+    except Exception as e:
+        logger.error(f"Error exporting URLs for user_id {user_id}: {e}")
+        raise
+    finally:
+        await session.close()
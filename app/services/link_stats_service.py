@@ -0,0 +1,58 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import LINK_STATS_REPAIRED
+from app.db.crud.url import reconcile_user_link_stats
+from app.services.click_service import SessionFactory
+
+
+async def reconcile_link_stats(session: AsyncSession, batch_size: int | None = None) -> int:
+    """
+    Сверяет счётчики ссылок всех пользователей с их ссылками и исправляет расхождения.
+
+    Счётчики поддерживаются приложением в транзакциях, изменяющих ссылки; расходиться они могут только после
+    записи в обход приложения (загрузка данных, ручные правки). Пользователи обходятся по возрастанию id пачками
+    по ``LINK_STATS_RECONCILE_BATCH_SIZE``, каждая в своей короткой транзакции.
+
+    :param session: Асинхронная сессия базы данных ссылок.
+    :type session: AsyncSession
+    :param batch_size: Размер пачки (по умолчанию ``LINK_STATS_RECONCILE_BATCH_SIZE``).
+    :type batch_size: int | None
+    :returns: Количество исправленных счётчиков.
+    :rtype: int
+    """
+    after_user_id, total = 0, 0
+    while True:
+        last_user_id, repaired = await reconcile_user_link_stats(
+            session, after_user_id, batch_size or settings.LINK_STATS_RECONCILE_BATCH_SIZE
+        )
+        total += repaired
+        if last_user_id is None:
+            break
+        after_user_id = last_user_id
+    if total:
+        LINK_STATS_REPAIRED.inc(amount=total)
+        logger.info(f"Link stats reconciliation repaired {total} user counters")
+    return total
+
+
+async def run_link_stats_reconciliation(session_factory: SessionFactory, interval: float | None = None) -> None:
+    """
+    Фоновая сверка счётчиков ссылок: раз в ``interval`` секунд вызывает :func:`reconcile_link_stats`.
+
+    :param session_factory: Фабрика сессий базы данных ссылок.
+    :type session_factory: SessionFactory
+    :param interval: Период запуска (сек, по умолчанию ``LINK_STATS_RECONCILE_INTERVAL``).
+    :type interval: float | None
+    :returns: None
+    """
+    while True:
+        await asyncio.sleep(interval or settings.LINK_STATS_RECONCILE_INTERVAL)
+        try:
+            async with session_factory() as session:
+                await reconcile_link_stats(session)
+        except Exception as e:
+            logger.error(f"Link stats reconciliation failed: {e}")
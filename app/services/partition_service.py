@@ -0,0 +1,80 @@
+import asyncio
+from datetime import UTC, datetime, time, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import URLS_SWEPT
+from app.db.crud.url import (
+    detach_url_partition,
+    ensure_url_partitions,
+    get_url_partition_months,
+    get_urls_partition_column,
+)
+from app.db.partitioning import add_months, month_start, url_partition_name
+from app.services.click_service import SessionFactory
+
+# Ключ рекомендательной блокировки обслуживания секций, общий для всех экземпляров приложения
+PARTITION_LOCK_KEY = 0x75726C70
+
+
+async def maintain_url_partitions(session: AsyncSession, now: datetime | None = None) -> list[str]:
+    """
+    Обслуживает секции ``urls``, если таблица секционирована.
+
+    Создаёт секции на ``URLS_PARTITION_MONTHS_AHEAD`` месяцев вперёд и отсоединяет секции, целиком лежащие
+    раньше границы отсрочки ``SWEEPER_GRACE_PERIOD_DAYS`` и не содержащие живых ссылок. Отсоединённая секция
+    остаётся отдельной таблицей при ``SWEEPER_ARCHIVE`` и удаляется иначе; ключи её ссылок освобождаются
+    при ``SWEEPER_RELEASE_KEYS``. Так срок хранения обходится без массовых ``DELETE``.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param now: Текущее время (по умолчанию — сейчас, UTC).
+    :type now: datetime | None
+    :returns: Имена отсоединённых секций.
+    :rtype: list[str]
+    """
+    if await get_urls_partition_column(session) is None:
+        return []
+    now = now or datetime.now(UTC)
+    await ensure_url_partitions(session, month_start(now), settings.URLS_PARTITION_MONTHS_AHEAD + 1)
+
+    cutoff = now - timedelta(days=settings.SWEEPER_GRACE_PERIOD_DAYS)
+    detached = []
+    for month in await get_url_partition_months(session):
+        if datetime.combine(add_months(month, 1), time(), UTC) > cutoff:
+            break
+        name = url_partition_name(month)
+        if await detach_url_partition(
+            session,
+            name,
+            cutoff,
+            release_keys=settings.SWEEPER_RELEASE_KEYS,
+            drop=not settings.SWEEPER_ARCHIVE,
+            lock_key=PARTITION_LOCK_KEY,
+        ):
+            detached.append(name)
+            URLS_SWEPT.inc("detach_partition")
+    if detached:
+        logger.info(f"Detached urls partitions: {', '.join(detached)}")
+    return detached
+
+
+async def run_partition_maintenance(session_factory: SessionFactory, interval: float | None = None) -> None:
+    """
+    Фоновое обслуживание секций ``urls``: раз в ``interval`` секунд вызывает :func:`maintain_url_partitions`.
+
+    :param session_factory: Фабрика сессий базы данных.
+    :type session_factory: SessionFactory
+    :param interval: Период запуска (сек, по умолчанию ``URLS_PARTITION_MAINTENANCE_INTERVAL``).
+    :type interval: float | None
+    :returns: None
+    """
+    while True:
+        await asyncio.sleep(interval or settings.URLS_PARTITION_MAINTENANCE_INTERVAL)
+        try:
+            async with session_factory() as session:
+                await maintain_url_partitions(session)
+        except Exception as e:
+            logger.error(f"urls partition maintenance failed: {e}")
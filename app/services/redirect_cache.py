@@ -0,0 +1,165 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+import time
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import CACHE_REQUESTS, REDIRECT_CACHE_SIZE, REGISTRY
+from app.core.timer_wheel import TimerWheel
+from app.schemas.url import URLResponse
+
+# Канал LISTEN/NOTIFY, по которому воркеры сообщают друг другу короткие ключи изменённых ссылок
+URL_CHANGES_CHANNEL = "url_changes"
+
+
+class RedirectCache:
+    """
+    LRU-кеш действующих ссылок по короткому ключу для пути перенаправления.
+
+    Каждая запись снимается колесом таймеров ровно в ``expires_at`` ссылки (с точностью до тика), поэтому
+    кешу не нужен короткий TTL; на случай попадания внутрь тика срок дополнительно сверяется при чтении, и
+    истёкшая ссылка из кеша не отдаётся никогда. Изменения ссылок (PATCH, удаление, массовые действия)
+    сбрасывают записи явно.
+    """
+
+    def __init__(self, maxsize: int, tick: float = 1.0, clock: Callable[[], float] = time.time) -> None:
+        """
+        Инициализирует пустой кеш.
+
+        :param maxsize: Максимальное количество записей (0 — кеш выключен).
+        :type maxsize: int
+        :param tick: Точность колеса таймеров (сек).
+        :type tick: float
+        :param clock: Источник текущего времени (Unix time, сек).
+        :type clock: Callable[[], float]
+        """
+        self.maxsize = maxsize
+        self.clock = clock
+        self._items: OrderedDict[str, URLResponse] = OrderedDict()
+        self._expiry = TimerWheel(clock(), tick)
+
+    def __len__(self) -> int:
+        """
+        Возвращает количество записей.
+
+        :returns: Размер кеша.
+        :rtype: int
+        """
+        return len(self._items)
+
+    def get(self, short_key: str) -> URLResponse | None:
+        """
+        Возвращает действующую ссылку из кеша.
+
+        :param short_key: Короткий ключ.
+        :type short_key: str
+        :returns: Ссылка или None, если её нет в кеше (или срок истёк).
+        :rtype: URLResponse | None
+        """
+        if not self.maxsize:
+            return None
+        now = self._expire()
+        url = self._items.get(short_key)
+        if url is None or url.expires_at.timestamp() <= now:
+            CACHE_REQUESTS.inc("redirect", "miss")
+            return None
+        self._items.move_to_end(short_key)
+        CACHE_REQUESTS.inc("redirect", "hit")
+        return url
+
+    def put(self, url: URLResponse) -> None:
+        """
+        Кладёт ссылку в кеш, если она активна и её срок ещё не истёк; вытесняет самые давние записи.
+
+        :param url: Ссылка.
+        :type url: URLResponse
+        :returns: None
+        """
+        if not self.maxsize or not url.is_active:
+            return
+        self._expire()
+        if not self._expiry.schedule(url.short_key, url.expires_at.timestamp()):
+            return
+        self._items[url.short_key] = url
+        self._items.move_to_end(url.short_key)
+        while len(self._items) > self.maxsize:
+            short_key, _ = self._items.popitem(last=False)
+            self._expiry.cancel(short_key)
+
+    def invalidate(self, *short_keys: str) -> None:
+        """
+        Удаляет записи ссылок из кеша.
+
+        :param short_keys: Короткие ключи.
+        :type short_keys: str
+        :returns: None
+        """
+        for short_key in short_keys:
+            if self._items.pop(short_key, None) is not None:
+                self._expiry.cancel(short_key)
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи.
+
+        :returns: None
+        """
+        for short_key in self._items:
+            self._expiry.cancel(short_key)
+        self._items.clear()
+
+    def _expire(self) -> float:
+        """
+        Продвигает колесо таймеров до текущего момента и удаляет истёкшие записи.
+
+        :returns: Текущее время (сек).
+        :rtype: float
+        """
+        now = self.clock()
+        for short_key in self._expiry.advance(now):
+            del self._items[short_key]
+        return now
+
+
+redirect_cache = RedirectCache(settings.REDIRECT_CACHE_SIZE)
+REGISTRY.add_collector(lambda: REDIRECT_CACHE_SIZE.set(len(redirect_cache)))
+
+
+async def run_redirect_cache_listener(database_url: str, retry_interval: float = 5.0) -> None:
+    """
+    Подписывается на уведомления ``URL_CHANGES_CHANNEL`` и сбрасывает записи изменённых ссылок.
+
+    Слушатель держит отдельное соединение asyncpg вне пула. После (пере)подключения кеш очищается целиком:
+    пока соединения не было, уведомления могли потеряться.
+
+    :param database_url: URL базы данных, через которую воркеры обмениваются уведомлениями.
+    :type database_url: str
+    :param retry_interval: Пауза перед повторным подключением (сек).
+    :type retry_interval: float
+    :returns: None
+    """
+    dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+    while True:
+        try:
+            connection = await asyncpg.connect(dsn)
+        except Exception as e:
+            logger.warning(f"Redirect cache listener failed to connect: {e}")
+            await asyncio.sleep(retry_interval)
+            continue
+        closed = asyncio.Event()
+        try:
+            connection.add_termination_listener(lambda _connection, closed=closed: closed.set())
+            await connection.add_listener(
+                URL_CHANGES_CHANNEL, lambda _connection, _pid, _channel, payload: redirect_cache.invalidate(payload)
+            )
+            redirect_cache.clear()
+            logger.debug(f"Redirect cache listener subscribed to {URL_CHANGES_CHANNEL}")
+            await closed.wait()
+            logger.warning("Redirect cache listener connection lost")
+        finally:
+            await connection.close()
+        await asyncio.sleep(retry_interval)
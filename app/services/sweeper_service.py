@@ -0,0 +1,90 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import URLS_SWEPT
+from app.db.crud.url import sweep_dead_urls
+from app.db.crud.user import bump_user_versions
+from app.services.click_service import SessionFactory
+
+# Ключ рекомендательной блокировки чистильщика, общий для всех экземпляров приложения
+SWEEPER_LOCK_KEY = 0x75726C73
+
+
+async def sweep_dead_links(
+    session: AsyncSession, now: datetime | None = None, primary_session: AsyncSession | None = None
+) -> int:
+    """
+    Удаляет или архивирует истёкшие и деактивированные ссылки старше отсрочки ``SWEEPER_GRACE_PERIOD_DAYS``.
+
+    Работает пачками по ``SWEEPER_BATCH_SIZE`` строк, каждая в своей транзакции, с паузой
+    ``SWEEPER_BATCH_PAUSE`` между ними. Останавливается на неполной пачке, после ``SWEEPER_MAX_BATCHES`` пачек
+    или если блокировку чистильщика держит другой экземпляр. Версии ссылок владельцев обработанных ссылок
+    увеличиваются в транзакции пачки, а если ссылки хранятся в шарде — сразу после неё в основной базе.
+
+    :param session: Асинхронная сессия базы данных ссылок.
+    :type session: AsyncSession
+    :param now: Текущее время (по умолчанию — сейчас, UTC).
+    :type now: datetime | None
+    :param primary_session: Сессия основной базы для версий ссылок (по умолчанию ``session``).
+    :type primary_session: AsyncSession | None
+    :returns: Количество обработанных ссылок.
+    :rtype: int
+    """
+    cutoff = (now or datetime.now(UTC)) - timedelta(days=settings.SWEEPER_GRACE_PERIOD_DAYS)
+    action = "archive" if settings.SWEEPER_ARCHIVE else "delete"
+    total = 0
+    for batch in range(settings.SWEEPER_MAX_BATCHES):
+        if batch:
+            await asyncio.sleep(settings.SWEEPER_BATCH_PAUSE)
+        swept = await sweep_dead_urls(
+            session,
+            cutoff,
+            settings.SWEEPER_BATCH_SIZE,
+            settings.SWEEPER_ARCHIVE,
+            SWEEPER_LOCK_KEY,
+            bump_versions=primary_session is None,
+        )
+        if swept is None:
+            logger.debug("Sweeper lock is held by another instance")
+            break
+        if swept and primary_session is not None:
+            await bump_user_versions(primary_session, swept)
+            await primary_session.commit()
+        total += len(swept)
+        URLS_SWEPT.inc(action, amount=len(swept))
+        if len(swept) < settings.SWEEPER_BATCH_SIZE:
+            break
+    if total:
+        logger.info(f"Sweeper processed {total} dead links ({action})")
+    return total
+
+
+async def run_expiry_sweeper(
+    session_factory: SessionFactory, interval: float | None = None, primary_factory: SessionFactory | None = None
+) -> None:
+    """
+    Фоновый чистильщик мёртвых ссылок: раз в ``interval`` секунд вызывает :func:`sweep_dead_links`.
+
+    :param session_factory: Фабрика сессий базы данных ссылок.
+    :type session_factory: SessionFactory
+    :param interval: Период запуска (сек, по умолчанию ``SWEEPER_INTERVAL``).
+    :type interval: float | None
+    :param primary_factory: Фабрика сессий основной базы, если ссылки хранятся в шарде.
+    :type primary_factory: SessionFactory | None
+    :returns: None
+    """
+    while True:
+        await asyncio.sleep(interval or settings.SWEEPER_INTERVAL)
+        try:
+            async with session_factory() as session:
+                if primary_factory is None:
+                    await sweep_dead_links(session)
+                else:
+                    async with primary_factory() as primary_session:
+                        await sweep_dead_links(session, primary_session=primary_session)
+        except Exception as e:
+            logger.error(f"Expiry sweeper iteration failed: {e}")
@@ -1,19 +1,48 @@
-from datetime import UTC, datetime
+import asyncio
+from contextlib import AbstractAsyncContextManager, nullcontext
+from datetime import UTC, datetime, time, timedelta
+import heapq
+import itertools
 import random
 import string
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.datetime_utils import as_utc
+from app.core.hyperloglog import HLL_RELATIVE_ERROR
 from app.core.logging import logger
+from app.core.metrics import SHORT_KEY_RETRIES
+from app.db.crud.click_event import get_daily_clicks, get_hourly_clicks, get_visitor_sketch
 from app.db.crud.url import (
+    apply_bulk_action,
     create_url,
     delete_url,
+    find_active_user_url,
+    get_existing_url_ids,
     get_url_by_id,
     get_url_by_short_key,
+    get_urls_by_short_keys,
     get_urls_by_user,
-    increment_click_count,
+    is_short_key_taken,
+    notify_url_changes,
+    update_url,
 )
-from app.schemas.url import URLCreate, URLResponse
+from app.db.crud.user import bump_user_versions, get_user_version
+from app.db.session import db_manager
+from app.schemas.url import (
+    BulkAction,
+    ClickBucket,
+    ResolvedKey,
+    StatsGranularity,
+    URLBulkResponse,
+    URLBulkResult,
+    URLCreate,
+    URLResponse,
+    URLStatsResponse,
+)
+from app.services.click_service import ClickContext, record_click
+from app.services.redirect_cache import URL_CHANGES_CHANNEL, redirect_cache
 
 
 def generate_short_key(length: int = 6) -> str:
@@ -29,11 +58,98 @@ def generate_short_key(length: int = 6) -> str:
     return "".join(random.choice(characters) for _ in range(length))
 
 
+def _key_session(session: AsyncSession, short_key: str) -> AbstractAsyncContextManager[AsyncSession]:
+    """
+    Возвращает сессию для ссылки с данным ключом: сессию её шарда или переданную, если шардирование выключено.
+
+    :param session: Сессия основной базы данных.
+    :type session: AsyncSession
+    :param short_key: Короткий ключ ссылки.
+    :type short_key: str
+    :returns: Контекстный менеджер сессии.
+    :rtype: AbstractAsyncContextManager[AsyncSession]
+    """
+    return db_manager.shards.session_for_key(short_key) if db_manager.shards else nullcontext(session)
+
+
+def _url_id_session(session: AsyncSession, url_id: int) -> AbstractAsyncContextManager[AsyncSession]:
+    """
+    Возвращает сессию для ссылки с данным id: сессию её шарда или переданную, если шардирование выключено.
+
+    :param session: Сессия основной базы данных.
+    :type session: AsyncSession
+    :param url_id: Идентификатор ссылки.
+    :type url_id: int
+    :returns: Контекстный менеджер сессии.
+    :rtype: AbstractAsyncContextManager[AsyncSession]
+    """
+    return db_manager.shards.session_for_url_id(url_id) if db_manager.shards else nullcontext(session)
+
+
+async def _invalidate_cached_urls(session: AsyncSession, short_keys: list[str]) -> None:
+    """
+    Сбрасывает изменённые ссылки из кеша перенаправлений этого процесса и уведомляет остальные воркеры.
+
+    Уведомление отправляется после фиксации изменения; его ошибка только логируется, потому что изменение уже
+    применено.
+
+    :param session: Сессия основной базы данных (через неё воркеры обмениваются уведомлениями).
+    :type session: AsyncSession
+    :param short_keys: Короткие ключи изменённых ссылок.
+    :type short_keys: list[str]
+    :returns: None
+    """
+    if not settings.REDIRECT_CACHE_SIZE or not short_keys:
+        return
+    redirect_cache.invalidate(*short_keys)
+    try:
+        await notify_url_changes(session, URL_CHANGES_CHANNEL, short_keys)
+    except Exception as e:
+        logger.error(f"Error notifying workers about {len(short_keys)} changed URLs: {e}")
+
+
+async def _touch_user_urls(session: AsyncSession, user_id: int) -> None:
+    """
+    Увеличивает версию ссылок пользователя, чтобы сменился ETag его списка ссылок.
+
+    Вызывается после фиксации изменения ссылок (при шардировании — в другой базе), поэтому клиент, получивший
+    новую версию, получает и новые данные. Ошибка только логируется: изменение уже применено, а список
+    обновится у клиентов при следующем изменении.
+
+    :param session: Сессия основной базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :returns: None
+    """
+    try:
+        await bump_user_versions(session, [user_id])
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error bumping link version for user_id {user_id}: {e}")
+
+
+async def get_user_urls_version(session: AsyncSession, user_id: int) -> int:
+    """
+    Получает версию ссылок пользователя (основа ETag списка ссылок).
+
+    :param session: Сессия основной базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :returns: Версия ссылок пользователя.
+    :rtype: int
+    """
+    return await get_user_version(session, user_id)
+
+
 async def create_short_url(
     session: AsyncSession,
     original_url: str,
     short_key: str | None,
     user_id: int,
+    redirect_code: int = 307,
 ) -> URLResponse:
     """
     Создаёт новую короткую ссылку.
@@ -46,27 +162,34 @@ async def create_short_url(
     :type short_key: Optional[str]
     :param user_id: Идентификатор пользователя.
     :type user_id: int
+    :param redirect_code: Код перенаправления (307 — временное, 301/308 — постоянное).
+    :type redirect_code: int
     :returns: Созданная запись URL.
     :rtype: URLResponse
     :raises ValueError: Если короткий ключ уже существует.
     """
+    # Ключи ссылок, перенесённых чистильщиком в архив, остаются занятыми, пока их освобождение не разрешено
+    include_archived = not settings.SWEEPER_RELEASE_KEYS
     try:
         if short_key:
-            existing_url = await get_url_by_short_key(session, short_key)
-            if existing_url:
-                raise ValueError("Short key already exists")
+            async with _key_session(session, short_key) as url_session:
+                if await is_short_key_taken(url_session, short_key, include_archived):
+                    raise ValueError("Short key already exists")
         else:
             for _ in range(5):  # Пробуем 5 раз сгенерировать уникальный ключ
                 short_key = generate_short_key()
-                existing_url = await get_url_by_short_key(session, short_key)
-                if not existing_url:
-                    break
+                async with _key_session(session, short_key) as url_session:
+                    if not await is_short_key_taken(url_session, short_key, include_archived):
+                        break
+                SHORT_KEY_RETRIES.inc()
             else:
                 logger.error("Failed to generate unique short key after 5 attempts")
                 raise ValueError("Unable to generate unique short key")
 
-        url_create = URLCreate(original_url=original_url, short_key=short_key)
-        url = await create_url(session, url_create, user_id)
+        url_create = URLCreate(original_url=original_url, short_key=short_key, redirect_code=redirect_code)
+        async with _key_session(session, short_key) as url_session:
+            url = await create_url(url_session, url_create, user_id)
+        await _touch_user_urls(session, user_id)
         return url
     except ValueError as e:
         logger.error(f"Error creating short URL for user_id {user_id}: {e}")
@@ -76,12 +199,46 @@ async def create_short_url(
         raise e from None
 
 
+async def find_reusable_url(
+    session: AsyncSession, original_url: str, user_id: int, redirect_code: int = 307
+) -> URLResponse | None:
+    """
+    Ищет действующую ссылку пользователя на тот же URL с тем же кодом перенаправления.
+
+    При шардировании ссылки пользователя распределены по шардам по короткому ключу, поэтому поиск идёт во всех
+    шардах параллельно.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param original_url: Исходный URL (после валидации схемой).
+    :type original_url: str
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param redirect_code: Код перенаправления.
+    :type redirect_code: int
+    :returns: Найденная ссылка или None.
+    :rtype: URLResponse | None
+    """
+    if not db_manager.shards:
+        return await find_active_user_url(session, user_id, original_url, redirect_code)
+
+    async def fetch(shard: int) -> URLResponse | None:
+        async with db_manager.shards.session(shard) as shard_session:
+            return await find_active_user_url(shard_session, user_id, original_url, redirect_code)
+
+    found = [url for url in await asyncio.gather(*map(fetch, range(len(db_manager.shards)))) if url]
+    return max(found, key=lambda url: url.expires_at, default=None)
+
+
 async def get_user_urls(
     session: AsyncSession, user_id: int, page: int, per_page: int, is_active: bool | None = None
 ) -> tuple[list[URLResponse], int]:
     """
     Получает список URL пользователя с пагинацией и фильтрацией.
 
+    При шардировании каждый шард возвращает первые ``page * per_page`` ссылок пользователя, списки сливаются
+    по ``created_at`` (scatter-gather), а общее количество складывается по шардам.
+
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
     :param user_id: Идентификатор пользователя.
@@ -97,8 +254,17 @@ async def get_user_urls(
     :raises Exception: Если произошла ошибка при запросе к базе данных.
     """
     try:
-        urls, total = await get_urls_by_user(session, user_id, page, per_page, is_active)
-        return urls, total
+        if not db_manager.shards:
+            return await get_urls_by_user(session, user_id, page, per_page, is_active)
+
+        async def fetch(shard: int) -> tuple[list[URLResponse], int]:
+            async with db_manager.shards.session(shard) as shard_session:
+                return await get_urls_by_user(shard_session, user_id, 1, page * per_page, is_active)
+
+        results = await asyncio.gather(*(fetch(shard) for shard in range(len(db_manager.shards))))
+        merged = heapq.merge(*(urls for urls, _ in results), key=lambda url: url.created_at, reverse=True)
+        urls = list(itertools.islice(merged, (page - 1) * per_page, page * per_page))
+        return urls, sum(total for _, total in results)
     except Exception as e:
         logger.error(f"Error retrieving URLs for user_id {user_id}: {e}")
         raise e from None
@@ -118,48 +284,427 @@ async def delete_user_url(session: AsyncSession, url_id: int, user_id: int) -> N
     :raises ValueError: Если URL не найден или не принадлежит пользователю.
     """
     try:
-        url = await get_url_by_id(session, url_id)
+        async with _url_id_session(session, url_id) as url_session:
+            if short_key := await delete_url(url_session, url_id, user_id):
+                await _invalidate_cached_urls(session, [short_key])
+                await _touch_user_urls(session, user_id)
+                return
+            # Удаление не затронуло строк: отдельный запрос нужен только чтобы отличить чужую ссылку от отсутствующей
+            if await get_url_by_id(url_session, url_id):
+                raise ValueError("Not authorized to delete this URL")
+            raise ValueError("URL not found")
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting URL id {url_id} for user_id {user_id}: {e}")
+        raise e from None
+
+
+async def update_user_url(session: AsyncSession, url_id: int, user_id: int, changes: dict) -> URLResponse:
+    """
+    Изменяет активность, срок действия или исходный URL ссылки, если она принадлежит пользователю.
+
+    Изменение выполняется одним выражением ``UPDATE ... WHERE id AND user_id RETURNING``; ссылка сбрасывается
+    из кеша перенаправлений.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param url_id: Идентификатор URL.
+    :type url_id: int
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param changes: Изменяемые поля (``is_active``, ``expires_at``, ``original_url``).
+    :type changes: dict
+    :returns: Изменённая запись URL.
+    :rtype: URLResponse
+    :raises ValueError: Если изменений нет, URL не найден или не принадлежит пользователю.
+    """
+    if not changes:
+        raise ValueError("Nothing to update")
+    if changes.get("expires_at"):
+        changes["expires_at"] = as_utc(changes["expires_at"])
+    try:
+        async with _url_id_session(session, url_id) as url_session:
+            url = await update_url(url_session, url_id, user_id, changes)
+            if url:
+                await _invalidate_cached_urls(session, [url.short_key])
+                await _touch_user_urls(session, user_id)
+                return url
+            if await get_url_by_id(url_session, url_id):
+                raise ValueError("Not authorized to update this URL")
+            raise ValueError("URL not found")
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating URL id {url_id} for user_id {user_id}: {e}")
+        raise e from None
+
+
+# Статус ссылки, к которой массовое действие применилось
+BULK_DONE_STATUSES = {"deactivate": "deactivated", "delete": "deleted"}
+
+
+async def _bulk_by_ids(
+    session: AsyncSession, user_id: int, action: BulkAction, ids: list[int]
+) -> tuple[list[URLBulkResult], list[str]]:
+    """
+    Применяет массовое действие к ссылкам по списку идентификаторов пачками по ``BULK_CHUNK_SIZE``.
+
+    :param session: Сессия основной базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор владельца.
+    :type user_id: int
+    :param action: Действие (deactivate, delete).
+    :type action: BulkAction
+    :param ids: Идентификаторы ссылок без повторов.
+    :type ids: list[int]
+    :returns: Результаты в порядке ``ids`` и короткие ключи затронутых ссылок.
+    :rtype: tuple[list[URLBulkResult], list[str]]
+    """
+    if db_manager.shards:
+        groups: dict[int, list[int]] = {}
+        for url_id in ids:
+            groups.setdefault(db_manager.shards.shard_for_url_id(url_id), []).append(url_id)
+        sessions = [(db_manager.shards.session(shard), group) for shard, group in groups.items()]
+    else:
+        sessions = [(nullcontext(session), ids)]
+
+    done: dict[int, str] = {}
+    foreign: set[int] = set()
+    for session_context, group in sessions:
+        async with session_context as url_session:
+            for start in range(0, len(group), settings.BULK_CHUNK_SIZE):
+                chunk = group[start : start + settings.BULK_CHUNK_SIZE]
+                done.update(await apply_bulk_action(url_session, user_id, action, ids=chunk))
+                if missing := [url_id for url_id in chunk if url_id not in done]:
+                    foreign |= await get_existing_url_ids(url_session, missing)
+
+    def outcome(url_id: int) -> str:
+        if url_id in done:
+            return BULK_DONE_STATUSES[action]
+        return "forbidden" if url_id in foreign else "not_found"
+
+    return [URLBulkResult(id=url_id, status=outcome(url_id)) for url_id in ids], list(done.values())
+
+
+async def _bulk_by_filter(
+    session: AsyncSession,
+    user_id: int,
+    action: BulkAction,
+    is_active: bool | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+) -> tuple[list[URLBulkResult], list[str]]:
+    """
+    Применяет массовое действие к ссылкам пользователя, подходящим под фильтр, пачками по ``BULK_CHUNK_SIZE``.
+
+    :param session: Сессия основной базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор владельца.
+    :type user_id: int
+    :param action: Действие (deactivate, delete).
+    :type action: BulkAction
+    :param is_active: Фильтр по активным ссылкам.
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :returns: Результаты по затронутым ссылкам и их короткие ключи.
+    :rtype: tuple[list[URLBulkResult], list[str]]
+    """
+    if db_manager.shards:
+        sessions = [db_manager.shards.session(shard) for shard in range(len(db_manager.shards))]
+    else:
+        sessions = [nullcontext(session)]
+
+    results, short_keys = [], []
+    for session_context in sessions:
+        async with session_context as url_session:
+            after_id = 0
+            while True:
+                affected = await apply_bulk_action(
+                    url_session,
+                    user_id,
+                    action,
+                    is_active=is_active,
+                    created_from=created_from,
+                    created_to=created_to,
+                    after_id=after_id,
+                    limit=settings.BULK_CHUNK_SIZE,
+                )
+                results += [URLBulkResult(id=url_id, status=BULK_DONE_STATUSES[action]) for url_id, _ in affected]
+                short_keys += [short_key for _, short_key in affected]
+                if len(affected) < settings.BULK_CHUNK_SIZE:
+                    break
+                after_id = affected[-1][0]
+    return results, short_keys
+
+
+async def bulk_update_user_urls(
+    session: AsyncSession,
+    user_id: int,
+    action: BulkAction,
+    ids: list[int] | None = None,
+    is_active: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> URLBulkResponse:
+    """
+    Деактивирует или удаляет ссылки пользователя по списку идентификаторов либо по фильтру.
+
+    Каждая пачка — одно выражение ``UPDATE``/``DELETE ... RETURNING id`` со своей транзакцией, поэтому при ошибке
+    уже обработанные пачки остаются применёнными. Для ссылок из ``ids``, которые не были затронуты, одним
+    запросом определяется, чужие они (forbidden) или отсутствуют (not_found). Затронутые ссылки сбрасываются
+    из кеша перенаправлений.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param action: Действие (deactivate, delete).
+    :type action: BulkAction
+    :param ids: Идентификаторы ссылок.
+    :type ids: list[int] | None
+    :param is_active: Фильтр по активным ссылкам.
+    :type is_active: bool | None
+    :param created_from: Начало периода создания (включительно).
+    :type created_from: datetime | None
+    :param created_to: Конец периода создания (не включается).
+    :type created_to: datetime | None
+    :returns: Результаты по ссылкам.
+    :rtype: URLBulkResponse
+    :raises ValueError: Если не задан ни список, ни фильтр, заданы оба, список слишком длинный или период некорректен.
+    """
+    has_filter = is_active is not None or created_from is not None or created_to is not None
+    if ids is None and not has_filter:
+        raise ValueError("Either ids or a filter is required")
+    if ids is not None and has_filter:
+        raise ValueError("ids and filter are mutually exclusive")
+    if ids is not None and len(ids) > settings.BULK_MAX_IDS:
+        raise ValueError(f"Too many ids (max {settings.BULK_MAX_IDS})")
+    created_from, created_to = as_utc(created_from), as_utc(created_to)
+    if created_from and created_to and created_from >= created_to:
+        raise ValueError("Invalid time range")
+
+    try:
+        if ids is not None:
+            results, short_keys = await _bulk_by_ids(session, user_id, action, list(dict.fromkeys(ids)))
+        else:
+            results, short_keys = await _bulk_by_filter(session, user_id, action, is_active, created_from, created_to)
+        await _invalidate_cached_urls(session, short_keys)
+        if short_keys:
+            await _touch_user_urls(session, user_id)
+    except Exception as e:
+        logger.error(f"Error applying bulk {action} for user_id {user_id}: {e}")
+        raise e from None
+    processed = sum(result.status == BULK_DONE_STATUSES[action] for result in results)
+    logger.info(f"Bulk {action} for user_id {user_id}: {processed} of {len(results)} URLs")
+    return URLBulkResponse(action=action, processed=processed, results=results)
+
+
+# Максимальный период почасовой статистики: длинные периоды запрашиваются по дням
+MAX_HOURLY_STATS_RANGE = timedelta(days=31)
+
+
+async def get_url_click_stats(
+    session: AsyncSession,
+    url_id: int,
+    user_id: int,
+    granularity: StatsGranularity = "day",
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> URLStatsResponse:
+    """
+    Возвращает статистику переходов по ссылке из почасовой или дневной сводки, если ссылка принадлежит пользователю.
+
+    По умолчанию период заканчивается текущим моментом и длится 7 дней (по дням) или 24 часа (по часам).
+    Даты без часового пояса считаются UTC. Интервалы сводок целиком суммируются, поэтому в ответе период
+    расширен до границ часов или дней UTC, в которые попадают его начало и конец.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param url_id: Идентификатор ссылки.
+    :type url_id: int
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :param granularity: Гранулярность интервалов (hour, day).
+    :type granularity: StatsGranularity
+    :param start: Начало периода.
+    :type start: datetime | None
+    :param end: Конец периода (не включается).
+    :type end: datetime | None
+    :returns: Статистика переходов.
+    :rtype: URLStatsResponse
+    :raises ValueError: Если ссылка не найдена, не принадлежит пользователю или период некорректен.
+    """
+    try:
+        async with _url_id_session(session, url_id) as url_session:
+            url = await get_url_by_id(url_session, url_id)
         if not url:
             raise ValueError("URL not found")
         if url.user_id != user_id:
-            raise ValueError("Not authorized to delete this URL")
+            raise ValueError("Not authorized to view this URL")
 
-        success = await delete_url(session, url_id)
-        if not success:
-            raise ValueError("URL not found")
+        end = as_utc(end) if end else datetime.now(UTC)
+        default_range = timedelta(days=7) if granularity == "day" else timedelta(hours=24)
+        start = as_utc(start) if start else end - default_range
+        if start >= end:
+            raise ValueError("Invalid time range")
+
+        if granularity == "hour":
+            if end - start > MAX_HOURLY_STATS_RANGE:
+                raise ValueError("Time range too large for hourly stats")
+            start = start.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+            last_hour = (end - timedelta(microseconds=1)).astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+            end = last_hour + timedelta(hours=1)
+            rows = await get_hourly_clicks(session, url_id, start, end)
+        else:
+            first_day, last_day = start.astimezone(UTC).date(), (end - timedelta(microseconds=1)).astimezone(UTC).date()
+            days = await get_daily_clicks(session, url_id, first_day, last_day)
+            start = datetime.combine(first_day, time(), tzinfo=UTC)
+            end = datetime.combine(last_day + timedelta(days=1), time(), tzinfo=UTC)
+            rows = [(datetime.combine(day, time(), tzinfo=UTC), clicks) for day, clicks in days]
+
+        buckets = [ClickBucket(start=bucket, clicks=clicks) for bucket, clicks in rows]
+        sketch = await get_visitor_sketch(session, url_id)
+        return URLStatsResponse(
+            url_id=url_id,
+            granularity=granularity,
+            start=start,
+            end=end,
+            total=sum(bucket.clicks for bucket in buckets),
+            buckets=buckets,
+            unique_visitors=sketch.count() if sketch else 0,
+            unique_visitors_error=HLL_RELATIVE_ERROR,
+        )
     except ValueError:
         raise
     except Exception as e:
-        logger.error(f"Error deleting URL id {url_id} for user_id {user_id}: {e}")
+        logger.error(f"Error retrieving click stats for URL id {url_id}: {e}")
         raise e from None
 
 
-async def redirect_to_url(session: AsyncSession, short_key: str) -> str:
+async def resolve_short_key(
+    session: AsyncSession, short_key: str, count_click: bool = True, context: ClickContext | None = None
+) -> URLResponse:
     """
-    Получает оригинальный URL для перенаправления и увеличивает счётчик кликов.
+    Находит действующую ссылку по короткому ключу и при необходимости учитывает переход.
+
+    Действующие ссылки берутся из кеша перенаправлений процесса, промах читает ссылку из базы данных и кладёт её
+    в кеш. Переход только ставится в очередь (O(1)); событие и счётчик кликов записывает фоновый писатель.
 
     :param session: Асинхронная сессия базы данных.
     :type session: AsyncSession
     :param short_key: Короткий ключ ссылки.
     :type short_key: str
-    :returns: Оригинальный URL.
-    :rtype: str
+    :param count_click: Учитывать ли переход (False для HEAD-запросов).
+    :type count_click: bool
+    :param context: Данные о переходе (Referer, User-Agent, подсеть клиента).
+    :type context: ClickContext | None
+    :returns: Запись URL, на которую нужно перенаправить.
+    :rtype: URLResponse
     :raises ValueError: Если ссылка не найдена, неактивна или истёк срок действия.
     """
     try:
-        url = await get_url_by_short_key(session, short_key)
-        if not url:
-            raise ValueError("URL not found")
+        url = redirect_cache.get(short_key)
+        if url is None:
+            async with _key_session(session, short_key) as url_session:
+                url = await get_url_by_short_key(url_session, short_key)
+            if not url:
+                raise ValueError("URL not found")
+            redirect_cache.put(url)
         if not url.is_active:
             raise ValueError("URL is inactive")
         if url.expires_at < datetime.now(UTC):
             raise ValueError("URL has expired")
 
-        await increment_click_count(session, url.id)
-        return url.original_url
+        if count_click:
+            record_click(url.id, context)
+        return url
     except ValueError as e:
         logger.error(f"Error redirecting for short_key {short_key}: {e}")
         raise
     except Exception as e:
         logger.error(f"Error redirecting for short_key {short_key}: {e}")
         raise e from None
+
+
+def _resolved_key(url: URLResponse | None, now: datetime) -> ResolvedKey:
+    """
+    Определяет результат разрешения ключа по тем же правилам, что и перенаправление.
+
+    :param url: Найденная ссылка или None.
+    :type url: URLResponse | None
+    :param now: Текущее время.
+    :type now: datetime
+    :returns: Результат разрешения.
+    :rtype: ResolvedKey
+    """
+    if not url:
+        return ResolvedKey(status="not_found")
+    if not url.is_active:
+        return ResolvedKey(status="inactive")
+    if url.expires_at < now:
+        return ResolvedKey(status="expired")
+    return ResolvedKey(
+        status="ok", original_url=url.original_url, redirect_code=url.redirect_code, expires_at=url.expires_at
+    )
+
+
+async def resolve_short_keys(session: AsyncSession, short_keys: list[str]) -> dict[str, ResolvedKey]:
+    """
+    Разрешает пакет коротких ключей без учёта переходов.
+
+    Ключи сначала ищутся в кеше перенаправлений, остальные читаются одним запросом ``short_key = ANY(:keys)``
+    (при шардировании — по одному запросу на шард); найденные действующие ссылки кладутся в кеш.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param short_keys: Короткие ключи.
+    :type short_keys: list[str]
+    :returns: Результаты по коротким ключам в порядке запроса (без повторов).
+    :rtype: dict[str, ResolvedKey]
+    :raises ValueError: Если ключей больше ``RESOLVE_MAX_KEYS``.
+    """
+    if len(short_keys) > settings.RESOLVE_MAX_KEYS:
+        raise ValueError(f"Too many short keys (max {settings.RESOLVE_MAX_KEYS})")
+    urls = {short_key: redirect_cache.get(short_key) for short_key in dict.fromkeys(short_keys)}
+    missing = [short_key for short_key, url in urls.items() if url is None]
+    try:
+        if missing and db_manager.shards:
+            groups: dict[int, list[str]] = {}
+            for short_key in missing:
+                groups.setdefault(db_manager.shards.shard_for_key(short_key), []).append(short_key)
+
+            async def fetch(shard: int, keys: list[str]) -> list[URLResponse]:
+                async with db_manager.shards.session(shard) as shard_session:
+                    return await get_urls_by_short_keys(shard_session, keys)
+
+            found = itertools.chain(*await asyncio.gather(*(fetch(shard, keys) for shard, keys in groups.items())))
+        else:
+            found = await get_urls_by_short_keys(session, missing) if missing else []
+    except Exception as e:
+        logger.error(f"Error resolving {len(missing)} short keys: {e}")
+        raise e from None
+    for url in found:
+        urls[url.short_key] = url
+        redirect_cache.put(url)
+    now = datetime.now(UTC)
+    return {short_key: _resolved_key(url, now) for short_key, url in urls.items()}
+
+
+async def redirect_to_url(session: AsyncSession, short_key: str) -> str:
+    """
+    Получает оригинальный URL для перенаправления и ставит переход в очередь на запись.
+
+    :param session: Асинхронная сессия базы данных.
+    :type session: AsyncSession
+    :param short_key: Короткий ключ ссылки.
+    :type short_key: str
+    :returns: Оригинальный URL.
+    :rtype: str
+    :raises ValueError: Если ссылка не найдена, неактивна или истёк срок действия.
+    """
+    url = await resolve_short_key(session, short_key)
+    return url.original_url
@@ -0,0 +1,329 @@
+"""
+Нагрузочный бенчмарк эндпоинтов перенаправления, создания и списка ссылок.
+
+Приложение прогоняется либо в том же процессе через ``httpx.ASGITransport`` (как в ``tests/conftest.py``),
+либо через сокет против локального uvicorn, запущенного подпроцессом. Сценарии:
+
+- ``redirect_mix`` — перенаправления с долей попаданий ``--hit-ratio`` (остальное — несуществующие ключи);
+- ``create_random_key`` / ``create_custom_key`` — создание ссылок без ключа и с пользовательским ключом;
+- ``list_deep_page`` — последняя страница списка ссылок пользователя (максимальный OFFSET) по ``--per-page``
+  ссылок: при ``--per-page 100`` основную долю времени занимает сериализация ответа.
+
+Данные готовятся там, где их ищет приложение: при шардировании (``SHARD_DATABASE_URLS``) ссылки пользователя
+бенчмарка вставляются в шарды по короткому ключу.
+
+Результаты сохраняются в JSON; при указании ``--baseline`` сравниваются с базовым прогоном, и при регрессии
+больше ``--tolerance`` процесс завершается с кодом 1.
+
+Запуск::
+
+    poetry run python -m benchmarks.load --target inprocess --output bench.json
+    poetry run python -m benchmarks.load --target uvicorn --baseline bench.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+import itertools
+import json
+import logging
+import os
+from pathlib import Path
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from httpx import ASGITransport, AsyncClient, Response, TransportError
+from sqlalchemy import Connection, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.crud.url import reconcile_user_link_stats
+from app.db.crud.user import bump_user_versions, create_user, get_user_by_username
+from app.db.models.url import URL
+from app.db.session import DatabaseManager, get_session
+from app.main import app
+from app.schemas.user import UserCreate
+from benchmarks.loadgen import RequestFn, compare_with_baseline, print_results, run_load
+
+BENCH_USERNAME = "bench_load"
+BENCH_PASSWORD = "bench_load_password"
+HIT_KEY_PREFIX = "bench-hit-"
+HIT_KEYS = 100
+SCENARIOS = ("redirect_mix", "create_random_key", "create_custom_key", "list_deep_page")
+MIGRATIONS_PATH = Path(__file__).parents[1] / "migrations"
+
+
+def schema_revisions(connection: Connection) -> tuple[str | None, str | None]:
+    """
+    Возвращает текущую ревизию схемы базы данных и последнюю ревизию миграций.
+
+    :param connection: Синхронное соединение с базой данных.
+    :type connection: Connection
+    :returns: Текущая ревизия (None — миграции не применялись) и последняя ревизия.
+    :rtype: tuple[str | None, str | None]
+    """
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_PATH))
+    head = ScriptDirectory.from_config(config).get_current_head()
+    return MigrationContext.configure(connection).get_current_revision(), head
+
+
+def link_session(db: DatabaseManager, shard: int | None) -> AbstractAsyncContextManager[AsyncSession]:
+    """
+    Открывает сессию базы данных ссылок: шарда или основной базы без шардирования.
+
+    :param db: Менеджер базы данных для бенчмарка.
+    :type db: DatabaseManager
+    :param shard: Номер шарда (None — без шардирования).
+    :type shard: int | None
+    :returns: Контекстный менеджер сессии.
+    :rtype: AbstractAsyncContextManager[AsyncSession]
+    """
+    return db.shards.session(shard) if db.shards else db.session()
+
+
+async def prepare_data(db: DatabaseManager, list_rows: int) -> int:
+    """
+    Создаёт пользователя бенчмарка, ключи для перенаправлений и строки для списка.
+
+    Схема должна быть создана миграциями: ``create_all`` не создаёт секции ``click_events`` и не переводит
+    ``urls`` в секционированную таблицу. Ссылки вставляются в обход приложения, поэтому счётчики ссылок
+    и версия списка пользователя обновляются здесь же. При шардировании ссылки вставляются в шард, который
+    приложение выбирает по короткому ключу, а схема шардов приводится к последней ревизии их миграций.
+
+    :param db: Менеджер базы данных для бенчмарка.
+    :type db: DatabaseManager
+    :param list_rows: Минимальное количество ссылок пользователя для сценария глубокой страницы.
+    :type list_rows: int
+    :returns: Количество ссылок пользователя бенчмарка.
+    :rtype: int
+    :raises RuntimeError: Если схема базы данных не приведена к последней ревизии миграций.
+    """
+    async with db.engine.connect() as conn:
+        current, head = await conn.run_sync(schema_revisions)
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'}, expected {head}: "
+            "run make migrate against this database first"
+        )
+    if db.shards:
+        await db.shards.connect()
+    async with db.session() as session:
+        user = await get_user_by_username(session, BENCH_USERNAME)
+        if not user:
+            user = await create_user(session, UserCreate(username=BENCH_USERNAME, password=BENCH_PASSWORD))
+
+    shards = list(range(len(db.shards))) if db.shards else [None]
+    existing = 0
+    for shard in shards:
+        async with link_session(db, shard) as session:
+            existing += await session.scalar(select(func.count()).select_from(URL).where(URL.user_id == user.id))
+    missing = max(list_rows - existing, HIT_KEYS if not existing else 0)
+    rows_by_shard: dict[int | None, list[dict]] = {}
+    for i in range(existing, existing + missing):
+        short_key = f"{HIT_KEY_PREFIX}{i}" if i < HIT_KEYS else f"bench-{uuid.uuid4().hex[:12]}"
+        shard = db.shards.shard_for_key(short_key) if db.shards else None
+        row = {"original_url": f"https://example.com/bench/{i}", "short_key": short_key, "user_id": user.id}
+        rows_by_shard.setdefault(shard, []).append(row)
+    for shard in shards:
+        async with link_session(db, shard) as session:
+            if rows := rows_by_shard.get(shard):
+                await session.execute(insert(URL), rows)
+                await session.commit()
+            # Сверяются и счётчики ссылок, вставленных прежними версиями бенчмарка без их обновления
+            await reconcile_user_link_stats(session, user.id - 1, 1)
+    if missing:
+        async with db.session() as session:
+            await bump_user_versions(session, {user.id})
+            await session.commit()
+    return existing + missing
+
+
+def build_scenarios(
+    client: AsyncClient, hit_ratio: float, deep_page: int, per_page: int
+) -> dict[str, tuple[RequestFn, frozenset]]:
+    """
+    Создаёт функции запросов для сценариев и ожидаемые статусы ответов.
+
+    :param client: HTTP-клиент, настроенный на тестируемое приложение.
+    :type client: AsyncClient
+    :param hit_ratio: Доля перенаправлений по существующим ключам.
+    :type hit_ratio: float
+    :param deep_page: Номер страницы для сценария глубокой страницы.
+    :type deep_page: int
+    :param per_page: Размер страницы для сценария глубокой страницы.
+    :type per_page: int
+    :returns: Функция запроса и ожидаемые статусы по имени сценария.
+    :rtype: dict[str, tuple[RequestFn, frozenset]]
+    """
+    auth = (BENCH_USERNAME, BENCH_PASSWORD)
+    run_id = uuid.uuid4().hex[:8]
+    # Сквозной счётчик: прогрев и замер вызывают сценарий с одними и теми же индексами
+    sequence = itertools.count()
+
+    async def redirect_mix(index: int) -> Response:
+        if random.random() < hit_ratio:
+            key = f"{HIT_KEY_PREFIX}{random.randrange(HIT_KEYS)}"
+        else:
+            key = f"bench-miss-{index}"
+        return await client.get(f"/api/v1/r/{key}")
+
+    async def create_random_key(index: int) -> Response:
+        payload = {"original_url": f"https://example.com/created/{run_id}/{next(sequence)}"}
+        return await client.post("/api/v1/urls", json=payload, auth=auth)
+
+    async def create_custom_key(index: int) -> Response:
+        number = next(sequence)
+        payload = {"original_url": f"https://example.com/custom/{run_id}/{number}", "short_key": f"c{run_id}{number}"}
+        return await client.post("/api/v1/urls", json=payload, auth=auth)
+
+    async def list_deep_page(index: int) -> Response:
+        return await client.get("/api/v1/urls", params={"page": deep_page, "per_page": per_page}, auth=auth)
+
+    return {
+        "redirect_mix": (redirect_mix, frozenset({307, 404})),
+        "create_random_key": (create_random_key, frozenset({201})),
+        "create_custom_key": (create_custom_key, frozenset({201})),
+        "list_deep_page": (list_deep_page, frozenset({200})),
+    }
+
+
+@asynccontextmanager
+async def inprocess_client(db: DatabaseManager) -> AsyncIterator[AsyncClient]:
+    """
+    Клиент поверх приложения в текущем процессе с сессиями из менеджера бенчмарка.
+
+    :param db: Менеджер базы данных для бенчмарка.
+    :type db: DatabaseManager
+    :returns: HTTP-клиент.
+    :rtype: AsyncIterator[AsyncClient]
+    """
+
+    async def bench_session() -> AsyncGenerator[AsyncSession, None]:
+        async with db.session() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = bench_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _free_port() -> int:
+    """
+    Находит свободный TCP-порт на localhost.
+
+    :returns: Номер порта.
+    :rtype: int
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(database_url: str, workers: int) -> AsyncIterator[AsyncClient]:
+    """
+    Запускает uvicorn подпроцессом и возвращает клиент, подключённый к нему через сокет.
+
+    :param database_url: URL базы данных для сервера.
+    :type database_url: str
+    :param workers: Количество воркеров uvicorn.
+    :type workers: int
+    :returns: HTTP-клиент.
+    :rtype: AsyncIterator[AsyncClient]
+    :raises RuntimeError: Если сервер не поднялся за 30 секунд.
+    """
+    port = _free_port()
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers)]
+    command += ["--log-level", "warning", "--no-access-log"]
+    server = subprocess.Popen(
+        command, env={**os.environ, "DATABASE_URL": database_url}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        async with AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/metrics")
+                    break
+                except TransportError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start") from None
+                    await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main(args: argparse.Namespace) -> int:
+    """
+    Подготавливает данные, прогоняет выбранные сценарии и сохраняет/сравнивает результаты.
+
+    :param args: Аргументы командной строки.
+    :type args: argparse.Namespace
+    :returns: Код завершения процесса (1 — обнаружена регрессия).
+    :rtype: int
+    """
+    db = DatabaseManager(args.database_url, settings.SHARD_DATABASE_URLS)
+    total = await prepare_data(db, args.list_rows)
+    deep_page = max(1, (total + args.per_page - 1) // args.per_page)
+
+    client_cm = inprocess_client(db) if args.target == "inprocess" else uvicorn_client(args.database_url, args.workers)
+    results: dict[str, dict[str, float]] = {}
+    try:
+        async with client_cm as client:
+            scenarios = build_scenarios(client, args.hit_ratio, deep_page, args.per_page)
+            for name in args.scenarios:
+                request_fn, expected = scenarios[name]
+                requests = args.requests if name == "redirect_mix" else args.write_requests
+                await run_load(request_fn, min(requests, args.warmup), args.concurrency, expected)
+                results[name] = await run_load(request_fn, requests, args.concurrency, expected)
+    finally:
+        await db.close()
+
+    baseline = json.loads(Path(args.baseline).read_text())["results"] if args.baseline else None
+    print_results(results, baseline)
+    if args.output:
+        meta = {"target": args.target, "concurrency": args.concurrency, "per_page": args.per_page}
+        meta["python"] = platform.python_version()
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+    regressions = compare_with_baseline(results, baseline, args.tolerance) if baseline else []
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="воркеры uvicorn (только --target uvicorn)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="запросов в сценарии перенаправлений")
+    parser.add_argument("--write-requests", type=int, default=200, help="запросов в сценариях с аутентификацией")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--hit-ratio", type=float, default=0.9)
+    parser.add_argument("--list-rows", type=int, default=10_000)
+    parser.add_argument("--per-page", type=int, default=20, help="размер страницы в сценарии list_deep_page (до 100)")
+    parser.add_argument("--output", help="файл для сохранения результатов в JSON")
+    parser.add_argument("--baseline", help="JSON базового прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    # Консольный вывод логов на каждый запрос исказил бы замеры
+    logger.setLevel(logging.WARNING)
+    sys.exit(asyncio.run(main(args)))
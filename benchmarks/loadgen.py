@@ -0,0 +1,119 @@
+"""Асинхронный генератор нагрузки и расчёт статистики задержек для бенчмарков."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import statistics
+import time
+
+from httpx import Response
+
+# Функция одного запроса сценария: получает порядковый номер запроса, возвращает ответ
+RequestFn = Callable[[int], Awaitable[Response]]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int) -> dict[str, float]:
+    """
+    Считает пропускную способность и перцентили задержки.
+
+    :param latencies: Задержки запросов (сек).
+    :type latencies: list[float]
+    :param elapsed: Общее время прогона (сек).
+    :type elapsed: float
+    :param errors: Количество ответов с неожиданным статусом.
+    :type errors: int
+    :returns: Количество запросов, ошибок, req/s и p50/p95/p99 (мс).
+    :rtype: dict[str, float]
+    """
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def run_load(
+    request_fn: RequestFn, requests: int, concurrency: int, expected_statuses: frozenset[int]
+) -> dict[str, float]:
+    """
+    Выполняет ``requests`` запросов в ``concurrency`` воркеров (замкнутая модель нагрузки) и собирает задержки.
+
+    :param request_fn: Функция одного запроса сценария.
+    :type request_fn: RequestFn
+    :param requests: Общее количество запросов.
+    :type requests: int
+    :param concurrency: Количество одновременных воркеров.
+    :type concurrency: int
+    :param expected_statuses: Статусы ответа, которые не считаются ошибкой.
+    :type expected_statuses: frozenset[int]
+    :returns: Результат :func:`summarize`.
+    :rtype: dict[str, float]
+    """
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in remaining:
+            started = time.perf_counter()
+            response = await request_fn(index)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in expected_statuses:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def compare_with_baseline(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float
+) -> list[str]:
+    """
+    Сравнивает результаты с базовым прогоном.
+
+    Регрессией считается падение req/s или рост p99 больше чем на ``tolerance`` (доля).
+
+    :param results: Результаты текущего прогона по сценариям.
+    :type results: dict[str, dict[str, float]]
+    :param baseline: Результаты базового прогона по сценариям.
+    :type baseline: dict[str, dict[str, float]]
+    :param tolerance: Допустимое относительное отклонение.
+    :type tolerance: float
+    :returns: Описания регрессий (пустой список — регрессий нет).
+    :rtype: list[str]
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {result['rps']:.0f} < baseline {base['rps']:.0f}")
+        if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {result['p99_ms']:.2f} ms > baseline {base['p99_ms']:.2f} ms")
+    return regressions
+
+
+def print_results(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]] | None = None) -> None:
+    """
+    Печатает таблицу результатов (и изменение req/s относительно базового прогона, если он задан).
+
+    :param results: Результаты по сценариям.
+    :type results: dict[str, dict[str, float]]
+    :param baseline: Результаты базового прогона по сценариям.
+    :type baseline: dict[str, dict[str, float]] | None
+    :returns: None
+    """
+    print(f"{'scenario':<22}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'vs base':>10}")
+    for name, result in results.items():
+        base = (baseline or {}).get(name)
+        delta = f"{(result['rps'] / base['rps'] - 1) * 100:+.1f}%" if base else ""
+        print(
+            f"{name:<22}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['errors']:>8}{delta:>10}"
+        )
@@ -0,0 +1,180 @@
+"""
+Микробенчмарки горячих функций, которые выполняются на каждый запрос.
+
+Каждая функция замеряется через ``timeit`` (время одного вызова). Абсолютное время зависит от машины, поэтому
+сохраняется и сравнивается отношение ко времени калибровочной функции (``calibration``: чистый Python без
+зависимостей приложения), замеренной в том же процессе вперемежку с функцией. Если отношение выросло больше
+чем на допуск, процесс завершается с кодом 1. Допуск задаётся ``--tolerance`` и может быть
+переопределён для отдельной функции в ``TOLERANCES``.
+
+Запуск::
+
+    poetry run python -m benchmarks.micro                    # сравнение с benchmarks/baselines/micro.json
+    poetry run python -m benchmarks.micro --update-baseline  # сохранить текущие результаты как базовые
+"""
+
+import argparse
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+import json
+from pathlib import Path
+import platform
+import statistics
+import sys
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse
+from pydantic import AnyUrl as PydanticAnyUrl, TypeAdapter
+
+from app.api.v1.urls import json_response
+from app.auth.utils import get_password_hash, verify_password
+from app.core.url_normalization import normalize_url
+from app.db.models.url import URL
+from app.schemas.url import AnyUrl, URLListResponse, URLResponse
+from app.services.url_service import generate_short_key
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "micro.json"
+DEFAULT_TOLERANCE = 0.25
+# bcrypt — C-код, его отношение к калибровке на интерпретаторе шумит и зависит от машины; допуск ловит главное —
+# рост cost factor, каждая ступень которого удваивает время
+TOLERANCES = {"verify_password": 1.0}
+
+
+def calibration() -> int:
+    """
+    Калибровочная нагрузка: вызовы, форматирование строк и словари на чистом Python.
+
+    :returns: Контрольная сумма, чтобы работа не была пустой.
+    :rtype: int
+    """
+    index = {}
+    for i in range(200):
+        index[f"key{i}"] = len(str(i * 31))
+    return sum(index.values())
+
+
+def build_benchmarks() -> dict[str, Callable[[], object]]:
+    """
+    Готовит данные и возвращает замеряемые функции без аргументов.
+
+    :returns: Функции по имени бенчмарка.
+    :rtype: dict[str, Callable[[], object]]
+    """
+    url_adapter = TypeAdapter(AnyUrl)
+    pydantic_url_adapter = TypeAdapter(PydanticAnyUrl)
+    now = datetime.now(UTC)
+    orm_url = URL(
+        id=1,
+        original_url="https://example.com/some/long/path?utm_source=newsletter&utm_medium=email",
+        short_key="aB3dE9",
+        is_active=True,
+        expires_at=now + timedelta(days=1),
+        created_at=now,
+        click_count=42,
+        redirect_code=307,
+        user_id=1,
+    )
+    hashed_password = get_password_hash("benchmark_password")
+    # Страница списка из 100 ссылок: как строки из БД (кортежи) и как ORM-объекты
+    page_rows = [{field: getattr(orm_url, field) for field in URLResponse.model_fields} for _ in range(100)]
+    page_orm = [orm_url] * 100
+    page_meta = {"total": 1000, "page": 1, "per_page": 100, "total_pages": 10}
+
+    def url_list_default() -> bytes:
+        # Прежний путь: валидация в CRUD и в эндпоинте, затем response_model и json.dumps в FastAPI
+        urls = [URLResponse.model_validate(url) for url in page_orm]
+        response = URLListResponse(items=[URLResponse.model_validate(url) for url in urls], **page_meta)
+        return JSONResponse(jsonable_encoder(URLListResponse.model_validate(response.model_dump()))).body
+
+    def url_list_fast() -> bytes:
+        urls = [URLResponse.model_construct(**row) for row in page_rows]
+        return json_response(URLListResponse(items=urls, **page_meta)).body
+
+    return {
+        "generate_short_key": generate_short_key,
+        "any_url_validator": lambda: url_adapter.validate_python(orm_url.original_url),
+        # Валидатор до нормализации (разбор pydantic и str()) и нормализация без кеша — для сравнения с кешем
+        "pydantic_any_url": lambda: str(pydantic_url_adapter.validate_python(orm_url.original_url)),
+        "normalize_url_uncached": lambda: normalize_url.__wrapped__(orm_url.original_url),
+        "url_response_from_orm": lambda: URLResponse.model_validate(orm_url),
+        "url_list_default_100": url_list_default,
+        "url_list_fast_100": url_list_fast,
+        "redirect_response": lambda: RedirectResponse(url=orm_url.original_url, status_code=307),
+        "verify_password": lambda: verify_password("benchmark_password", hashed_password),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """
+    Замеряет время одного вызова функции и его отношение ко времени вызова ``calibration``.
+
+    Количество вызовов в серии подбирается ``Timer.autorange`` (не меньше 0.2 с на серию). Серии функции
+    чередуются с сериями калибровки, отношение считается для каждой пары и берётся медиана: смена частоты CPU
+    и фоновая нагрузка сказываются на обеих сериях пары и почти не меняют отношение.
+
+    :param func: Замеряемая функция.
+    :type func: Callable[[], object]
+    :param repeat: Количество пар серий.
+    :type repeat: int
+    :returns: Лучшее время одного вызова (сек) и медиана отношений к калибровке.
+    :rtype: tuple[float, float]
+    """
+    timer, calibration_timer = timeit.Timer(func), timeit.Timer(calibration)
+    number, _ = timer.autorange()
+    calibration_number, _ = calibration_timer.autorange()
+    elapsed, ratios = [], []
+    for _ in range(repeat):
+        unit = calibration_timer.timeit(calibration_number) / calibration_number
+        elapsed.append(timer.timeit(number) / number)
+        ratios.append(elapsed[-1] / unit)
+    return min(elapsed), statistics.median(ratios)
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Прогоняет микробенчмарки и сравнивает их с базовым прогоном (или сохраняет новый).
+
+    :param args: Аргументы командной строки.
+    :type args: argparse.Namespace
+    :returns: Код завершения процесса (1 — обнаружена регрессия).
+    :rtype: int
+    """
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text())["results"] if baseline_path.exists() else {}
+    results = {}
+    regressions = []
+
+    print(f"{'benchmark':<24}{'us/call':>12}{'x calib':>12}{'baseline':>12}{'change':>10}")
+    for name, func in build_benchmarks().items():
+        if args.only and name not in args.only:
+            continue
+        elapsed, results[name] = measure(func, args.repeat)
+        base = baseline.get(name)
+        change = results[name] / base - 1 if base else None
+        print(
+            f"{name:<24}{elapsed * 1e6:>12.2f}{results[name]:>12.4f}"
+            f"{base if base else float('nan'):>12.4f}{f'{change * 100:+.1f}%' if base else '':>10}"
+        )
+        if change is not None and change > TOLERANCES.get(name, args.tolerance):
+            regressions.append(name)
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"python": platform.python_version(), "machine": platform.machine(), "units": "calibration"}
+        baseline_path.write_text(json.dumps({"meta": meta, "results": {**baseline, **results}}, indent=2) + "\n")
+        print(f"baseline saved to {baseline_path}")
+        return 0
+    for name in regressions:
+        print(f"REGRESSION {name}: slower than baseline by more than {TOLERANCES.get(name, args.tolerance):.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="имена бенчмарков для запуска")
+    parser.add_argument("--update-baseline", action="store_true")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""
+Сравнение пропускной способности быстрого пути перенаправлений и эндпоинта FastAPI.
+
+Оба варианта прогоняются в одном процессе через ``httpx.ASGITransport`` на одной и той же базе данных,
+поэтому разница отражает накладные расходы middleware, роутинга, DI и построения ``RedirectResponse``.
+
+Запуск::
+
+    poetry run python -m benchmarks.redirect_fast_path --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+from collections.abc import AsyncGenerator
+import logging
+
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.crud.url import create_url, get_url_by_short_key
+from app.db.crud.user import create_user, get_user_by_username
+from app.db.models import Base
+from app.db.session import DatabaseManager, get_session
+from app.main import app
+from app.schemas.url import URLCreate
+from app.schemas.user import UserCreate
+from benchmarks.loadgen import print_results, run_load
+
+BENCH_USERNAME = "bench_redirect_fast_path"
+BENCH_SHORT_KEY = "bench-fp"
+
+
+async def prepare_data(db: DatabaseManager) -> None:
+    """
+    Создаёт таблицы (если их нет), пользователя и ссылку для замеров.
+
+    :param db: Менеджер базы данных для бенчмарка.
+    :type db: DatabaseManager
+    :returns: None
+    """
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with db.session() as session:
+        user = await get_user_by_username(session, BENCH_USERNAME)
+        if not user:
+            user = await create_user(session, UserCreate(username=BENCH_USERNAME, password=BENCH_USERNAME))
+        if not await get_url_by_short_key(session, BENCH_SHORT_KEY):
+            url = URLCreate(original_url="https://example.com/benchmark", short_key=BENCH_SHORT_KEY)
+            await create_url(session, url, user.id)
+
+
+async def main(database_url: str, requests: int, concurrency: int) -> None:
+    """
+    Прогоняет бенчмарк для обоих путей и печатает сравнение.
+
+    :param database_url: URL базы данных.
+    :type database_url: str
+    :param requests: Количество запросов на каждый вариант.
+    :type requests: int
+    :param concurrency: Количество одновременных воркеров.
+    :type concurrency: int
+    :returns: None
+    """
+    db = DatabaseManager(database_url)
+    await prepare_data(db)
+
+    async def bench_session() -> AsyncGenerator[AsyncSession, None]:
+        async with db.session() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = bench_session
+    path = f"/api/v1/r/{BENCH_SHORT_KEY}"
+    results = {}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+            async def redirect(_: int) -> Response:
+                return await client.get(path)
+
+            for name, fast_path in (("endpoint", False), ("fast_path", True)):
+                settings.REDIRECT_FAST_PATH = fast_path
+                await run_load(redirect, min(requests, 200), concurrency, frozenset({307}))  # прогрев пула соединений
+                results[name] = await run_load(redirect, requests, concurrency, frozenset({307}))
+    finally:
+        app.dependency_overrides.clear()
+        await db.close()
+
+    print_results(results)
+    print(f"speedup: x{results['fast_path']['rps'] / results['endpoint']['rps']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    # Консольный вывод логов на каждый запрос исказил бы замеры
+    logger.setLevel(logging.WARNING)
+    asyncio.run(main(args.database_url, args.requests, args.concurrency))
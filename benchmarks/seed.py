@@ -0,0 +1,278 @@
+"""
+Заполнение базы данных большим объёмом правдоподобных данных для нагрузочных тестов и EXPLAIN.
+
+Создаёт ``--users`` пользователей и ``--urls`` ссылок и загружает их через ``COPY`` (asyncpg
+``copy_records_to_table``) пачками в одной транзакции:
+
+- ссылки распределяются по пользователям по закону Ципфа с показателем ``--user-skew`` (0 — равномерно);
+- количество переходов имеет степенное распределение с показателем ``--click-alpha``;
+- доли просроченных и деактивированных ссылок задаются ``--expired-ratio`` и ``--inactive-ratio``;
+- короткие ключи — из того же пространства, что и ``generate_short_key`` (6 символов base62), и уникальны
+  за счёт случайной аффинной перестановки пространства ключей, поэтому при миллионах строк цикл коллизий
+  при создании ссылок ведёт себя как в продакшене.
+
+Схема должна быть создана миграциями (``make migrate``). Все пользователи получают пароль ``--password``;
+bcrypt-хеш вычисляется один раз.
+
+Если заданы шарды (``--shard-database-urls``, по умолчанию ``SHARD_DATABASE_URLS``), пользователи загружаются
+в основную базу, а ссылки и их счётчики — в шард, который приложение выбирает по короткому ключу. Каждая база
+загружается в своей транзакции.
+
+Запуск::
+
+    poetry run python -m benchmarks.seed --users 100000 --urls 5000000
+"""
+
+import argparse
+import asyncio
+from collections.abc import Iterator
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime, timedelta
+import itertools
+import math
+import random
+import string
+import time
+import uuid
+
+import asyncpg
+
+from app.auth.utils import get_password_hash
+from app.core.config import settings
+from app.db.sharding import shard_for_key
+
+KEY_ALPHABET = string.ascii_letters + string.digits
+KEY_LENGTH = 6
+KEY_SPACE = len(KEY_ALPHABET) ** KEY_LENGTH
+BATCH_SIZE = 100_000
+URL_COLUMNS = (
+    "original_url",
+    "short_key",
+    "is_active",
+    "deactivated_at",
+    "expires_at",
+    "created_at",
+    "click_count",
+    "redirect_code",
+    "user_id",
+)
+
+
+def encode_key(number: int) -> str:
+    """
+    Кодирует число в короткий ключ фиксированной длины в алфавите ``generate_short_key``.
+
+    :param number: Число из диапазона ``[0, KEY_SPACE)``.
+    :type number: int
+    :returns: Короткий ключ.
+    :rtype: str
+    """
+    chars = []
+    for _ in range(KEY_LENGTH):
+        number, digit = divmod(number, len(KEY_ALPHABET))
+        chars.append(KEY_ALPHABET[digit])
+    return "".join(chars)
+
+
+def key_permutation(rng: random.Random) -> Iterator[str]:
+    """
+    Перебирает пространство ключей в случайном порядке без повторов: ``(a * i + b) mod KEY_SPACE``.
+
+    Множитель ``a`` взаимно прост с ``KEY_SPACE``, поэтому отображение биективно.
+
+    :param rng: Генератор случайных чисел.
+    :type rng: random.Random
+    :returns: Итератор уникальных ключей.
+    :rtype: Iterator[str]
+    """
+    while True:
+        multiplier = rng.randrange(KEY_SPACE // 2, KEY_SPACE)
+        if math.gcd(multiplier, KEY_SPACE) == 1:
+            break
+    offset = rng.randrange(KEY_SPACE)
+    return (encode_key((multiplier * i + offset) % KEY_SPACE) for i in itertools.count())
+
+
+def user_weights(users: int, skew: float) -> list[float]:
+    """
+    Считает накопленные веса пользователей по закону Ципфа (вес пользователя ранга r пропорционален r^-skew).
+
+    :param users: Количество пользователей.
+    :type users: int
+    :param skew: Показатель Ципфа (0 — равномерное распределение).
+    :type skew: float
+    :returns: Накопленные веса для ``random.choices(cum_weights=...)``.
+    :rtype: list[float]
+    """
+    return list(itertools.accumulate(1 / rank**skew for rank in range(1, users + 1)))
+
+
+def generate_urls(args: argparse.Namespace, user_ids: list[int], rng: random.Random) -> Iterator[list[tuple]]:
+    """
+    Генерирует строки ссылок пачками по ``BATCH_SIZE``.
+
+    :param args: Аргументы командной строки.
+    :type args: argparse.Namespace
+    :param user_ids: Идентификаторы пользователей в порядке убывания «популярности».
+    :type user_ids: list[int]
+    :param rng: Генератор случайных чисел.
+    :type rng: random.Random
+    :returns: Итератор пачек строк в порядке ``URL_COLUMNS``.
+    :rtype: Iterator[list[tuple]]
+    """
+    now = datetime.now(UTC)
+    keys = key_permutation(rng)
+    cum_weights = user_weights(len(user_ids), args.user_skew)
+    for start in range(0, args.urls, BATCH_SIZE):
+        size = min(BATCH_SIZE, args.urls - start)
+        owners = rng.choices(user_ids, cum_weights=cum_weights, k=size)
+        batch = []
+        for owner in owners:
+            created_at = now - timedelta(seconds=rng.uniform(0, 365 * 86400))
+            is_active = rng.random() >= args.inactive_ratio
+            deactivated_at = None if is_active else created_at + (now - created_at) * rng.random()
+            if rng.random() < args.expired_ratio:
+                expires_at = now - timedelta(seconds=rng.uniform(1, 30 * 86400))
+            else:
+                expires_at = now + timedelta(seconds=rng.uniform(60, 30 * 86400))
+            batch.append(
+                (
+                    f"https://example.com/{rng.getrandbits(48):012x}",
+                    next(keys),
+                    is_active,
+                    deactivated_at,
+                    expires_at,
+                    created_at,
+                    min(int(rng.paretovariate(args.click_alpha)) - 1, 2**31 - 1),
+                    307,
+                    owner,
+                )
+            )
+        yield batch
+
+
+async def connect(database_url: str) -> asyncpg.Connection:
+    """
+    Подключается к базе данных по URL в формате SQLAlchemy.
+
+    :param database_url: URL базы данных (``postgresql+asyncpg://...``).
+    :type database_url: str
+    :returns: Соединение asyncpg.
+    :rtype: asyncpg.Connection
+    """
+    return await asyncpg.connect(database_url.replace("postgresql+asyncpg://", "postgresql://", 1))
+
+
+async def load_urls(
+    link_conns: list[asyncpg.Connection], batches: Iterator[list[tuple]], user_ids: list[int], total: int
+) -> None:
+    """
+    Загружает ссылки через COPY, распределяя строки по шардам, и заполняет счётчики ссылок пользователей.
+
+    :param link_conns: Соединения с базами ссылок в порядке номеров шардов (одно — без шардирования).
+    :type link_conns: list[asyncpg.Connection]
+    :param batches: Пачки строк в порядке ``URL_COLUMNS``.
+    :type batches: Iterator[list[tuple]]
+    :param user_ids: Идентификаторы загруженных пользователей.
+    :type user_ids: list[int]
+    :param total: Общее количество ссылок (для вывода прогресса).
+    :type total: int
+    :returns: None
+    """
+    started = time.perf_counter()
+    key_index = URL_COLUMNS.index("short_key")
+    # В непустую таблицу грузим через промежуточную таблицу, пропуская случайные совпадения ключей.
+    # ON CONFLICT (short_key) не подходит: у секционированной urls ключ не уникален, уникальность
+    # обеспечивает url_keys (в ней же ключи отсоединённых секций)
+    targets = []
+    for conn in link_conns:
+        if await conn.fetchval("SELECT EXISTS (SELECT 1 FROM urls)"):
+            await conn.execute("CREATE TEMP TABLE urls_seed (LIKE urls INCLUDING DEFAULTS) ON COMMIT DROP")
+            targets.append("urls_seed")
+        else:
+            targets.append("urls")
+    loaded = 0
+    for batch in batches:
+        by_shard: list[list[tuple]] = [[] for _ in link_conns]
+        for row in batch:
+            by_shard[shard_for_key(row[key_index], len(link_conns))].append(row)
+        for conn, target, rows in zip(link_conns, targets, by_shard, strict=True):
+            await conn.copy_records_to_table(target, records=rows, columns=URL_COLUMNS)
+        loaded += len(batch)
+        print(f"urls: {loaded}/{total} ({time.perf_counter() - started:.1f}s)")
+    columns = ", ".join(URL_COLUMNS)
+    for shard, (conn, target) in enumerate(zip(link_conns, targets, strict=True)):
+        if target != "urls":
+            status = await conn.execute(
+                f"INSERT INTO urls ({columns}) SELECT {columns} FROM urls_seed s "
+                "WHERE NOT EXISTS (SELECT 1 FROM urls u WHERE u.short_key = s.short_key) "
+                "AND NOT EXISTS (SELECT 1 FROM url_keys k WHERE k.short_key = s.short_key)"
+            )
+            print(f"urls: {status.split()[-1]} inserted from staging table into shard {shard}")
+        # COPY обходит приложение, поэтому счётчики ссылок новых пользователей заполняем здесь же
+        await conn.execute(
+            "INSERT INTO user_link_stats (user_id, total, active) "
+            "SELECT user_id, count(*), count(*) FILTER (WHERE is_active) FROM urls "
+            "WHERE user_id = ANY($1::int[]) GROUP BY user_id",
+            user_ids,
+        )
+
+
+async def seed(args: argparse.Namespace) -> None:
+    """
+    Создаёт пользователей и ссылки и загружает их через COPY.
+
+    :param args: Аргументы командной строки.
+    :type args: argparse.Namespace
+    :returns: None
+    """
+    rng = random.Random(args.seed)
+    prefix = f"seed_{uuid.uuid4().hex[:8]}_"
+    hashed_password = get_password_hash(args.password)
+    now = datetime.now(UTC)
+    started = time.perf_counter()
+
+    async with AsyncExitStack() as stack:
+        conn = await connect(args.database_url)
+        stack.push_async_callback(conn.close)
+        shard_conns = []
+        for shard_url in args.shard_database_urls:
+            shard_conns.append(await connect(shard_url))
+            stack.push_async_callback(shard_conns[-1].close)
+        link_conns = shard_conns or [conn]
+
+        # Транзакции фиксируются в обратном порядке: основная база с пользователями — первой
+        async with AsyncExitStack() as transactions:
+            for transaction_conn in (*shard_conns, conn):
+                await transactions.enter_async_context(transaction_conn.transaction())
+            await conn.copy_records_to_table(
+                "users",
+                records=((f"{prefix}{i}", hashed_password, now) for i in range(args.users)),
+                columns=("username", "hashed_password", "created_at"),
+            )
+            rows = await conn.fetch("SELECT id FROM users WHERE username LIKE $1 ORDER BY id", f"{prefix}%")
+            user_ids = [row["id"] for row in rows]
+            print(f"users: {len(user_ids)} ({time.perf_counter() - started:.1f}s)")
+            await load_urls(link_conns, generate_urls(args, user_ids, rng), user_ids, args.urls)
+        await conn.execute("ANALYZE users")
+        for link_conn in link_conns:
+            await link_conn.execute("ANALYZE urls")
+            await link_conn.execute("ANALYZE user_link_stats")
+    print(f"done in {time.perf_counter() - started:.1f}s; users {prefix}<n>, password {args.password!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument(
+        "--shard-database-urls", nargs="*", default=settings.SHARD_DATABASE_URLS, help="базы шардов ссылок по порядку"
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    parser.add_argument("--user-skew", type=float, default=1.1, help="показатель Ципфа для ссылок на пользователя")
+    parser.add_argument("--click-alpha", type=float, default=1.2, help="показатель степенного закона для переходов")
+    parser.add_argument("--expired-ratio", type=float, default=0.1)
+    parser.add_argument("--inactive-ratio", type=float, default=0.05)
+    parser.add_argument("--password", default="seed_password")
+    parser.add_argument("--seed", type=int, default=None, help="seed генератора для воспроизводимых данных")
+    asyncio.run(seed(parser.parse_args()))
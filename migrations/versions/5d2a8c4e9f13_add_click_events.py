@@ -0,0 +1,41 @@
+"""Add click_events partitioned by day.
+
+Revision ID: 5d2a8c4e9f13
+Revises: 3c9e1f7a2b40
+Create Date: 2026-10-19 12:04:17.215093
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2a8c4e9f13"
+down_revision: str | None = "3c9e1f7a2b40"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "click_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("clicked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("url_id", sa.Integer(), nullable=False),
+        sa.Column("referrer", sa.String(), nullable=True),
+        sa.Column("user_agent", sa.String(), nullable=True),
+        sa.Column("client_network", sa.String(length=43), nullable=True),
+        sa.PrimaryKeyConstraint("id", "clicked_at"),
+        postgresql_partition_by="RANGE (clicked_at)",
+    )
+    op.create_index("ix_click_events_url_id_clicked_at", "click_events", ["url_id", "clicked_at"], unique=False)
+    # Дневные секции создаёт фоновый писатель событий; сюда попадают события вне созданных секций
+    op.execute("CREATE TABLE click_events_default PARTITION OF click_events DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_click_events_url_id_clicked_at", table_name="click_events")
+    op.drop_table("click_events")
@@ -0,0 +1,41 @@
+"""Add hourly and daily click rollups.
+
+Revision ID: 7e4b1d9a6c25
+Revises: 5d2a8c4e9f13
+Create Date: 2026-10-19 13:21:45.730114
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7e4b1d9a6c25"
+down_revision: str | None = "5d2a8c4e9f13"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "url_clicks_daily",
+        sa.Column("url_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("clicks", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("url_id", "day"),
+    )
+    op.create_table(
+        "url_clicks_hourly",
+        sa.Column("url_id", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("clicks", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("url_id", "bucket"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("url_clicks_hourly")
+    op.drop_table("url_clicks_daily")
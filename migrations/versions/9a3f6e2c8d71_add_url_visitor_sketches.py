@@ -0,0 +1,33 @@
+"""Add url_visitor_sketches.
+
+Revision ID: 9a3f6e2c8d71
+Revises: 7e4b1d9a6c25
+Create Date: 2026-10-19 14:37:02.118452
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a3f6e2c8d71"
+down_revision: str | None = "7e4b1d9a6c25"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "url_visitor_sketches",
+        sa.Column("url_id", sa.Integer(), nullable=False),
+        sa.Column("registers", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("url_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("url_visitor_sketches")
@@ -0,0 +1,38 @@
+"""Add user_link_stats.
+
+Revision ID: a4c9e3b7d612
+Revises: f1b8d4e6a273
+Create Date: 2026-10-20 17:42:31.906518
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c9e3b7d612"
+down_revision: str | None = "f1b8d4e6a273"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_link_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+        sa.Column("active", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # Начальные значения счётчиков; дальше их поддерживает приложение и периодическая сверка
+    op.execute(
+        "INSERT INTO user_link_stats (user_id, total, active) "
+        "SELECT user_id, count(*), count(*) FILTER (WHERE is_active) FROM urls GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_link_stats")
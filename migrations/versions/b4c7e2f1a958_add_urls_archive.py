@@ -0,0 +1,52 @@
+"""Add urls_archive and indexes for the expiry sweeper.
+
+Revision ID: b4c7e2f1a958
+Revises: 9a3f6e2c8d71
+Create Date: 2026-10-19 16:02:44.530817
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b4c7e2f1a958"
+down_revision: str | None = "9a3f6e2c8d71"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "urls_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("original_url", sa.String(), nullable=False),
+        sa.Column("short_key", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("click_count", sa.Integer(), nullable=False),
+        sa.Column("redirect_code", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_urls_archive_short_key"), "urls_archive", ["short_key"], unique=False)
+    op.create_index(op.f("ix_urls_expires_at"), "urls", ["expires_at"], unique=False)
+    op.create_index(
+        "ix_urls_inactive_created_at",
+        "urls",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_active"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_urls_inactive_created_at", table_name="urls", postgresql_where=sa.text("NOT is_active"))
+    op.drop_index(op.f("ix_urls_expires_at"), table_name="urls")
+    op.drop_index(op.f("ix_urls_archive_short_key"), table_name="urls_archive")
+    op.drop_table("urls_archive")
@@ -0,0 +1,43 @@
+"""Add urls.deactivated_at and measure the sweeper grace period for inactive links from it.
+
+Revision ID: b7e3d2a9c514
+Revises: a4c9e3b7d612
+Create Date: 2026-10-21 11:06:52.184093
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3d2a9c514"
+down_revision: str | None = "a4c9e3b7d612"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("urls", sa.Column("deactivated_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("urls_archive", sa.Column("deactivated_at", sa.DateTime(timezone=True), nullable=True))
+    # Момент деактивации существующих ссылок неизвестен: отсрочка для них начинается с миграции
+    op.execute("UPDATE urls SET deactivated_at = now() WHERE NOT is_active")
+    op.create_index(
+        "ix_urls_inactive_deactivated_at",
+        "urls",
+        ["deactivated_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_active"),
+    )
+    op.drop_index("ix_urls_inactive_created_at", table_name="urls", postgresql_where=sa.text("NOT is_active"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_urls_inactive_created_at", "urls", ["created_at"], unique=False, postgresql_where=sa.text("NOT is_active")
+    )
+    op.drop_index("ix_urls_inactive_deactivated_at", table_name="urls", postgresql_where=sa.text("NOT is_active"))
+    op.drop_column("urls_archive", "deactivated_at")
+    op.drop_column("urls", "deactivated_at")
@@ -0,0 +1,58 @@
+"""Add url_keys and optionally partition urls by month.
+
+The urls table is converted only when URLS_PARTITION_BY is set (created_at or expires_at), e.g.
+``URLS_PARTITION_BY=expires_at alembic upgrade head``. The conversion rewrites the table, so run it in a
+maintenance window on large datasets.
+
+Revision ID: c8e1a4d7b362
+Revises: b4c7e2f1a958
+Create Date: 2026-10-19 17:21:09.402655
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.db.partitioning import add_months, month_start, partition_urls_statements, unpartition_urls_statements
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e1a4d7b362"
+down_revision: str | None = "b4c7e2f1a958"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Строки дальше этого горизонта остаются в секции по умолчанию
+MAX_MONTHS_AHEAD = 24
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "url_keys",
+        sa.Column("short_key", sa.String(), nullable=False),
+        sa.Column("url_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("short_key"),
+    )
+    column = settings.URLS_PARTITION_BY
+    if column is None:
+        return
+    bind = op.get_bind()
+    now = month_start(datetime.now(UTC))
+    oldest, newest = bind.execute(sa.text(f"SELECT min({column}), max({column}) FROM urls")).one()
+    first_month = min(month_start(oldest), now) if oldest else now
+    last_month = add_months(now, settings.URLS_PARTITION_MONTHS_AHEAD)
+    if newest:
+        last_month = min(max(month_start(newest), last_month), add_months(now, MAX_MONTHS_AHEAD))
+    for statement in partition_urls_statements(column, first_month, last_month):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().execute(sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'urls'::regclass")).first():
+        for statement in unpartition_urls_statements():
+            op.execute(statement)
+    op.drop_table("url_keys")
@@ -0,0 +1,38 @@
+"""Add url_click_shards.
+
+Revision ID: d3f6b9a2c415
+Revises: c8e1a4d7b362
+Create Date: 2026-10-19 18:40:31.877120
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d3f6b9a2c415"
+down_revision: str | None = "c8e1a4d7b362"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "url_click_shards",
+        sa.Column("url_id", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("url_id", "shard"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Ещё не перенесённые клики возвращаются в urls.click_count
+    op.execute(
+        "UPDATE urls SET click_count = urls.click_count + s.clicks "
+        "FROM (SELECT url_id, sum(count) AS clicks FROM url_click_shards GROUP BY url_id) s WHERE urls.id = s.url_id"
+    )
+    op.drop_table("url_click_shards")
@@ -0,0 +1,35 @@
+"""Add urls.url_hash and replace the original_url index with (user_id, url_hash).
+
+Revision ID: e7a2c5d91f04
+Revises: d3f6b9a2c415
+Create Date: 2026-10-20 10:12:47.530218
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a2c5d91f04"
+down_revision: str | None = "d3f6b9a2c415"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Генерируемая колонка заполняется для существующих строк при добавлении (таблица перезаписывается)
+    op.add_column(
+        "urls",
+        sa.Column("url_hash", sa.LargeBinary(), sa.Computed("decode(md5(original_url), 'hex')", persisted=True)),
+    )
+    op.create_index("ix_urls_user_id_url_hash", "urls", ["user_id", "url_hash"], unique=False)
+    op.execute("DROP INDEX IF EXISTS ix_urls_original_url")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f("ix_urls_original_url"), "urls", ["original_url"], unique=False)
+    op.drop_index("ix_urls_user_id_url_hash", table_name="urls")
+    op.drop_column("urls", "url_hash")
@@ -8,9 +8,12 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.db.instrumentation import instrument_engine
 from app.db.models import Base
 from app.db.session import get_session
 from app.main import app
+from app.services.click_service import click_queue
+from app.services.redirect_cache import redirect_cache
 
 logging.basicConfig(level=logging.INFO)
 
@@ -26,6 +29,17 @@ def anyio_backend() -> str:
     return "asyncio"
 
 
+@pytest.fixture(autouse=True)
+def clear_click_queue() -> None:
+    """
+    Очищает очередь событий переходов и кеш перенаправлений, чтобы состояние одного теста не попало в другой.
+
+    :returns: None
+    """
+    click_queue.clear()
+    redirect_cache.clear()
+
+
 @pytest.fixture
 async def async_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -36,6 +50,7 @@ async def async_session() -> AsyncGenerator[AsyncSession, None]:
     """
     logger.info(f"DB URL: {settings.SQLALCHEMY_TEST_DATABASE_URL}")
     async_engine = create_async_engine(settings.SQLALCHEMY_TEST_DATABASE_URL)
+    instrument_engine(async_engine)
 
     # Создаем и очищаем тестовые таблицы
     async with async_engine.begin() as conn:
@@ -0,0 +1,182 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from datetime import UTC, datetime
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import CLICK_EVENTS_DROPPED, CLICK_EVENTS_WRITTEN
+from app.db.crud.click_event import click_partition_name
+from app.db.crud.url import get_url_by_short_key
+from app.db.models import URL, ClickEvent, URLArchive, URLClickShard
+from app.services import click_service
+from app.services.click_service import (
+    click_queue,
+    compact_click_counters,
+    flush_clicks,
+    record_click,
+    run_click_writer,
+)
+from tests.utils.db_mocks import create_test_url, create_test_user
+
+
+async def test_redirect_enqueues_click_event(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует запись событий переходов: Referer, User-Agent, подсеть клиента и пакетное обновление счётчика.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session)
+    url = await create_test_url(async_session, user_id=user["id"], short_key="events")
+    headers = {"Referer": "https://news.example.org/post", "User-Agent": "pytest-agent"}
+
+    for _ in range(2):
+        response = await client.get("/api/v1/r/events", headers=headers, follow_redirects=False)
+        assert response.status_code == 307
+    assert len(click_queue) == 2
+
+    assert await flush_clicks(async_session) == 2
+    events = (await async_session.execute(select(ClickEvent))).scalars().all()
+    assert len(events) == 2
+    assert {(event.url_id, event.referrer, event.user_agent) for event in events} == {
+        (url.id, "https://news.example.org/post", "pytest-agent")
+    }
+    assert events[0].client_network == "127.0.0.0/24"
+    assert (await get_url_by_short_key(async_session, "events")).click_count == 2
+
+
+async def test_click_writer_creates_daily_partitions(async_session: AsyncSession) -> None:
+    """
+    Тестирует фоновый писатель: создание дневной секции и запись события в неё, а не в секцию по умолчанию.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session)
+    url = await create_test_url(async_session, user_id=user["id"], short_key="writer")
+
+    @asynccontextmanager
+    async def session_factory() -> AsyncIterator[AsyncSession]:
+        yield async_session
+
+    written_before = CLICK_EVENTS_WRITTEN.get()
+    record_click(url.id)
+    writer = asyncio.create_task(run_click_writer(session_factory, interval=0.01))
+    try:
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if CLICK_EVENTS_WRITTEN.get() > written_before:
+                break
+    finally:
+        writer.cancel()
+        with suppress(asyncio.CancelledError):
+            await writer
+
+    partition = await async_session.scalar(text("SELECT tableoid::regclass::text FROM click_events"))
+    assert partition == click_partition_name(datetime.now(UTC).date())
+
+
+async def test_click_counter_shards_are_compacted(async_session: AsyncSession) -> None:
+    """
+    Тестирует шарды счётчика: писатель не трогает строку ``urls``, чтения видят сумму, сжатие её переносит.
+
+    Шарды ссылки, уже перенесённой в архив, сжимаются в ``urls_archive``.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session)
+    url = await create_test_url(async_session, user_id=user["id"], short_key="viral")
+    stored_click_count = select(URL.__table__.c.click_count).where(URL.id == url.id)
+
+    for _ in range(3):
+        record_click(url.id)
+    await flush_clicks(async_session)
+    assert await async_session.scalar(stored_click_count) == 0
+    assert await async_session.scalar(select(URLClickShard.count).where(URLClickShard.url_id == url.id)) == 3
+    assert (await get_url_by_short_key(async_session, "viral")).click_count == 3
+
+    # Шард другого воркера, шард удалённой ссылки и шард ссылки, перенесённой в архив
+    archived = URLArchive(
+        id=-2,
+        original_url="https://example.com/",
+        short_key="archived",
+        is_active=True,
+        expires_at=datetime.now(UTC),
+        created_at=datetime.now(UTC),
+        click_count=1,
+        redirect_code=307,
+        user_id=user["id"],
+    )
+    async_session.add_all(
+        [
+            archived,
+            URLClickShard(url_id=url.id, shard=99, count=2),
+            URLClickShard(url_id=-1, shard=0, count=5),
+            URLClickShard(url_id=-2, shard=0, count=4),
+        ]
+    )
+    await async_session.commit()
+
+    assert await compact_click_counters(async_session, batch_size=2) == 4
+    assert await async_session.scalar(stored_click_count) == 5
+    assert await async_session.scalar(select(URLArchive.click_count).where(URLArchive.id == -2)) == 5
+    assert (await async_session.scalars(select(URLClickShard))).all() == []
+    assert (await get_url_by_short_key(async_session, "viral")).click_count == 5
+
+
+async def test_failed_click_batch_is_retried(async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Тестирует повтор записи: пачка с ошибкой возвращается в очередь и записывается следующим сбросом без потерь.
+
+    После исчерпания ``CLICK_WRITE_RETRIES`` повторов пачка отбрасывается с учётом в метрике.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура pytest для подмены функций и настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    user = await create_test_user(async_session)
+    url = await create_test_url(async_session, user_id=user["id"], short_key="retry")
+    upsert_click_rollups = click_service.upsert_click_rollups
+    failures = 1
+
+    async def flaky_upsert(*args: object, **kwargs: object) -> None:
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise ConnectionError("connection reset during failover")
+        await upsert_click_rollups(*args, **kwargs)
+
+    monkeypatch.setattr(click_service, "upsert_click_rollups", flaky_upsert)
+    dropped_before = CLICK_EVENTS_DROPPED.get("write_error")
+    for _ in range(3):
+        record_click(url.id)
+
+    assert await flush_clicks(async_session, batch_size=2) == 0
+    assert len(click_queue) == 3
+    assert click_queue.failures == 1
+    assert await flush_clicks(async_session, batch_size=2) == 3
+    assert click_queue.failures == 0
+    assert len((await async_session.scalars(select(ClickEvent))).all()) == 3
+    assert (await get_url_by_short_key(async_session, "retry")).click_count == 3
+    assert CLICK_EVENTS_DROPPED.get("write_error") == dropped_before
+
+    monkeypatch.setattr(settings, "CLICK_WRITE_RETRIES", 1)
+    failures = 2
+    record_click(url.id)
+    assert await flush_clicks(async_session) == 0
+    assert await flush_clicks(async_session) == 0
+    assert len(click_queue) == 0
+    assert CLICK_EVENTS_DROPPED.get("write_error") == dropped_before + 1
@@ -0,0 +1,97 @@
+from datetime import UTC, datetime, timedelta
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import URL, UserLinkStats
+from app.services.link_stats_service import reconcile_link_stats
+from app.services.sweeper_service import sweep_dead_links
+from tests.utils.db_mocks import create_test_url, create_test_user, get_headers_and_user_id
+
+
+async def get_stats(async_session: AsyncSession, user_id: int) -> tuple[int, int] | None:
+    """
+    Читает счётчики ссылок пользователя.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :returns: Всего и активных ссылок или None, если строки нет.
+    :rtype: tuple[int, int] | None
+    """
+    result = await async_session.execute(
+        select(UserLinkStats.total, UserLinkStats.active).where(UserLinkStats.user_id == user_id)
+    )
+    row = result.one_or_none()
+    return tuple(row) if row else None
+
+
+async def test_link_stats_follow_link_changes(
+    client: AsyncClient, async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирует поддержание счётчиков при создании, изменении, массовых действиях, удалении и работе чистильщика.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура pytest для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    monkeypatch.setattr(settings, "SWEEPER_BATCH_PAUSE", 0.0)
+    headers, user_id = await get_headers_and_user_id(async_session)
+    ids = []
+    for i in range(4):
+        response = await client.post("/api/v1/urls", json={"original_url": f"https://example.com/{i}"}, headers=headers)
+        ids.append(response.json()["id"])
+    assert await get_stats(async_session, user_id) == (4, 4)
+
+    await client.patch(f"/api/v1/urls/{ids[0]}", json={"is_active": False}, headers=headers)
+    await client.patch(f"/api/v1/urls/{ids[0]}", json={"is_active": False}, headers=headers)
+    assert await get_stats(async_session, user_id) == (4, 3)
+    await client.post("/api/v1/urls/bulk", json={"action": "deactivate", "ids": ids[:2]}, headers=headers)
+    assert await get_stats(async_session, user_id) == (4, 2)
+    await client.post("/api/v1/urls/bulk", json={"action": "delete", "ids": ids[1:3]}, headers=headers)
+    assert await get_stats(async_session, user_id) == (2, 1)
+    await client.delete(f"/api/v1/urls/{ids[3]}", headers=headers)
+    assert await get_stats(async_session, user_id) == (1, 0)
+
+    inactive = await client.get("/api/v1/urls", params={"is_active": False}, headers=headers)
+    assert inactive.json()["total"] == 1
+    assert inactive.json()["total_pages"] == 1
+
+    long_ago = datetime.now(UTC) - timedelta(days=settings.SWEEPER_GRACE_PERIOD_DAYS + 1)
+    await async_session.execute(update(URL).where(URL.id == ids[0]).values(deactivated_at=long_ago))
+    await async_session.commit()
+    assert await sweep_dead_links(async_session) == 1
+    assert await get_stats(async_session, user_id) == (0, 0)
+
+
+async def test_reconcile_link_stats_repairs_drift(async_session: AsyncSession) -> None:
+    """
+    Тестирует сверку: исправление неверных и создание отсутствующих счётчиков, обнуление лишних.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    users = [(await create_test_user(async_session, username=f"stats{i}"))["id"] for i in range(3)]
+    await create_test_url(async_session, users[0], short_key="drift0")
+    await create_test_url(async_session, users[0], short_key="drift1", is_active=False)
+    await async_session.execute(update(UserLinkStats).values(total=99, active=42))
+    # Ссылка, записанная в обход приложения, и счётчики пользователя без ссылок
+    async_session.add(URL(original_url="https://example.com/", short_key="bypass", user_id=users[1]))
+    async_session.add(UserLinkStats(user_id=users[2], total=5, active=5))
+    await async_session.commit()
+
+    assert await reconcile_link_stats(async_session, batch_size=1) == 3
+    assert await get_stats(async_session, users[0]) == (2, 1)
+    assert await get_stats(async_session, users[1]) == (1, 1)
+    assert await get_stats(async_session, users[2]) == (0, 0)
+    assert await reconcile_link_stats(async_session) == 0
@@ -0,0 +1,124 @@
+import logging
+import re
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import DB_QUERIES_PER_REQUEST, HTTP_REQUESTS, PASSWORD_VERIFY_DURATION
+from tests.utils.db_mocks import create_test_url, get_headers_and_user_id
+
+REDIRECT_ROUTE = "/api/v1/r/{short_key}"
+
+
+@pytest.mark.parametrize("fast_path", [True, False])
+async def test_request_metrics_use_route_template(
+    client: AsyncClient, async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch, fast_path: bool
+) -> None:
+    """
+    Тестирует учёт запросов по шаблону маршрута (в т.ч. для быстрого пути перенаправлений) и SQL на запрос.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :param fast_path: Включён ли быстрый путь перенаправлений.
+    :type fast_path: bool
+    :returns: None
+    """
+    monkeypatch.setattr(settings, "REDIRECT_FAST_PATH", fast_path)
+    _, user_id = await get_headers_and_user_id(async_session)
+    await create_test_url(async_session, user_id=user_id, short_key="metrics")
+
+    redirects_before = HTTP_REQUESTS.get("GET", REDIRECT_ROUTE, "307")
+    missing_before = HTTP_REQUESTS.get("GET", REDIRECT_ROUTE, "404")
+    observed_before = DB_QUERIES_PER_REQUEST.count(REDIRECT_ROUTE)
+
+    await client.get("/api/v1/r/metrics", follow_redirects=False)
+    await client.get("/api/v1/r/missing", follow_redirects=False)
+
+    assert HTTP_REQUESTS.get("GET", REDIRECT_ROUTE, "307") == redirects_before + 1
+    assert HTTP_REQUESTS.get("GET", REDIRECT_ROUTE, "404") == missing_before + 1
+    assert DB_QUERIES_PER_REQUEST.count(REDIRECT_ROUTE) == observed_before + 2
+
+
+async def test_metrics_endpoint_exposes_prometheus_text(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует выгрузку /metrics: счётчики запросов, время проверки пароля и статистику пула.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, _ = await get_headers_and_user_id(async_session)
+    verifications_before = PASSWORD_VERIFY_DURATION.count()
+
+    await client.get("/api/v1/urls", headers=headers)
+    await client.get("/no/such/path")
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/urls",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+    assert "# TYPE db_query_duration_seconds histogram" in body
+    assert "db_pool_size " in body
+    assert PASSWORD_VERIFY_DURATION.count() == verifications_before + 1
+
+
+async def test_server_timing_header(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует заголовок Server-Timing с количеством и временем SQL-выражений запроса.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, _ = await get_headers_and_user_id(async_session)
+
+    response = await client.get("/api/v1/urls", headers=headers)
+
+    assert re.fullmatch(r'db;dur=\d+\.\d{2};desc="4 queries"', response.headers["server-timing"])
+
+
+async def test_slow_and_repeated_queries_are_logged(
+    client: AsyncClient,
+    async_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """
+    Тестирует лог медленных выражений (без значений параметров) и предупреждение о возможном N+1.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :param caplog: Фикстура для перехвата логов.
+    :type caplog: pytest.LogCaptureFixture
+    :returns: None
+    """
+    headers, _ = await get_headers_and_user_id(async_session)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 1)
+    monkeypatch.setattr(logger, "propagate", True)
+
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        await client.get("/api/v1/urls", headers=headers)
+
+    messages = [record.getMessage() for record in caplog.records]
+    slow = [message for message in messages if message.startswith("Slow query")]
+    assert any("FROM users" in message and "<str>" in message for message in slow)
+    assert not any("testuser" in message for message in slow)
+    assert any(message.startswith("Possible N+1 in GET /api/v1/urls") for message in messages)
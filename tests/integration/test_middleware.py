@@ -4,6 +4,7 @@ from httpx import AsyncClient
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from tests.utils.db_mocks import create_test_url, create_test_user
 
 
@@ -11,7 +12,7 @@ async def test_log_request_middleware(
     client: AsyncClient, async_session: AsyncSession, caplog: pytest.LogCaptureFixture
 ) -> None:
     """
-    Тестирует middleware логирования запросов и ответов.
+    Тестирует middleware журнала запросов: одна структурированная строка на запрос.
 
     :param client: Асинхронный клиент FastAPI.
     :type client: AsyncClient
@@ -28,12 +29,40 @@ async def test_log_request_middleware(
     await create_test_url(async_session, user_id=user["id"], original_url="https://example.com", short_key="testurl")
 
     # Отправляем запрос
-    response = await client.get("api/v1/r/testurl", follow_redirects=False)
+    response = await client.get("api/v1/r/testurl?utm=1", follow_redirects=False)
     assert response.status_code == 307, f"Expected 307, got {response.status_code}: {response.text}"
 
     # Проверяем логи
-    log_records = [record.message for record in caplog.records]
-    assert any("Incoming request: GET http://test/api/v1/r/testurl" in msg for msg in log_records), (
-        "Request log not found"
-    )
-    assert any("Response status: 307" in msg for msg in log_records), "Response status log not found"
+    access_logs = [record.getMessage() for record in caplog.records if record.getMessage().startswith("method=")]
+    assert len(access_logs) == 1, "Expected exactly one access log line"
+    assert access_logs[0].startswith("method=GET path=/api/v1/r/testurl?utm=1 status=307 duration_ms=")
+
+
+async def test_log_request_middleware_samples_redirects(
+    client: AsyncClient, async_session: AsyncSession, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирует сэмплирование журнала для перенаправлений: остальные запросы логируются всегда.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param caplog: Фикстура для захвата логов.
+    :type caplog: pytest.LogCaptureFixture
+    :param monkeypatch: Фикстура для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    caplog.set_level(logging.INFO, logger="url_alias_service")
+    monkeypatch.setattr(settings, "ACCESS_LOG_REDIRECT_SAMPLE_RATE", 0.0)
+
+    user = await create_test_user(async_session, username="testuser")
+    await create_test_url(async_session, user_id=user["id"], short_key="testurl")
+
+    await client.get("api/v1/r/testurl", follow_redirects=False)
+    await client.get("api/v1/urls")
+
+    access_logs = [record.getMessage() for record in caplog.records if record.getMessage().startswith("method=")]
+    assert len(access_logs) == 1
+    assert access_logs[0].startswith("method=GET path=/api/v1/urls status=401")
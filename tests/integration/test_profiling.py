@@ -0,0 +1,90 @@
+from pathlib import Path
+import time
+
+from httpx import ASGITransport, AsyncClient
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.middleware.profiling import AGGREGATE_PROFILE_NAME, ProfilingMiddleware, sign_profile_request
+
+SECRET = "profiling-secret"
+
+
+async def test_signed_request_is_profiled(client: AsyncClient, tmp_path: Path) -> None:
+    """
+    Тестирует профилирование подписанного запроса и отказ для неверной, истёкшей, слишком долгой и повторной подписи.
+
+    :param client: Асинхронный клиент FastAPI (переопределяет сессию БД).
+    :type client: AsyncClient
+    :param tmp_path: Временный каталог для профилей.
+    :type tmp_path: Path
+    :returns: None
+    """
+    transport = ASGITransport(app=ProfilingMiddleware(app, directory=str(tmp_path), secret=SECRET))
+    async with AsyncClient(transport=transport, base_url="http://test") as profiled:
+        now = int(time.time())
+        signature = sign_profile_request(SECRET, "GET", "/api/v1/r/missing", now + 60)
+        response = await profiled.get("/api/v1/r/missing", headers={"X-Profile-Signature": signature})
+        rejected = [
+            signature,
+            f"{now + 60}:{signature.split(':')[1]}:{'0' * 64}",
+            sign_profile_request(SECRET, "GET", "/api/v1/r/missing", now - 1),
+            sign_profile_request(SECRET, "GET", "/api/v1/r/missing", now + settings.PROFILING_SIGNATURE_MAX_TTL + 60),
+            sign_profile_request(SECRET, "GET", "/api/v1/r/other", now + 60),
+        ]
+        responses = [await profiled.get("/api/v1/r/missing", headers={"X-Profile-Signature": s}) for s in rejected]
+
+    assert response.status_code == 404
+    profile = tmp_path / f"{response.headers['x-profile-id']}.folded"
+    assert profile.is_file()
+    assert all("x-profile-id" not in rejected_response.headers for rejected_response in responses)
+    assert list(tmp_path.iterdir()) == [profile]
+
+
+async def test_signed_profiles_are_rotated(
+    client: AsyncClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирует, что в каталоге остаются только последние ``PROFILING_MAX_PROFILES`` профилей подписанных запросов.
+
+    :param client: Асинхронный клиент FastAPI (переопределяет сессию БД).
+    :type client: AsyncClient
+    :param tmp_path: Временный каталог для профилей.
+    :type tmp_path: Path
+    :param monkeypatch: Фикстура pytest для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    monkeypatch.setattr(settings, "PROFILING_MAX_PROFILES", 2)
+    transport = ASGITransport(app=ProfilingMiddleware(app, directory=str(tmp_path), secret=SECRET))
+    profile_ids = []
+    async with AsyncClient(transport=transport, base_url="http://test") as profiled:
+        for _ in range(4):
+            signature = sign_profile_request(SECRET, "GET", "/api/v1/r/missing", int(time.time()) + 60)
+            response = await profiled.get("/api/v1/r/missing", headers={"X-Profile-Signature": signature})
+            profile_ids.append(response.headers["x-profile-id"])
+
+    assert sorted(path.stem for path in tmp_path.iterdir()) == sorted(profile_ids[-2:])
+
+
+async def test_sampled_requests_are_aggregated(client: AsyncClient, tmp_path: Path) -> None:
+    """
+    Тестирует режим случайной выборки: профили запросов суммируются в общий файл без заголовка ответа.
+
+    :param client: Асинхронный клиент FastAPI (переопределяет сессию БД).
+    :type client: AsyncClient
+    :param tmp_path: Временный каталог для профилей.
+    :type tmp_path: Path
+    :returns: None
+    """
+    middleware = ProfilingMiddleware(app, directory=str(tmp_path), sample_rate=1.0)
+    async with AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test") as profiled:
+        for _ in range(3):
+            response = await profiled.get("/api/v1/r/missing")
+            assert "x-profile-id" not in response.headers
+
+    assert [path.name for path in tmp_path.iterdir()] == [AGGREGATE_PROFILE_NAME]
+    assert sum(middleware.aggregate.values()) == sum(
+        int(line.rsplit(" ", 1)[1]) for line in (tmp_path / AGGREGATE_PROFILE_NAME).read_text().splitlines()
+    )
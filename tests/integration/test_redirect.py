@@ -1,3 +1,4 @@
+import asyncio
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
@@ -5,8 +6,11 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.db.crud.url import get_url_by_short_key
-from tests.utils.db_mocks import create_test_url, create_test_user
+from app.core.config import settings
+from app.db.crud.url import get_url_by_short_key, notify_url_changes
+from app.services.click_service import click_queue, flush_clicks
+from app.services.redirect_cache import URL_CHANGES_CHANNEL, redirect_cache, run_redirect_cache_listener
+from tests.utils.db_mocks import create_test_url, create_test_user, get_headers_and_user_id
 
 
 async def test_redirect_url(client: AsyncClient, async_session: AsyncSession) -> None:
@@ -30,6 +34,8 @@ async def test_redirect_url(client: AsyncClient, async_session: AsyncSession) ->
     assert response.status_code == 307
     assert response.headers["location"] == "https://example.com/"
 
+    # Переход записывается фоновым писателем; в тесте сбрасываем очередь явно
+    assert await flush_clicks(async_session) == 1
     updated_url = await get_url_by_short_key(async_session, "testurl")
     assert updated_url.click_count == 1
 
@@ -79,8 +85,145 @@ async def test_redirect_url_internal_error(client: AsyncClient) -> None:
     :param client: Асинхронный клиент FastAPI.
     :returns: None
     """
-    with patch("app.api.v1.redirect.redirect_to_url", new=AsyncMock(side_effect=Exception("DB crash"))):
+    with patch("app.api.v1.redirect.resolve_short_key", new=AsyncMock(side_effect=Exception("DB crash"))):
         response = await client.get("/api/v1/r/test-crash")
 
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert response.json()["detail"] == "Internal server error"
+
+
+async def test_redirect_url_permanent_sets_cache_headers(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует постоянное перенаправление: код 308 и Cache-Control, ограниченный сроком действия ссылки.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session, "testuser")
+    await create_test_url(
+        async_session,
+        user_id=user["id"],
+        short_key="perm",
+        expires_at=datetime.now(UTC) + timedelta(hours=1),
+        redirect_code=308,
+    )
+
+    response = await client.get("/api/v1/r/perm", follow_redirects=False)
+    assert response.status_code == 308
+    assert response.headers["location"] == "https://example.com/"
+    directives = response.headers["cache-control"].split(", ")
+    assert directives[0] == "public"
+    max_age = int(directives[1].removeprefix("max-age="))
+    assert 3500 < max_age <= 3600
+
+
+async def test_redirect_url_temporary_has_no_cache_headers(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует, что временное перенаправление не отдаёт заголовков кеширования.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session, "testuser")
+    await create_test_url(async_session, user_id=user["id"], short_key="temp")
+
+    response = await client.get("/api/v1/r/temp", follow_redirects=False)
+    assert response.status_code == 307
+    assert "cache-control" not in response.headers
+
+
+async def test_redirect_url_head_does_not_count_click(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует HEAD-запрос к короткой ссылке: заголовки перенаправления без учёта клика.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session, "testuser")
+    await create_test_url(async_session, user_id=user["id"], original_url="https://example.com", short_key="headurl")
+
+    response = await client.head("/api/v1/r/headurl", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == "https://example.com/"
+
+    assert len(click_queue) == 0
+    url = await get_url_by_short_key(async_session, "headurl")
+    assert url.click_count == 0
+
+
+async def test_patch_url_invalidates_cached_redirect(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует, что изменение ссылки через PATCH сразу видно на закешированном пути перенаправления.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    url = await create_test_url(async_session, user_id=user_id, short_key="cached")
+    response = await client.get("/api/v1/r/cached", follow_redirects=False)
+    assert response.headers["location"] == "https://example.com/"
+    assert redirect_cache.get("cached") is not None
+
+    response = await client.patch(
+        f"/api/v1/urls/{url.id}", json={"original_url": "https://example.org/new"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["original_url"] == "https://example.org/new"
+    response = await client.get("/api/v1/r/cached", follow_redirects=False)
+    assert response.headers["location"] == "https://example.org/new"
+
+    response = await client.patch(f"/api/v1/urls/{url.id}", json={"is_active": False}, headers=headers)
+    assert response.json()["is_active"] is False
+    response = await client.get("/api/v1/r/cached", follow_redirects=False)
+    assert response.status_code == status.HTTP_410_GONE
+
+    expires_at = (datetime.now(UTC) + timedelta(days=30)).isoformat()
+    response = await client.patch(
+        f"/api/v1/urls/{url.id}", json={"is_active": True, "expires_at": expires_at}, headers=headers
+    )
+    assert datetime.fromisoformat(response.json()["expires_at"]) > datetime.now(UTC) + timedelta(days=29)
+    response = await client.get("/api/v1/r/cached", follow_redirects=False)
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+
+    assert (await client.patch(f"/api/v1/urls/{url.id}", json={}, headers=headers)).status_code == 400
+    assert (await client.patch("/api/v1/urls/999999", json={"is_active": True}, headers=headers)).status_code == 404
+
+
+async def test_url_change_notification_invalidates_other_workers(async_session: AsyncSession) -> None:
+    """
+    Тестирует, что слушатель уведомлений сбрасывает запись кеша, изменённую в другом воркере.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session, "testuser")
+    url = await create_test_url(async_session, user_id=user["id"], short_key="notified")
+    redirect_cache.put(url)
+
+    listener = asyncio.create_task(run_redirect_cache_listener(settings.SQLALCHEMY_TEST_DATABASE_URL))
+    try:
+        # После подписки слушатель очищает кеш целиком: это признак того, что он готов
+        async with asyncio.timeout(5):
+            while len(redirect_cache):
+                await asyncio.sleep(0.01)
+        redirect_cache.put(url)
+        await notify_url_changes(async_session, URL_CHANGES_CHANNEL, ["notified"])
+        async with asyncio.timeout(5):
+            while redirect_cache.get("notified"):
+                await asyncio.sleep(0.01)
+    finally:
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
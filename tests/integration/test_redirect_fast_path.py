@@ -0,0 +1,134 @@
+from datetime import UTC, datetime, timedelta
+
+from httpx import AsyncClient, Response
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.crud.url import get_url_by_short_key
+from app.services.click_service import flush_clicks
+from tests.utils.db_mocks import create_test_url, create_test_user
+
+
+async def _request_both_paths(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch, method: str, path: str, headers: dict | None = None
+) -> tuple[Response, Response]:
+    """
+    Выполняет один и тот же запрос через быстрый путь и через обычный эндпоинт FastAPI.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param monkeypatch: Фикстура для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :param method: HTTP-метод.
+    :type method: str
+    :param path: Путь запроса.
+    :type path: str
+    :param headers: Заголовки запроса.
+    :type headers: dict | None
+    :returns: Ответы быстрого пути и эндпоинта FastAPI.
+    :rtype: tuple[Response, Response]
+    """
+    monkeypatch.setattr(settings, "REDIRECT_FAST_PATH", True)
+    fast = await client.request(method, path, headers=headers, follow_redirects=False)
+    monkeypatch.setattr(settings, "REDIRECT_FAST_PATH", False)
+    slow = await client.request(method, path, headers=headers, follow_redirects=False)
+    return fast, slow
+
+
+@pytest.mark.parametrize(
+    ("method", "short_key", "headers"),
+    [
+        ("GET", "temp", None),
+        ("GET", "perm", None),
+        ("HEAD", "perm", None),
+        ("GET", "inactive", None),
+        ("GET", "expired", None),
+        ("GET", "missing", None),
+        ("HEAD", "missing", None),
+        ("GET", "temp", {"Origin": "https://app.example.com"}),
+        ("GET", "temp", {"Origin": "https://app.example.com", "Cookie": "sid=1"}),
+    ],
+)
+async def test_fast_path_matches_endpoint(
+    client: AsyncClient,
+    async_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    method: str,
+    short_key: str,
+    headers: dict | None,
+) -> None:
+    """
+    Тестирует, что быстрый путь отвечает так же, как эндпоинт FastAPI: статус, заголовки и тело.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :param method: HTTP-метод.
+    :type method: str
+    :param short_key: Короткий ключ.
+    :type short_key: str
+    :param headers: Заголовки запроса.
+    :type headers: dict | None
+    :returns: None
+    """
+    user = await create_test_user(async_session)
+    # Срок действия больше REDIRECT_CACHE_MAX_AGE: max-age упирается в лимит и совпадает в обоих ответах
+    expires_at = datetime.now(UTC) + timedelta(days=30)
+    await create_test_url(
+        async_session, user_id=user["id"], original_url="https://example.com/путь?q=1 2", short_key="temp"
+    )
+    await create_test_url(async_session, user_id=user["id"], short_key="perm", redirect_code=308, expires_at=expires_at)
+    await create_test_url(async_session, user_id=user["id"], short_key="inactive", is_active=False)
+    await create_test_url(
+        async_session, user_id=user["id"], short_key="expired", expires_at=datetime.now(UTC) - timedelta(days=1)
+    )
+
+    fast, slow = await _request_both_paths(client, monkeypatch, method, f"/api/v1/r/{short_key}", headers)
+
+    assert fast.status_code == slow.status_code
+    # Server-Timing содержит измеренное время SQL и у двух запросов различается
+    assert [h for h in fast.headers.multi_items() if h[0] != "server-timing"] == [
+        h for h in slow.headers.multi_items() if h[0] != "server-timing"
+    ]
+    assert fast.content == slow.content
+
+
+async def test_fast_path_counts_clicks(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует, что быстрый путь учитывает переходы по GET и не учитывает HEAD.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    user = await create_test_user(async_session)
+    await create_test_url(async_session, user_id=user["id"], short_key="clicks")
+
+    assert (await client.get("/api/v1/r/clicks", follow_redirects=False)).status_code == 307
+    assert (await client.head("/api/v1/r/clicks", follow_redirects=False)).status_code == 307
+
+    assert await flush_clicks(async_session) == 1
+    url = await get_url_by_short_key(async_session, "clicks")
+    assert url.click_count == 1
+
+
+async def test_fast_path_passes_through_other_requests(client: AsyncClient) -> None:
+    """
+    Тестирует, что запросы вне формы ``/r/{short_key}`` обрабатываются обычным роутингом.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :returns: None
+    """
+    response = await client.get("/api/v1/r/a/b", follow_redirects=False)
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Not Found"}
+
+    response = await client.post("/api/v1/r/key", follow_redirects=False)
+    assert response.status_code == 405
@@ -0,0 +1,48 @@
+from datetime import UTC, datetime, timedelta
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.click_service import click_queue
+from tests.utils.db_mocks import create_test_url, get_headers_and_user_id
+from tests.utils.query_budget import assert_max_queries
+
+
+async def test_resolve_short_keys(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует пакетное разрешение ключей: статусы, один запрос к ссылкам, кеш и отсутствие учёта переходов.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    await create_test_url(async_session, user_id, "https://example.com/ok", "resolve-ok", redirect_code=308)
+    await create_test_url(async_session, user_id, short_key="resolve-inactive", is_active=False)
+    expired_at = datetime.now(UTC) - timedelta(minutes=1)
+    await create_test_url(async_session, user_id, short_key="resolve-expired", expires_at=expired_at)
+    payload = {"short_keys": ["resolve-ok", "resolve-missing", "resolve-inactive", "resolve-expired", "resolve-ok"]}
+
+    # Аутентификация (1) и чтение всех ключей одним запросом (1)
+    with assert_max_queries(2):
+        response = await client.post("/api/v1/resolve", json=payload, headers=headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert list(results) == ["resolve-ok", "resolve-missing", "resolve-inactive", "resolve-expired"]
+    assert results["resolve-ok"]["status"] == "ok"
+    assert results["resolve-ok"]["original_url"] == "https://example.com/ok"
+    assert results["resolve-ok"]["redirect_code"] == 308
+    assert {key: result["status"] for key, result in list(results.items())[1:]} == {
+        "resolve-missing": "not_found",
+        "resolve-inactive": "inactive",
+        "resolve-expired": "expired",
+    }
+    assert all(result["original_url"] is None for result in list(results.values())[1:])
+    assert len(click_queue) == 0
+
+    # Действующая ссылка теперь в кеше: запрос её одной обходится без чтения ссылок
+    with assert_max_queries(1):
+        response = await client.post("/api/v1/resolve", json={"short_keys": ["resolve-ok"]}, headers=headers)
+    assert response.json()["results"]["resolve-ok"]["status"] == "ok"
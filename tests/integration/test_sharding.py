@@ -0,0 +1,232 @@
+import argparse
+from collections.abc import AsyncGenerator
+
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from benchmarks.seed import seed
+from httpx import AsyncClient
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.db.models import URL, UserLinkStats
+from app.db.session import create_engine, db_manager
+from app.db.sharding import SHARD_METADATA, ShardRouter
+from app.services.click_service import flush_clicks
+from tests.utils.db_mocks import get_headers_and_user_id
+
+SHARD_COUNT = 2
+
+
+@pytest_asyncio.fixture
+async def shards(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[ShardRouter, None]:
+    """
+    Поднимает шарды как отдельные базы данных на тестовом PostgreSQL и включает шардирование ссылок.
+
+    :param monkeypatch: Фикстура pytest для подмены маршрутизатора.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: Маршрутизатор шардов.
+    :rtype: AsyncGenerator[ShardRouter, None]
+    """
+    base_url = make_url(settings.SQLALCHEMY_TEST_DATABASE_URL)
+    shard_urls = [base_url.set(database=f"{base_url.database}_shard{shard}") for shard in range(SHARD_COUNT)]
+    admin_engine = create_async_engine(base_url, isolation_level="AUTOCOMMIT")
+    async with admin_engine.connect() as conn:
+        for shard_url in shard_urls:
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": shard_url.database}
+            )
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{shard_url.database}"'))
+    await admin_engine.dispose()
+
+    router = ShardRouter([create_engine(shard_url.render_as_string(hide_password=False)) for shard_url in shard_urls])
+    for engine in router.engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(SHARD_METADATA.drop_all)
+            await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    await router.connect()
+    monkeypatch.setattr(db_manager, "shards", router)
+    yield router
+    await router.close()
+
+
+async def count_shard_urls(router: ShardRouter) -> list[int]:
+    """
+    Считает ссылки в каждом шарде.
+
+    :param router: Маршрутизатор шардов.
+    :type router: ShardRouter
+    :returns: Количество ссылок по номеру шарда.
+    :rtype: list[int]
+    """
+    counts = []
+    for shard in range(len(router)):
+        async with router.session(shard) as session:
+            counts.append(await session.scalar(select(func.count()).select_from(URL)))
+    return counts
+
+
+async def test_sharded_urls_are_routed_by_key(
+    client: AsyncClient, async_session: AsyncSession, shards: ShardRouter
+) -> None:
+    """
+    Тестирует размещение ссылок по шардам, перенаправление, учёт переходов и удаление через API.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param shards: Маршрутизатор шардов.
+    :type shards: ShardRouter
+    :returns: None
+    """
+    headers, _ = await get_headers_and_user_id(async_session)
+    created = []
+    for number in range(8):
+        payload = {"original_url": f"https://example.com/{number}", "short_key": f"routed{number}"}
+        response = await client.post("/api/v1/urls", json=payload, headers=headers)
+        assert response.status_code == 201
+        created.append(response.json())
+
+    assert all(shards.shard_for_url_id(url["id"]) == shards.shard_for_key(url["short_key"]) for url in created)
+    assert all(count > 0 for count in await count_shard_urls(shards))
+    assert await async_session.scalar(select(func.count()).select_from(URL)) == 0
+
+    duplicate = {"original_url": "https://example.com/dup", "short_key": created[0]["short_key"]}
+    assert (await client.post("/api/v1/urls", json=duplicate, headers=headers)).status_code == 400
+
+    target = created[0]
+    response = await client.get(f"/api/v1/r/{target['short_key']}", follow_redirects=False)
+    assert response.status_code == 307
+    assert await flush_clicks(async_session) == 1
+    async with shards.session_for_key(target["short_key"]) as session:
+        assert await session.scalar(select(URL.click_count).where(URL.id == target["id"])) == 1
+
+    response = await client.delete(f"/api/v1/urls/{target['id']}", headers=headers)
+    assert response.status_code == 204
+    assert sum(await count_shard_urls(shards)) == 7
+
+
+async def test_sharded_listing_merges_by_created_at(
+    client: AsyncClient, async_session: AsyncSession, shards: ShardRouter
+) -> None:
+    """
+    Тестирует scatter-gather список ссылок: порядок по ``created_at`` и пагинация поверх всех шардов.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param shards: Маршрутизатор шардов.
+    :type shards: ShardRouter
+    :returns: None
+    """
+    headers, _ = await get_headers_and_user_id(async_session)
+    for number in range(12):
+        payload = {"original_url": f"https://example.com/{number}", "short_key": f"sharded{number}"}
+        assert (await client.post("/api/v1/urls", json=payload, headers=headers)).status_code == 201
+
+    listed = []
+    for page in (1, 2, 3):
+        response = await client.get("/api/v1/urls", params={"page": page, "per_page": 5}, headers=headers)
+        assert response.json()["total"] == 12
+        listed += response.json()["items"]
+
+    assert [url["short_key"] for url in listed] == [f"sharded{number}" for number in reversed(range(12))]
+
+
+async def test_existing_shard_schema_is_upgraded(
+    client: AsyncClient, async_session: AsyncSession, shards: ShardRouter
+) -> None:
+    """
+    Тестирует доведение шарда, созданного ``create_all`` прежних версий, до текущей схемы при подключении.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param shards: Маршрутизатор шардов.
+    :type shards: ShardRouter
+    :returns: None
+    """
+    headers, _ = await get_headers_and_user_id(async_session)
+    for number in range(6):
+        payload = {"original_url": f"https://example.com/{number}", "short_key": f"counted{number}"}
+        assert (await client.post("/api/v1/urls", json=payload, headers=headers)).status_code == 201
+    # Схема шарда до url_hash, deactivated_at и счётчиков ссылок, без версии миграций
+    for engine in shards.engines:
+        async with engine.begin() as conn:
+            for statement in (
+                "DROP TABLE alembic_version",
+                "DROP TABLE user_link_stats",
+                "DROP TABLE url_click_shards",
+                "ALTER TABLE urls DROP COLUMN url_hash",
+                "ALTER TABLE urls DROP COLUMN deactivated_at",
+                "ALTER TABLE urls_archive DROP COLUMN deactivated_at",
+                "CREATE INDEX ix_urls_original_url ON urls (original_url)",
+            ):
+                await conn.execute(text(statement))
+
+    await shards.connect()
+
+    for engine in shards.engines:
+        async with engine.connect() as conn:
+            diff = await conn.run_sync(
+                lambda sync_conn: compare_metadata(MigrationContext.configure(sync_conn), SHARD_METADATA)
+            )
+        assert diff == []
+    response = await client.get("/api/v1/urls", headers=headers)
+    assert response.json()["total"] == 6
+    payload = {"original_url": "https://example.com/0"}
+    response = await client.post("/api/v1/urls", json=payload, params={"reuse_existing": True}, headers=headers)
+    assert response.json()["short_key"] == "counted0"
+
+
+async def test_seed_routes_urls_to_shards(
+    client: AsyncClient, async_session: AsyncSession, shards: ShardRouter
+) -> None:
+    """
+    Тестирует загрузку данных бенчмарков при шардировании.
+
+    Пользователи загружаются в основную базу, ссылки и их счётчики — в шарды по короткому ключу, и приложение
+    находит загруженные ссылки.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param shards: Маршрутизатор шардов.
+    :type shards: ShardRouter
+    :returns: None
+    """
+    args = argparse.Namespace(
+        database_url=settings.SQLALCHEMY_TEST_DATABASE_URL,
+        shard_database_urls=[engine.url.render_as_string(hide_password=False) for engine in shards.engines],
+        users=2,
+        urls=30,
+        user_skew=1.1,
+        click_alpha=1.2,
+        expired_ratio=0.0,
+        inactive_ratio=0.0,
+        password="seed_password",
+        seed=11,
+    )
+    await seed(args)
+
+    assert await async_session.scalar(select(func.count()).select_from(URL)) == 0
+    assert sum(await count_shard_urls(shards)) == 30
+    linked = 0
+    for shard in range(len(shards)):
+        async with shards.session(shard) as session:
+            urls = (await session.scalars(select(URL))).all()
+            linked += await session.scalar(select(func.coalesce(func.sum(UserLinkStats.total), 0)))
+        assert all(shards.shard_for_key(url.short_key) == shard for url in urls)
+        assert all(shards.shard_for_url_id(url.id) == shard for url in urls)
+    assert linked == 30
+
+    response = await client.get(f"/api/v1/r/{urls[0].short_key}", follow_redirects=False)
+    assert response.status_code == 307
@@ -0,0 +1,158 @@
+from datetime import UTC, datetime, timedelta
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.crud.user import get_user_version
+from app.db.models import URL, URLArchive, URLClickShard
+from app.services.sweeper_service import SWEEPER_LOCK_KEY, sweep_dead_links
+from tests.utils.db_mocks import create_test_url, get_headers_and_user_id
+
+
+async def create_dead_urls(async_session: AsyncSession, user_id: int) -> None:
+    """
+    Создаёт ссылки: давно истёкшие, давно деактивированную, недавно истёкшую, живую и старую недавно выключенную.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :returns: None
+    """
+    now = datetime.now(UTC)
+    long_ago = now - timedelta(days=settings.SWEEPER_GRACE_PERIOD_DAYS + 1)
+    await create_test_url(async_session, user_id, short_key="old1", expires_at=long_ago)
+    await create_test_url(async_session, user_id, short_key="old2", expires_at=long_ago)
+    inactive = await create_test_url(async_session, user_id, short_key="inactive", is_active=False)
+    await async_session.execute(URL.__table__.update().where(URL.id == inactive.id).values(deactivated_at=long_ago))
+    await async_session.commit()
+    await create_test_url(async_session, user_id, short_key="recent", expires_at=now - timedelta(hours=1))
+    await create_test_url(async_session, user_id, short_key="alive")
+    old = await create_test_url(async_session, user_id, short_key="old-inactive", is_active=False)
+    await async_session.execute(URL.__table__.update().where(URL.id == old.id).values(created_at=long_ago))
+    await async_session.commit()
+
+
+async def test_sweeper_archives_dead_links(
+    client: AsyncClient, async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирует перенос мёртвых ссылок в архив пачками с ещё не сжатыми переходами и резервирование их ключей.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура pytest для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    monkeypatch.setattr(settings, "SWEEPER_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "SWEEPER_BATCH_PAUSE", 0.0)
+    headers, user_id = await get_headers_and_user_id(async_session)
+    await create_dead_urls(async_session, user_id)
+    old1 = await async_session.scalar(select(URL.id).where(URL.short_key == "old1"))
+    async_session.add_all([URLClickShard(url_id=old1, shard=0, count=2), URLClickShard(url_id=old1, shard=1, count=3)])
+    await async_session.commit()
+    version = await get_user_version(async_session, user_id)
+
+    assert await sweep_dead_links(async_session) == 3
+    # Две пачки — две новые версии: ETag списка ссылок после каждой перестаёт совпадать
+    assert await get_user_version(async_session, user_id) == version + 2
+
+    remaining = (await async_session.scalars(select(URL.short_key))).all()
+    assert sorted(remaining) == ["alive", "old-inactive", "recent"]
+    archived = (await async_session.scalars(select(URLArchive))).all()
+    assert sorted(url.short_key for url in archived) == ["inactive", "old1", "old2"]
+    assert all(url.user_id == user_id for url in archived)
+    assert {url.short_key: url.click_count for url in archived} == {"inactive": 0, "old1": 5, "old2": 0}
+    assert (await async_session.scalars(select(URLClickShard))).all() == []
+
+    payload = {"original_url": "https://example.com/reuse", "short_key": "old1"}
+    response = await client.post("/api/v1/urls", json=payload, headers=headers)
+    assert response.status_code == 400
+
+    monkeypatch.setattr(settings, "SWEEPER_RELEASE_KEYS", True)
+    response = await client.post("/api/v1/urls", json=payload, headers=headers)
+    assert response.status_code == 201
+
+
+async def test_sweeper_deletes_without_archive(async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Тестирует безвозвратное удаление мёртвых ссылок при выключенном архиве.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура pytest для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    monkeypatch.setattr(settings, "SWEEPER_ARCHIVE", False)
+    _, user_id = await get_headers_and_user_id(async_session)
+    await create_dead_urls(async_session, user_id)
+
+    assert await sweep_dead_links(async_session) == 3
+    assert sorted((await async_session.scalars(select(URL.short_key))).all()) == ["alive", "old-inactive", "recent"]
+    assert (await async_session.scalars(select(URLArchive))).all() == []
+
+
+async def test_sweeper_skips_when_lock_is_held(async_session: AsyncSession) -> None:
+    """
+    Тестирует, что чистильщик ничего не делает, пока блокировку держит другой экземпляр.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    _, user_id = await get_headers_and_user_id(async_session)
+    await create_dead_urls(async_session, user_id)
+
+    other_session = async_sessionmaker(bind=async_session.bind)
+    async with other_session() as leader:
+        assert await leader.scalar(select(func.pg_try_advisory_xact_lock(SWEEPER_LOCK_KEY)))
+        assert await sweep_dead_links(async_session) == 0
+        await leader.rollback()
+
+    assert await sweep_dead_links(async_session) == 3
+
+
+async def test_sweeper_grace_starts_at_deactivation(
+    client: AsyncClient, async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирует, что давно созданная ссылка, деактивированная через API, переживает чистильщика и может быть включена.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура pytest для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    monkeypatch.setattr(settings, "SWEEPER_BATCH_PAUSE", 0.0)
+    headers, user_id = await get_headers_and_user_id(async_session)
+    long_ago = datetime.now(UTC) - timedelta(days=settings.SWEEPER_GRACE_PERIOD_DAYS + 1)
+    expires_at = datetime.now(UTC) + timedelta(days=30)
+    patched = await create_test_url(async_session, user_id, short_key="patched", expires_at=expires_at)
+    bulk = await create_test_url(async_session, user_id, short_key="bulk", expires_at=expires_at)
+    await async_session.execute(URL.__table__.update().values(created_at=long_ago))
+    await async_session.commit()
+
+    await client.patch(f"/api/v1/urls/{patched.id}", json={"is_active": False}, headers=headers)
+    await client.post("/api/v1/urls/bulk", json={"action": "deactivate", "ids": [bulk.id]}, headers=headers)
+    assert await sweep_dead_links(async_session) == 0
+
+    response = await client.patch(f"/api/v1/urls/{patched.id}", json={"is_active": True}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["is_active"] is True
+    deactivated = dict((await async_session.execute(select(URL.short_key, URL.deactivated_at))).all())
+    assert deactivated["patched"] is None and deactivated["bulk"] is not None
+
+    await async_session.execute(URL.__table__.update().where(URL.id == bulk.id).values(deactivated_at=long_ago))
+    await async_session.commit()
+    assert await sweep_dead_links(async_session) == 1
+    assert (await async_session.scalars(select(URL.short_key))).all() == ["patched"]
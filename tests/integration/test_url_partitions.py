@@ -0,0 +1,160 @@
+import argparse
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, time, timedelta
+
+from benchmarks.seed import seed
+from httpx import AsyncClient
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.crud.url import get_url_partition_months, get_urls_partition_column
+from app.db.crud.user import get_user_version
+from app.db.models import URL, URLClickShard, URLKey, UserLinkStats
+from app.db.partitioning import add_months, month_start, partition_urls_statements, url_partition_name
+from app.services.partition_service import maintain_url_partitions
+from tests.utils.db_mocks import create_test_url, get_headers_and_user_id
+
+
+@pytest_asyncio.fixture
+async def partitioned_urls(async_session: AsyncSession) -> AsyncGenerator[None, None]:
+    """
+    Переводит тестовую таблицу ``urls`` в секционированную по ``expires_at`` (три месяца назад — месяц вперёд).
+
+    После теста удаляет отсоединённые секции: присоединённые удалит ``drop_all`` вместе с ``urls``.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    now = month_start(datetime.now(UTC))
+    for statement in partition_urls_statements("expires_at", add_months(now, -3), add_months(now, 1)):
+        await async_session.execute(text(statement))
+    await async_session.commit()
+    yield
+    await async_session.rollback()
+    leftovers = await async_session.scalars(text("SELECT tablename FROM pg_tables WHERE tablename LIKE 'urls\\_p%'"))
+    for name in leftovers.all():
+        await async_session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    await async_session.commit()
+
+
+@pytest.mark.usefixtures("partitioned_urls")
+async def test_partitioned_urls_keep_short_keys_unique(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует работу API поверх секционированной таблицы и уникальность ключей между секциями.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    assert await get_urls_partition_column(async_session) == "expires_at"
+    headers, user_id = await get_headers_and_user_id(async_session)
+
+    payload = {"original_url": "https://example.com/partitioned", "short_key": "parted"}
+    response = await client.post("/api/v1/urls", json=payload, headers=headers)
+    assert response.status_code == 201
+    url_id = response.json()["id"]
+    response = await client.post("/api/v1/urls", json=payload, headers=headers)
+    assert response.status_code == 400
+
+    # Та же ссылка в другой секции: уникальный индекс секции бы её пропустил, url_keys — нет
+    with pytest.raises(IntegrityError):
+        await create_test_url(
+            async_session, user_id, short_key="parted", expires_at=datetime.now(UTC) + timedelta(days=40)
+        )
+    await async_session.rollback()
+
+    response = await client.get("/api/v1/urls", headers=headers)
+    assert response.json()["total"] == 1
+    assert (await async_session.get(URLKey, "parted")).url_id == url_id
+
+    response = await client.delete(f"/api/v1/urls/{url_id}", headers=headers)
+    assert response.status_code == 204
+    assert await async_session.get(URLKey, "parted", populate_existing=True) is None
+
+
+@pytest.mark.usefixtures("partitioned_urls")
+async def test_seed_loads_partitioned_urls(async_session: AsyncSession) -> None:
+    """
+    Тестирует загрузку данных бенчмарков в секционированную ``urls``.
+
+    Первый прогон грузит COPY прямо в ``urls`` (ключи заносит триггер ``url_keys``), повторный с тем же seed —
+    через промежуточную таблицу, где все ключи уже заняты и пропускаются.
+
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    args = argparse.Namespace(
+        database_url=settings.SQLALCHEMY_TEST_DATABASE_URL,
+        shard_database_urls=[],
+        users=3,
+        urls=40,
+        user_skew=1.1,
+        click_alpha=1.2,
+        expired_ratio=0.1,
+        inactive_ratio=0.2,
+        password="seed_password",
+        seed=7,
+    )
+    await seed(args)
+    await seed(args)
+
+    assert await async_session.scalar(select(func.count()).select_from(URL)) == 40
+    assert await async_session.scalar(select(func.count()).select_from(URLKey)) == 40
+    assert await async_session.scalar(select(func.sum(UserLinkStats.total))) == 40
+
+
+@pytest.mark.usefixtures("partitioned_urls")
+async def test_partition_maintenance_detaches_expired_months(
+    client: AsyncClient, async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирует создание секций наперёд и отсоединение старой секции (с ещё не сжатыми переходами) вместо удаления строк.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура pytest для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    monkeypatch.setattr(settings, "URLS_PARTITION_MONTHS_AHEAD", 3)
+    headers, user_id = await get_headers_and_user_id(async_session)
+    now = datetime.now(UTC)
+    old_month = add_months(month_start(now), -3)
+    ancient = await create_test_url(
+        async_session, user_id, short_key="ancient", expires_at=datetime.combine(old_month, time(12), UTC)
+    )
+    await create_test_url(async_session, user_id, short_key="alive")
+    async_session.add(URLClickShard(url_id=ancient.id, shard=0, count=4))
+    await async_session.commit()
+    version = await get_user_version(async_session, user_id)
+
+    detached = await maintain_url_partitions(async_session, now)
+
+    assert url_partition_name(old_month) in detached
+    months = await get_url_partition_months(async_session)
+    assert old_month not in months
+    assert month_start(now) in months and add_months(month_start(now), 3) in months
+    assert (await async_session.scalars(select(URL.short_key))).all() == ["alive"]
+    assert await get_user_version(async_session, user_id) == version + 1
+    stats = await async_session.get(UserLinkStats, user_id, populate_existing=True)
+    assert (stats.total, stats.active) == (1, 1)
+    # Отсоединённая секция остаётся архивом, а её ключи — занятыми
+    archived = (
+        await async_session.execute(text(f"SELECT short_key, click_count FROM {url_partition_name(old_month)}"))
+    ).all()
+    assert archived == [("ancient", 4)]
+    assert (await async_session.scalars(select(URLClickShard))).all() == []
+    response = await client.post(
+        "/api/v1/urls", json={"original_url": "https://example.com", "short_key": "ancient"}, headers=headers
+    )
+    assert response.status_code == 400
@@ -0,0 +1,109 @@
+from collections import Counter
+from datetime import UTC, date, datetime, timedelta
+
+from httpx import AsyncClient
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.crud.click_event import upsert_click_rollups
+from app.services.click_service import flush_clicks
+from tests.utils.db_mocks import create_test_url, get_headers_and_user_id
+
+
+async def test_url_stats_from_rollups(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует почасовую и дневную статистику: сводки накапливаются между пачками писателя.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    url = await create_test_url(async_session, user_id=user_id, short_key="stats")
+
+    # Два посетителя в первой пачке, повтор первого — во второй: скетч объединяется с сохранённым
+    for agents in (("agent-a", "agent-b"), ("agent-a",)):
+        for agent in agents:
+            await client.get("/api/v1/r/stats", headers={"User-Agent": agent}, follow_redirects=False)
+        await flush_clicks(async_session)
+
+    now = datetime.now(UTC)
+    response = await client.get(f"/api/v1/urls/{url.id}/stats", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["granularity"] == "day"
+    assert data["total"] == 3
+    assert data["buckets"] == [{"start": f"{now.date().isoformat()}T00:00:00Z", "clicks": 3}]
+    assert data["unique_visitors"] == 2
+    assert data["unique_visitors_error"] == pytest.approx(0.01625)
+
+    response = await client.get(f"/api/v1/urls/{url.id}/stats", params={"granularity": "hour"}, headers=headers)
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    assert [bucket["clicks"] for bucket in response.json()["buckets"]] == [3]
+    assert datetime.fromisoformat(response.json()["buckets"][0]["start"]) == hour
+
+    past = {"start": (now - timedelta(days=3)).isoformat(), "end": (now - timedelta(days=2)).isoformat()}
+    response = await client.get(f"/api/v1/urls/{url.id}/stats", params=past, headers=headers)
+    assert response.json()["total"] == 0
+
+
+async def test_url_stats_window_is_aligned_in_utc(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует выравнивание периода по границам часов и дней UTC при начале с нецелым смещением пояса.
+
+    Начало 10:15+05:30 (04:45Z) включает час 04:00Z, а в ответе возвращается период суммированных интервалов.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    url = await create_test_url(async_session, user_id=user_id, short_key="aligned")
+    await upsert_click_rollups(
+        async_session,
+        hourly=Counter(
+            {(url.id, datetime(2026, 1, 5, 4, tzinfo=UTC)): 2, (url.id, datetime(2026, 1, 5, 7, tzinfo=UTC)): 1}
+        ),
+        daily=Counter({(url.id, date(2026, 1, 5)): 3}),
+    )
+    await async_session.commit()
+
+    window = {"granularity": "hour", "start": "2026-01-05T10:15:00+05:30", "end": "2026-01-05T07:20:00Z"}
+    data = (await client.get(f"/api/v1/urls/{url.id}/stats", params=window, headers=headers)).json()
+    assert data["total"] == 3
+    assert data["start"] == "2026-01-05T04:00:00Z"
+    assert data["end"] == "2026-01-05T08:00:00Z"
+
+    window = {"start": "2026-01-05T03:00:00+05:30", "end": "2026-01-06T00:00:00Z"}
+    data = (await client.get(f"/api/v1/urls/{url.id}/stats", params=window, headers=headers)).json()
+    assert data["total"] == 3
+    assert data["start"] == "2026-01-04T00:00:00Z"
+    assert data["end"] == "2026-01-06T00:00:00Z"
+
+
+async def test_url_stats_errors(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует ошибки статистики: чужая ссылка (403), несуществующая (404) и некорректный период (400).
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    url = await create_test_url(async_session, user_id=user_id, short_key="owned")
+    _, other_user_id = await get_headers_and_user_id(async_session, username="other")
+    foreign_url = await create_test_url(async_session, user_id=other_user_id, short_key="foreign")
+
+    assert (await client.get(f"/api/v1/urls/{foreign_url.id}/stats", headers=headers)).status_code == 403
+    assert (await client.get("/api/v1/urls/999999/stats", headers=headers)).status_code == 404
+    reversed_range = {"start": "2026-01-02T00:00:00Z", "end": "2026-01-01T00:00:00Z"}
+    response = await client.get(f"/api/v1/urls/{url.id}/stats", params=reversed_range, headers=headers)
+    assert response.status_code == 400
+    too_long = {"granularity": "hour", "start": "2026-01-01T00:00:00Z", "end": "2026-03-01T00:00:00Z"}
+    assert (await client.get(f"/api/v1/urls/{url.id}/stats", params=too_long, headers=headers)).status_code == 400
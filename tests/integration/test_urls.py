@@ -1,13 +1,19 @@
 from unittest.mock import AsyncMock, patch
 
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from httpx import AsyncClient
+import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.db.crud.url import get_url_by_short_key
-from app.schemas.url import URLListResponse
+from app.core.config import settings
+from app.db.crud.url import get_url_by_id, get_url_by_short_key
+from app.schemas.url import URLListResponse, URLResponse
+from app.services.click_service import flush_clicks, record_click
 from tests.utils.db_mocks import create_test_url, get_headers_and_user_id
+from tests.utils.query_budget import assert_max_queries
 
 
 @pytest_asyncio.fixture
@@ -48,6 +54,34 @@ async def test_create_url(
     url = await get_url_by_short_key(async_session, "exmpl")
     assert url is not None
     assert url.original_url == "https://example.com/"
+    assert data["redirect_code"] == 307
+
+
+async def test_create_url_permanent_redirect(
+    client: AsyncClient, async_session: AsyncSession, auth_headers_and_id: tuple[dict[str, str], int]
+) -> None:
+    """
+    Тестирует создание ссылки с постоянным перенаправлением и отклонение неподдерживаемого кода.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param auth_headers_and_id: Заголовки с авторизацией и id пользователя.
+    :type auth_headers_and_id: tuple[dict[str, str], int]
+    :returns: None
+    """
+    payload = {"original_url": "https://example.com", "short_key": "perm", "redirect_code": 301}
+    response = await client.post("/api/v1/urls", json=payload, headers=auth_headers_and_id[0])
+    assert response.status_code == 201
+    assert response.json()["redirect_code"] == 301
+
+    url = await get_url_by_short_key(async_session, "perm")
+    assert url.redirect_code == 301
+
+    payload = {"original_url": "https://example.com", "short_key": "found", "redirect_code": 302}
+    response = await client.post("/api/v1/urls", json=payload, headers=auth_headers_and_id[0])
+    assert response.status_code == 422
 
 
 async def test_create_url_value_error(
@@ -114,6 +148,168 @@ async def test_get_user_urls(
     assert data["items"][0]["short_key"] == "testurl"
 
 
+async def test_create_url_query_budget(client: AsyncClient, auth_headers_and_id: tuple[dict[str, str], int]) -> None:
+    """
+    Фиксирует количество SQL-выражений при создании ссылки.
+
+    Аутентификация, проверка ключа, ``INSERT ... RETURNING`` со счётчиками ссылок в той же транзакции
+    и увеличение версии ссылок пользователя.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param auth_headers_and_id: Заголовки с авторизацией и id пользователя.
+    :type auth_headers_and_id: tuple[dict[str, str], int]
+    :returns: None
+    """
+    payload = {"original_url": "https://example.com"}
+    with assert_max_queries(5):
+        response = await client.post("/api/v1/urls", json=payload, headers=auth_headers_and_id[0])
+    assert response.status_code == 201
+
+
+async def test_create_url_reuse_existing(
+    client: AsyncClient, async_session: AsyncSession, auth_headers_and_id: tuple[dict[str, str], int]
+) -> None:
+    """
+    Тестирует повторное использование действующей ссылки на тот же URL одним запросом по индексу.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param auth_headers_and_id: Заголовки с авторизацией и id пользователя.
+    :type auth_headers_and_id: tuple[dict[str, str], int]
+    :returns: None
+    """
+    headers, user_id = auth_headers_and_id
+    payload = {"original_url": "https://example.com/campaign?utm_source=mail"}
+    params = {"reuse_existing": True}
+    created = await client.post("/api/v1/urls", json=payload, params=params, headers=headers)
+    assert created.status_code == 201
+
+    # Аутентификация (1) и поиск по (user_id, url_hash) (1)
+    with assert_max_queries(2):
+        reused = await client.post("/api/v1/urls", json=payload, params=params, headers=headers)
+    assert reused.status_code == 200
+    assert reused.json()["id"] == created.json()["id"]
+
+    permanent = await client.post(
+        "/api/v1/urls", json={**payload, "redirect_code": 308}, params=params, headers=headers
+    )
+    assert permanent.status_code == 201
+    duplicate = await client.post("/api/v1/urls", json=payload, headers=headers)
+    assert duplicate.status_code == 201
+    assert duplicate.json()["id"] != created.json()["id"]
+
+    await create_test_url(async_session, user_id, "https://example.com/inactive", "reuse-inactive", is_active=False)
+    response = await client.post(
+        "/api/v1/urls", json={"original_url": "https://example.com/inactive"}, params=params, headers=headers
+    )
+    assert response.status_code == 201
+
+
+async def test_get_user_urls_query_budget(
+    client: AsyncClient, async_session: AsyncSession, auth_headers_and_id: tuple[dict[str, str], int]
+) -> None:
+    """
+    Фиксирует количество SQL-выражений при получении списка: оно не должно расти с количеством ссылок.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param auth_headers_and_id: Заголовки с авторизацией и id пользователя.
+    :type auth_headers_and_id: tuple[dict[str, str], int]
+    :returns: None
+    """
+    for i in range(15):
+        await create_test_url(async_session, user_id=auth_headers_and_id[1], short_key=f"budget{i}")
+    # Аутентификация, версия ссылок (ETag), страница и общее количество
+    with assert_max_queries(4):
+        response = await client.get("/api/v1/urls", headers=auth_headers_and_id[0])
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 10
+
+
+async def test_url_responses_match_default_encoding(
+    client: AsyncClient, async_session: AsyncSession, auth_headers_and_id: tuple[dict[str, str], int]
+) -> None:
+    """
+    Тестирует, что ответы создания и списка побайтно совпадают с сериализацией FastAPI по ``response_model``.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param auth_headers_and_id: Заголовки с авторизацией и id пользователя.
+    :type auth_headers_and_id: tuple[dict[str, str], int]
+    :returns: None
+    """
+    headers, user_id = auth_headers_and_id
+    payload = {"original_url": "https://пример.рф/путь?q=1", "redirect_code": 308}
+    created = await client.post("/api/v1/urls", json=payload, headers=headers)
+    assert created.status_code == 201
+    assert created.headers["content-type"] == "application/json"
+    assert created.content == JSONResponse(jsonable_encoder(URLResponse.model_validate(created.json()))).body
+
+    for i in range(3):
+        await create_test_url(async_session, user_id, f"https://example.com/ünïcode/{i}", short_key=f"enc{i}")
+    response = await client.get("/api/v1/urls", params={"per_page": 100}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 4
+    assert response.content == JSONResponse(jsonable_encoder(URLListResponse.model_validate(response.json()))).body
+
+
+async def test_list_urls_etag(
+    client: AsyncClient, async_session: AsyncSession, auth_headers_and_id: tuple[dict[str, str], int]
+) -> None:
+    """
+    Тестирует условный GET списка: 304 без чтения ссылок, пока ссылки пользователя не менялись.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param auth_headers_and_id: Заголовки с авторизацией и id пользователя.
+    :type auth_headers_and_id: tuple[dict[str, str], int]
+    :returns: None
+    """
+    headers, _ = auth_headers_and_id
+    created = await client.post("/api/v1/urls", json={"original_url": "https://example.com"}, headers=headers)
+    first = await client.get("/api/v1/urls", headers=headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    # Аутентификация и версия ссылок
+    with assert_max_queries(2):
+        response = await client.get("/api/v1/urls", headers={**headers, "If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert not response.content
+    other_page = await client.get("/api/v1/urls", params={"per_page": 5}, headers={**headers, "If-None-Match": etag})
+    assert other_page.status_code == 200
+
+    url_id = created.json()["id"]
+    changes = [
+        lambda: client.patch(f"/api/v1/urls/{url_id}", json={"is_active": False}, headers=headers),
+        lambda: client.post("/api/v1/urls/bulk", json={"action": "deactivate", "ids": [url_id]}, headers=headers),
+        lambda: client.delete(f"/api/v1/urls/{url_id}", headers=headers),
+        lambda: client.post("/api/v1/urls", json={"original_url": "https://example.com/new"}, headers=headers),
+    ]
+    for change in changes:
+        await change()
+        response = await client.get("/api/v1/urls", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        etag = response.headers["etag"]
+
+    record_click(response.json()["items"][0]["id"])
+    assert await flush_clicks(async_session) == 1
+    response = await client.get("/api/v1/urls", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["click_count"] == 1
+
+
 async def test_list_urls_pagination_and_filter(
     client: AsyncClient, async_session: AsyncSession, auth_headers_and_id: tuple[dict[str, str], int]
 ) -> None:
@@ -261,6 +457,52 @@ async def test_delete_foreign_user_url_returns_403(client: AsyncClient, async_se
     assert response.status_code == 403
 
 
+async def test_bulk_deactivate_and_delete(
+    client: AsyncClient, async_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирует массовую деактивацию по списку id с результатами по каждой ссылке и удаление по фильтру пачками.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :param monkeypatch: Фикстура pytest для подмены настроек.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    _, other_user_id = await get_headers_and_user_id(async_session, username="test2")
+    own = [await create_test_url(async_session, user_id, short_key=f"bulk{i}") for i in range(3)]
+    foreign = await create_test_url(async_session, other_user_id, short_key="bulkforeign")
+    ids = [own[0].id, foreign.id, 999999, own[1].id, own[0].id]
+
+    response = await client.post("/api/v1/urls/bulk", json={"action": "deactivate", "ids": ids}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "action": "deactivate",
+        "processed": 2,
+        "results": [
+            {"id": own[0].id, "status": "deactivated"},
+            {"id": foreign.id, "status": "forbidden"},
+            {"id": 999999, "status": "not_found"},
+            {"id": own[1].id, "status": "deactivated"},
+        ],
+    }
+    assert [(await get_url_by_id(async_session, url.id)).is_active for url in own] == [False, False, True]
+    assert (await get_url_by_id(async_session, foreign.id)).is_active is True
+
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 1)
+    response = await client.post("/api/v1/urls/bulk", json={"action": "delete", "is_active": False}, headers=headers)
+    assert response.json()["processed"] == 2
+    assert await get_url_by_id(async_session, own[0].id) is None
+    assert await get_url_by_id(async_session, own[2].id) is not None
+
+    response = await client.post("/api/v1/urls/bulk", json={"action": "delete"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Either ids or a filter is required"
+
+
 async def test_delete_url_internal_error(client: AsyncClient, auth_headers_and_id: tuple[dict[str, str], int]) -> None:
     """
     Тестирует обработку ошибки 500 при удалении url.
@@ -0,0 +1,102 @@
+import csv
+from datetime import UTC, datetime, timedelta
+import io
+import json
+
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.url import URL
+from app.schemas.url import EXPORT_FIELDS
+from tests.utils.db_mocks import create_test_url, get_headers_and_user_id
+
+
+async def _create_urls(session: AsyncSession, user_id: int) -> None:
+    """
+    Создаёт три ссылки пользователя: две активные (одна создана 10 дней назад) и одну деактивированную.
+
+    :param session: Асинхронная сессия SQLAlchemy.
+    :type session: AsyncSession
+    :param user_id: Идентификатор пользователя.
+    :type user_id: int
+    :returns: None
+    """
+    await create_test_url(session, user_id, "https://example.com/a", "export-a")
+    await create_test_url(session, user_id, "https://example.com/b", "export-b", is_active=False)
+    await create_test_url(session, user_id, "https://example.com/c", "export-c")
+    await session.execute(
+        update(URL).where(URL.short_key == "export-a").values(created_at=datetime.now(UTC) - timedelta(days=10))
+    )
+    await session.commit()
+
+
+async def test_export_urls_ndjson_and_filters(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует выгрузку ссылок в NDJSON: порядок, поля, фильтры по активности и периоду создания.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    await _create_urls(async_session, user_id)
+
+    response = await client.get("/api/v1/urls/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="urls.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["short_key"] for row in rows] == ["export-a", "export-b", "export-c"]
+    assert list(rows[0]) == list(EXPORT_FIELDS)
+    assert rows[1]["is_active"] is False
+    assert datetime.fromisoformat(rows[0]["created_at"]) < datetime.now(UTC) - timedelta(days=9)
+
+    created_from = (datetime.now(UTC) - timedelta(days=1)).isoformat()
+    response = await client.get(
+        "/api/v1/urls/export", params={"is_active": True, "created_from": created_from}, headers=headers
+    )
+    assert [json.loads(line)["short_key"] for line in response.text.splitlines()] == ["export-c"]
+
+
+async def test_export_urls_csv_gzip(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует выгрузку ссылок в CSV со сжатием gzip.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, user_id = await get_headers_and_user_id(async_session)
+    await _create_urls(async_session, user_id)
+
+    response = await client.get("/api/v1/urls/export", params={"format": "csv", "gzip": True}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == list(EXPORT_FIELDS)
+    assert [row[1] for row in rows[1:]] == ["export-a", "export-b", "export-c"]
+    assert rows[2][3] == "False"
+
+
+async def test_export_urls_invalid_range(client: AsyncClient, async_session: AsyncSession) -> None:
+    """
+    Тестирует отклонение выгрузки с некорректным периодом создания.
+
+    :param client: Асинхронный клиент FastAPI.
+    :type client: AsyncClient
+    :param async_session: Асинхронная сессия SQLAlchemy.
+    :type async_session: AsyncSession
+    :returns: None
+    """
+    headers, _ = await get_headers_and_user_id(async_session)
+    now = datetime.now(UTC)
+    params = {"created_from": now.isoformat(), "created_to": (now - timedelta(days=1)).isoformat()}
+    response = await client.get("/api/v1/urls/export", params=params, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid time range"
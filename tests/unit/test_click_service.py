@@ -0,0 +1,50 @@
+from app.core.metrics import CLICK_EVENTS_DROPPED
+from app.services.click_service import ClickContext, ClickQueue, coarse_network
+
+
+def test_coarse_network() -> None:
+    """
+    Тестирует огрубление адреса клиента до подсети.
+
+    :returns: None
+    """
+    assert coarse_network("203.0.113.77") == "203.0.113.0/24"
+    assert coarse_network("2001:db8:abcd:12::1") == "2001:db8:abcd::/48"
+    assert coarse_network("testclient") is None
+    assert coarse_network(None) is None
+
+
+def test_click_queue_drops_when_full() -> None:
+    """
+    Тестирует, что переполненная очередь отбрасывает новые события и учитывает их в метрике.
+
+    :returns: None
+    """
+    queue = ClickQueue(maxsize=2)
+    dropped_before = CLICK_EVENTS_DROPPED.get("queue_full")
+
+    assert queue.put(1, ClickContext())
+    assert queue.put(2, ClickContext())
+    assert not queue.put(3, ClickContext())
+
+    assert CLICK_EVENTS_DROPPED.get("queue_full") == dropped_before + 1
+    assert [url_id for url_id, _, _ in queue.drain(10)] == [1, 2]
+    assert len(queue) == 0
+
+
+def test_click_queue_requeue_keeps_order_and_bound() -> None:
+    """
+    Тестирует возврат пачки в начало очереди с сохранением порядка и без превышения размера очереди.
+
+    :returns: None
+    """
+    queue = ClickQueue(maxsize=3)
+    for url_id in (1, 2, 3):
+        queue.put(url_id, ClickContext())
+    batch = queue.drain(2)
+    queue.put(4, ClickContext())
+    dropped_before = CLICK_EVENTS_DROPPED.get("queue_full")
+
+    assert queue.requeue(batch) == 1
+    assert CLICK_EVENTS_DROPPED.get("queue_full") == dropped_before + 1
+    assert [url_id for url_id, _, _ in queue.drain(10)] == [1, 3, 4]
@@ -0,0 +1,51 @@
+import pytest
+
+from app.core.hyperloglog import HLL_REGISTERS, HLL_RELATIVE_ERROR, HyperLogLog
+
+
+def test_small_cardinalities_use_linear_counting() -> None:
+    """
+    Тестирует линейный подсчёт на малых количествах (ошибка в единицах) и игнорирование повторов.
+
+    :returns: None
+    """
+    sketch = HyperLogLog()
+    assert sketch.count() == 0
+    for _ in range(3):
+        for i in range(100):
+            sketch.add(f"visitor-{i}".encode())
+    assert abs(sketch.count() - 100) <= 2
+
+
+def test_large_cardinality_within_error_bound() -> None:
+    """
+    Тестирует, что оценка 200 тысяч уникальных значений укладывается в три стандартные ошибки.
+
+    :returns: None
+    """
+    sketch = HyperLogLog()
+    for i in range(200_000):
+        sketch.add(i.to_bytes(8, "big"))
+    assert abs(sketch.count() / 200_000 - 1) < 3 * HLL_RELATIVE_ERROR
+
+
+def test_merge_matches_union_and_roundtrip() -> None:
+    """
+    Тестирует, что объединение скетчей с пересечением равно скетчу объединения и переживает сериализацию.
+
+    :returns: None
+    """
+    first, second, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for i in range(30_000):
+        value = i.to_bytes(8, "big")
+        (first if i < 20_000 else second).add(value)
+        if 10_000 <= i < 20_000:
+            second.add(value)
+        union.add(value)
+
+    restored = HyperLogLog(first.to_bytes())
+    restored.merge(second)
+    assert restored.registers == union.registers
+
+    with pytest.raises(ValueError):
+        HyperLogLog(bytes(HLL_REGISTERS - 1))
@@ -0,0 +1,24 @@
+from app.db.instrumentation import QueryStats, redact_parameters, track_queries
+
+
+def test_redact_parameters_hides_values() -> None:
+    """
+    Тестирует, что в лог попадают только имена и типы параметров, но не значения.
+
+    :returns: None
+    """
+    assert redact_parameters(("secret", 42)) == "(<str>, <int>)"
+    assert redact_parameters({"password": "secret"}) == "{password=<str>}"
+    assert redact_parameters([("a", 1), ("b", 2)]) == "<2 parameter sets>"
+
+
+def test_most_repeated_statement() -> None:
+    """
+    Тестирует выбор самого часто повторяющегося выражения для поиска N+1.
+
+    :returns: None
+    """
+    with track_queries() as stats:
+        assert stats.most_repeated() is None
+    stats = QueryStats(statements={"SELECT 1": 2, "SELECT * FROM urls WHERE id = $1": 12})
+    assert stats.most_repeated() == ("SELECT * FROM urls WHERE id = $1", 12)
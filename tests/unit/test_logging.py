@@ -0,0 +1,43 @@
+import logging
+from logging.handlers import QueueHandler
+import queue
+
+import pytest
+
+from app.core.logging import _DeferredQueueHandler, setup_logging
+
+
+def test_setup_logging_uses_queue_handler(caplog: pytest.LogCaptureFixture) -> None:
+    """
+    Тестирует, что логгер пишет через единственный QueueHandler, а записи доходят до обработчиков.
+
+    :param caplog: Фикстура для захвата логов.
+    :type caplog: pytest.LogCaptureFixture
+    :returns: None
+    """
+    logger = setup_logging(environment="development")
+    setup_logging(environment="development")  # повторная настройка не дублирует обработчики
+
+    assert len(logger.handlers) == 1
+    assert isinstance(logger.handlers[0], QueueHandler)
+    assert logger.level == logging.DEBUG
+
+    with caplog.at_level(logging.INFO, logger="url_alias_service"):
+        logger.info("queued %s", "message")
+    assert "queued message" in caplog.messages
+
+
+def test_deferred_queue_handler_enqueues_copy() -> None:
+    """
+    Тестирует, что в очередь ставится копия записи без форматирования в вызывающем потоке.
+
+    :returns: None
+    """
+    handler = _DeferredQueueHandler(queue.SimpleQueue())
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "value %s", ("x",), None)
+
+    prepared = handler.prepare(record)
+
+    assert prepared is not record
+    assert prepared.args == ("x",)
+    assert prepared.msg == "value %s"
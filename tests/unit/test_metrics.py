@@ -0,0 +1,66 @@
+import asyncio
+import contextlib
+
+from app.core.metrics import EVENT_LOOP_LAG, Counter, Gauge, Histogram, MetricsRegistry, monitor_event_loop_lag
+
+
+def test_counter_and_gauge_render() -> None:
+    """
+    Тестирует выгрузку счётчика и gauge в текстовом формате Prometheus.
+
+    :returns: None
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", ("route",))
+    gauge = registry.gauge("pool_size", "Pool size.")
+    registry.add_collector(lambda: gauge.set(25))
+
+    counter.inc("/a")
+    counter.inc("/a", amount=2)
+    counter.inc('/b"\\')
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a"} 3.0' in lines
+    assert 'requests_total{route="/b\\"\\\\"} 1.0' in lines
+    assert "# TYPE pool_size gauge" in lines
+    assert "pool_size 25" in lines
+    assert counter.get("/a") == 3.0
+    assert isinstance(gauge, Counter) and isinstance(gauge, Gauge)
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    """
+    Тестирует кумулятивные корзины, сумму и количество наблюдений гистограммы.
+
+    :returns: None
+    """
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+
+    samples = list(histogram.samples())
+    assert samples == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2.0',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3.0',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4.0',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4.0',
+    ]
+    assert histogram.count("/a") == 4
+    assert histogram.count("/missing") == 0
+
+
+async def test_monitor_event_loop_lag_observes() -> None:
+    """
+    Тестирует, что монитор задержки event loop записывает наблюдения.
+
+    :returns: None
+    """
+    observed_before = EVENT_LOOP_LAG.count()
+    task = asyncio.create_task(monitor_event_loop_lag(interval=0.01))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    assert EVENT_LOOP_LAG.count() > observed_before
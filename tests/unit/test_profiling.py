@@ -0,0 +1,41 @@
+from collections import Counter
+import time
+
+from app.core.profiling import SamplingProfiler, render_folded
+
+
+def busy_wait(seconds: float) -> None:
+    """
+    Занимает текущий поток на заданное время.
+
+    :param seconds: Длительность (сек).
+    :type seconds: float
+    :returns: None
+    """
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_captures_current_thread() -> None:
+    """
+    Тестирует, что профайлер снимает стеки профилируемого потока в формате folded stacks.
+
+    :returns: None
+    """
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy_wait(0.1)
+    stacks = profiler.stop()
+
+    assert sum(stacks.values()) > 0
+    assert any(stack.split(";")[-1].startswith("busy_wait (test_profiling.py:") for stack in stacks)
+
+
+def test_render_folded() -> None:
+    """
+    Тестирует текстовое представление профиля: по строке на стек, самые частые первыми.
+
+    :returns: None
+    """
+    assert render_folded(Counter({"a;b": 1, "a;c": 3})) == "a;c 3\na;b 1\n"
@@ -0,0 +1,71 @@
+from datetime import UTC, datetime
+
+from app.schemas.url import URLResponse
+from app.services.redirect_cache import RedirectCache
+
+
+def _url(short_key: str, expires_at: float, is_active: bool = True) -> URLResponse:
+    """
+    Создаёт запись ссылки для кеша.
+
+    :param short_key: Короткий ключ.
+    :type short_key: str
+    :param expires_at: Срок действия (Unix time).
+    :type expires_at: float
+    :param is_active: Активна ли ссылка.
+    :type is_active: bool
+    :returns: Запись ссылки.
+    :rtype: URLResponse
+    """
+    return URLResponse(
+        id=1,
+        original_url="https://example.com/",
+        short_key=short_key,
+        is_active=is_active,
+        expires_at=datetime.fromtimestamp(expires_at, UTC),
+        created_at=datetime.fromtimestamp(0, UTC),
+        click_count=0,
+        user_id=1,
+        redirect_code=307,
+    )
+
+
+def test_entries_expire_exactly_at_expires_at() -> None:
+    """
+    Тестирует, что запись отдаётся до ``expires_at`` и не отдаётся начиная с него, даже внутри тика колеса.
+
+    :returns: None
+    """
+    now = 1_000_000.0
+    cache = RedirectCache(maxsize=10, tick=10.0, clock=lambda: now)
+    cache.put(_url("soon", now + 2.5))
+    cache.put(_url("later", now + 60))
+    cache.put(_url("inactive", now + 60, is_active=False))
+    cache.put(_url("expired", now - 1))
+    assert len(cache) == 2
+
+    now += 2.4
+    assert cache.get("soon") is not None
+    now += 0.1
+    assert cache.get("soon") is None
+    now += 10
+    assert cache.get("later") is not None
+    assert len(cache) == 1
+
+
+def test_lru_eviction_and_invalidation() -> None:
+    """
+    Тестирует вытеснение самых давних записей и явный сброс.
+
+    :returns: None
+    """
+    now = 1_000_000.0
+    cache = RedirectCache(maxsize=2, clock=lambda: now)
+    cache.put(_url("a", now + 60))
+    cache.put(_url("b", now + 60))
+    assert cache.get("a") is not None
+    cache.put(_url("c", now + 60))
+    assert cache.get("b") is None
+    cache.invalidate("a", "missing")
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
@@ -0,0 +1,45 @@
+import random
+
+from app.core.timer_wheel import TimerWheel
+
+
+def test_timers_fire_in_their_tick_and_never_early() -> None:
+    """
+    Тестирует, что таймеры на всех уровнях и за пределами колеса срабатывают не раньше срока и не позже тика.
+
+    :returns: None
+    """
+    rng = random.Random(42)
+    wheel = TimerWheel(now=1000.0, tick=1.0, slots=8, levels=3)
+    deadlines = {key: 1000.0 + rng.uniform(0.1, 2000) for key in range(500)}
+    for key, deadline in deadlines.items():
+        assert wheel.schedule(key, deadline)
+
+    now = 1000.0
+    while deadlines:
+        now += rng.choice([0.4, 1, 5, 37, 300])
+        for key in wheel.advance(now):
+            assert deadlines.pop(key) <= now
+        assert all(deadline > now - 1 for deadline in deadlines.values())
+    assert len(wheel) == 0
+
+
+def test_cancel_reschedule_and_past_deadline() -> None:
+    """
+    Тестирует отмену и перенос таймера и отказ планировать уже наступивший срок.
+
+    :returns: None
+    """
+    wheel = TimerWheel(now=0.0, tick=0.5)
+    assert not wheel.schedule("past", -1.0)
+    wheel.schedule("a", 10.0)
+    wheel.schedule("b", 10.0)
+    wheel.schedule("b", 100_000.0)
+    assert wheel.cancel("a")
+    assert not wheel.cancel("a")
+
+    assert wheel.advance(50.0) == []
+    assert "b" in wheel
+    assert wheel.advance(99_999.0) == []
+    assert wheel.advance(100_000.0) == ["b"]
+    assert len(wheel) == 0
@@ -0,0 +1,47 @@
+from pydantic import ValidationError
+import pytest
+
+from app.core.url_normalization import normalize_url
+from app.schemas.url import URLCreate
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("HTTP://Example.COM:80/a", "http://example.com/a"),
+        ("https://example.com:443", "https://example.com/"),
+        ("https://example.com:8443/a", "https://example.com:8443/a"),
+        ("https://пример.рф/путь", "https://xn--e1afmkfd.xn--p1ai/%D0%BF%D1%83%D1%82%D1%8C"),
+        ("https://example.com/%7euser/%2f?q=%e2%82%ac", "https://example.com/~user/%2F?q=%E2%82%AC"),
+        ("https://example.com/Path?Q=A#Frag", "https://example.com/Path?Q=A#Frag"),
+    ],
+)
+def test_normalize_url(value: str, expected: str) -> None:
+    """
+    Тестирует приведение URL к каноническому виду.
+
+    :param value: Исходный URL.
+    :type value: str
+    :param expected: Ожидаемый канонический URL.
+    :type expected: str
+    :returns: None
+    """
+    assert normalize_url(value) == expected
+    assert normalize_url(expected) == expected
+
+
+def test_normalize_url_cache_and_errors() -> None:
+    """
+    Тестирует, что повторные значения берутся из кеша, а некорректные URL не кешируются и дают ошибку валидации.
+
+    :returns: None
+    """
+    normalize_url.cache_clear()
+    URLCreate(original_url="https://Example.com/cached")
+    URLCreate(original_url="https://Example.com/cached")
+    assert normalize_url.cache_info().hits == 1
+
+    for value in ("not a url", 42, ["https://example.com"]):
+        with pytest.raises(ValidationError):
+            URLCreate(original_url=value)
+    assert normalize_url.cache_info().currsize == 1
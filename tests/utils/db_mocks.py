@@ -3,6 +3,8 @@ from datetime import UTC, datetime, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.url_normalization import normalize_url
+from app.db.crud.url import add_user_link_stats
 from app.db.crud.user import create_user
 from app.db.models import URL
 from app.schemas.url import URLResponse
@@ -54,6 +56,7 @@ async def create_test_url(
     short_key: str = "exmpl",
     is_active: bool = True,
     expires_at: datetime | None = None,
+    redirect_code: int = 307,
 ) -> URLResponse:
     """
     Создаёт тестовую короткую ссылку в базе данных.
@@ -70,20 +73,28 @@ async def create_test_url(
     :type is_active: bool
     :param expires_at: Время истечения ссылки.
     :type expires_at: datetime | None
+    :param redirect_code: Код перенаправления.
+    :type redirect_code: int
     :returns: Созданная запись URL.
     :rtype: URLResponse
     """
     if expires_at is None:
         expires_at = datetime.now(UTC) + timedelta(days=1)
+    # Как и API, записываем URL в каноническом виде: при чтении он больше не валидируется
     url = URL(
-        original_url=original_url,
+        original_url=normalize_url(original_url),
         short_key=short_key,
         user_id=user_id,
         is_active=is_active,
+        deactivated_at=None if is_active else datetime.now(UTC),
         expires_at=expires_at,
         click_count=0,
+        redirect_code=redirect_code,
     )
     session.add(url)
+    await session.flush()
+    # Как и API, поддерживаем счётчики ссылок пользователя в той же транзакции
+    await add_user_link_stats(session, {user_id: (1, int(is_active))})
     await session.commit()
     await session.refresh(url)
     return URLResponse.model_validate(url)
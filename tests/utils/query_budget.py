@@ -0,0 +1,24 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+
+from app.db.instrumentation import QueryStats, track_queries
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Generator[QueryStats, None, None]:
+    """
+    Проверяет, что код внутри блока выполнил не больше ``limit`` SQL-выражений.
+
+    Учитываются выражения всех движков, к которым применён ``instrument_engine`` (в тестах — движок
+    фикстуры ``async_session``), включая выражения внутри HTTP-запросов через тестовый клиент.
+
+    :param limit: Допустимое количество выражений.
+    :type limit: int
+    :returns: Статистика выражений блока.
+    :rtype: Generator[QueryStats, None, None]
+    :raises AssertionError: Если бюджет превышен.
+    """
+    with track_queries() as stats:
+        yield stats
+    statements = "\n".join(f"{times}x {statement}" for statement, times in stats.statements.items())
+    assert stats.count <= limit, f"Expected at most {limit} queries, got {stats.count}:\n{statements}"